@@ -0,0 +1,65 @@
+"""
+Conflict-check latency for crud.function.check_auditorium_free as an auditorium's
+history grows.
+
+    python -m benchmarks.bench_auditorium_conflict [sizes...]
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database, measure, seed_auditorium
+from crud.function import check_auditorium_free
+from models import Function
+from seat_map import new_seat_map
+
+SEAT_MAP = new_seat_map(100, 100)
+DEFAULT_SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+BATCH = 50_000
+
+
+async def seed(engine, size: int) -> tuple[str, datetime]:
+    start = datetime(2020, 1, 1)
+    async with engine.begin() as conn:
+        movie_id, auditorium_id = await seed_auditorium(conn)
+        for offset in range(0, size, BATCH):
+            rows = []
+            for i in range(offset, min(offset + BATCH, size)):
+                function_start = start + timedelta(hours=3 * i)
+                rows.append({
+                    "id": str(uuid4()),
+                    "movie_id": movie_id,
+                    "auditorium_id": auditorium_id,
+                    "start_time": function_start,
+                    "end_time": function_start + timedelta(hours=2),
+                    "price": 10,
+                    "available_seats": 100,
+                    "seat_map": SEAT_MAP,
+                })
+            await conn.execute(insert(Function), rows)
+    return auditorium_id, start + timedelta(hours=3 * size)
+
+
+async def bench(size: int) -> None:
+    async with temp_database() as (engine, session_factory):
+        auditorium_id, schedule_end = await seed(engine, size)
+        async with session_factory() as db:
+            # Worst case for the old implementation: the free slot is after the whole history.
+            free_start = schedule_end + timedelta(hours=1)
+            free = await measure(lambda: check_auditorium_free(db, auditorium_id, free_start, free_start + timedelta(hours=2)))
+            # A conflict in the middle of the history.
+            busy_start = schedule_end - timedelta(hours=3 * (size // 2)) + timedelta(minutes=30)
+            busy = await measure(lambda: check_auditorium_free(db, auditorium_id, busy_start, busy_start + timedelta(hours=2)))
+        print(f"{size:>10} functions  free: {free:8.1f} us  conflict: {busy:8.1f} us")
+
+
+async def main(sizes):
+    for size in sizes:
+        await bench(size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES))
@@ -0,0 +1,60 @@
+"""
+Autocomplete lookups against the in-memory prefix index (prefix_index) versus the
+leading-wildcard LIKE query the search box used to run on every keypress.
+
+    python -m benchmarks.bench_autocomplete [number of titles]
+"""
+import random
+import sqlite3
+import sys
+import time
+import tracemalloc
+from statistics import median
+
+from benchmarks.bench_title_index import make_title, make_word
+from prefix_index import PrefixIndex
+
+
+def timed(function, repeat: int = 200) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return median(samples) * 1000
+
+
+def main(size: int) -> None:
+    random.seed(13)
+    words = [make_word() for _ in range(size // 4)]
+    entries = [(str(i), make_title(words), random.randint(1, 10)) for i in range(size)]
+
+    started = time.perf_counter()
+    index = PrefixIndex(entries)
+    built = time.perf_counter() - started
+    tracemalloc.start()
+    copy = PrefixIndex(entries)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copy
+    print(f"built index over {size:,} titles in {built:.1f} s, {memory / 2**20:.0f} MiB")
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE movies (id TEXT PRIMARY KEY, title TEXT, rating INTEGER)")
+    conn.executemany("INSERT INTO movies VALUES (?, ?, ?)", entries)
+
+    sample = [title for _, title, _ in random.sample(entries, 50)]
+    for length in (1, 2, 3, 5, 8):
+        prefixes = [title[:length] for title in sample]
+        lookups = iter(prefixes)
+        cold = timed(lambda: index.complete(next(lookups), 10), repeat=len(prefixes))
+        lookups = iter(prefixes)
+        warm = timed(lambda: index.complete(next(lookups), 10), repeat=len(prefixes))
+        lookups = iter(prefixes)
+        like = timed(lambda: conn.execute(
+            "SELECT id, title FROM movies WHERE title LIKE ? ORDER BY rating DESC LIMIT 10", (f"%{next(lookups)}%",)
+        ).fetchall(), repeat=len(prefixes))
+        print(f"prefix length {length}: first lookup {cold:7.3f} ms   repeated {warm:7.3f} ms   LIKE '%q%' {like:7.1f} ms")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,54 @@
+"""
+Resolving the movies of a listing page: one get_movies_by_ids call versus
+get_movie per id, the way the listing service calls GET /movies/{movie_id}.
+
+    python -m benchmarks.bench_batch_get [catalog size]
+"""
+import asyncio
+import random
+import sys
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database, measure
+from crud.movies import get_movie, get_movies_by_ids
+from models import Director, Genre, Movie, MovieGenre
+
+BATCH = 20_000
+
+
+async def main(size: int) -> None:
+    random.seed(16)
+    async with temp_database() as (engine, session_factory):
+        director_id = str(uuid4())
+        genre_ids = [str(uuid4()) for _ in range(10)]
+        movie_ids = [str(uuid4()) for _ in range(size)]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Director).values(id=director_id, name="Director"))
+            await conn.execute(insert(Genre), [{"id": id, "name": f"Genre {i}"} for i, id in enumerate(genre_ids)])
+            for offset in range(0, size, BATCH):
+                chunk = movie_ids[offset:offset + BATCH]
+                await conn.execute(insert(Movie), [
+                    {"id": id, "title": f"Movie {id}", "description": "", "year": 2000, "rating": 5, "language": "English",
+                     "duration": 100, "trailer": "", "image": "", "director": director_id}
+                    for id in chunk
+                ])
+                await conn.execute(insert(MovieGenre), [
+                    {"movie_id": id, "genre_id": genre_id} for id in chunk for genre_id in random.sample(genre_ids, 2)
+                ])
+        async with session_factory() as db:
+            for count in (10, 100, 300, 500):
+                ids = random.sample(movie_ids, count)
+
+                async def one_by_one():
+                    for movie_id in ids:
+                        await get_movie(movie_id, db)
+
+                loop = await measure(one_by_one, repeat=5)
+                batch = await measure(lambda: get_movies_by_ids(ids, db), repeat=5)
+                print(f"{count:>4} ids: one by one {loop / 1000:7.1f} ms   batch {batch / 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,81 @@
+"""
+Nightly catalog sync: create_movies_bulk over a JSONL file, at a few batch
+sizes, versus one create_movie commit per title.
+
+    python -m benchmarks.bench_bulk_load [movies]
+"""
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database
+from bulk_loader import file_lines
+from crud.bulk import create_movies_bulk, read_records
+from crud.movies import create_movie
+from models import Director, Genre
+from schemas.movies import MovieCreate
+
+ONE_BY_ONE = 2_000
+
+
+async def seed(engine) -> tuple[list, list]:
+    directors = [(str(uuid4()), f"Director {i}") for i in range(2_000)]
+    genres = [(str(uuid4()), f"Genre {i}") for i in range(30)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Director), [{"id": id, "name": name} for id, name in directors])
+        await conn.execute(insert(Genre), [{"id": id, "name": name} for id, name in genres])
+    return directors, genres
+
+
+def record(i: int, directors: list, genres: list) -> dict:
+    return {
+        "title": f"Movie {i}", "description": "A movie.", "year": random.randint(1950, 2024),
+        "rating": random.randint(1, 10), "language": "English", "duration": random.randint(80, 180),
+        "trailer": "https://example.com/trailer", "image": "https://example.com/image",
+        "director": random.choice(directors)[1], "genres": [name for _, name in random.sample(genres, 3)],
+    }
+
+
+async def main(size: int) -> None:
+    random.seed(20)
+    directory = tempfile.mkdtemp(prefix="cinema-bulk-")
+    path = os.path.join(directory, "catalog.jsonl")
+    try:
+        for batch_size in (100, 1_000, 5_000):
+            async with temp_database() as (engine, session_factory):
+                directors, genres = await seed(engine)
+                with open(path, "w") as file:
+                    for i in range(size):
+                        file.write(json.dumps(record(i, directors, genres)) + "\n")
+                async with session_factory() as db:
+                    result = await create_movies_bulk(read_records(file_lines(path)), db, batch_size)
+                assert result.inserted == size
+                print(f"bulk, batch {batch_size:>5}: {result.rows_per_second:8.0f} rows/s ({result.seconds:.1f} s)")
+
+        async with temp_database() as (engine, session_factory):
+            directors, genres = await seed(engine)
+            ids = {name: id for id, name in directors + genres}
+            movies = []
+            for i in range(ONE_BY_ONE):
+                row = record(i, directors, genres)
+                movies.append(MovieCreate(**{**row, "director": ids[row["director"]], "genres": [ids[name] for name in row["genres"]]}))
+            started = time.perf_counter()
+            for movie in movies:
+                async with session_factory() as db:
+                    await create_movie(movie, db)
+            print(f"create_movie per title: {ONE_BY_ONE / (time.perf_counter() - started):8.0f} rows/s")
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000))
@@ -0,0 +1,57 @@
+"""
+Deleting a genre attached to every movie of the catalog: delete_genre (one
+DELETE ... RETURNING, links removed by ON DELETE CASCADE) versus the previous
+path that loaded the genre and let the ORM delete its MovieGenre rows.
+
+    python -m benchmarks.bench_deletes [movies]
+"""
+import asyncio
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import temp_database
+from crud.genre import delete_genre
+from models import Director, Genre, Movie, MovieGenre
+
+BATCH = 20_000
+
+
+async def previous_delete_genre(genre_id: str, db) -> None:
+    result = await db.execute(select(Genre).filter(Genre.id == genre_id).options(selectinload(Genre.movies_association)))
+    await db.delete(result.scalar_one_or_none())
+    await db.commit()
+
+
+async def seed(engine, size: int) -> str:
+    director_id, genre_id = str(uuid4()), str(uuid4())
+    movie_ids = [str(uuid4()) for _ in range(size)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Director).values(id=director_id, name=director_id))
+        await conn.execute(insert(Genre).values(id=genre_id, name=genre_id))
+        for offset in range(0, size, BATCH):
+            chunk = movie_ids[offset:offset + BATCH]
+            await conn.execute(insert(Movie), [{"id": id, "title": f"Movie {id}", "director": director_id} for id in chunk])
+            await conn.execute(insert(MovieGenre), [{"movie_id": id, "genre_id": genre_id} for id in chunk])
+    return genre_id
+
+
+async def main(size: int) -> None:
+    for label, delete in (("previous", previous_delete_genre), ("delete_genre", delete_genre)):
+        async with temp_database() as (engine, session_factory):
+            genre_id = await seed(engine, size)
+            async with session_factory() as db:
+                started = time.perf_counter()
+                await delete(genre_id, db)
+                elapsed = time.perf_counter() - started
+            async with session_factory() as db:
+                links = (await db.execute(select(MovieGenre).limit(1))).first()
+            assert links is None
+            print(f"{label:>12}: {elapsed * 1000:8.1f} ms for {size} links")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000))
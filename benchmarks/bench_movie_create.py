@@ -0,0 +1,76 @@
+"""
+POST /movies/ as the nightly catalog sync drives it: create_movie versus the
+previous path (get_director and a get_genre per genre in the router, then the
+ORM insert with commit, refresh and reload), by statements and latency.
+
+    python -m benchmarks.bench_movie_create [movies]
+"""
+import asyncio
+import random
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import temp_database
+from crud.director import get_director
+from crud.genre import get_genre
+from crud.movies import create_movie
+from models import Director, Genre, Movie, MovieGenre
+from schemas.movies import MovieCreate, MovieRead
+
+
+async def previous_create_movie(movie: MovieCreate, db) -> MovieRead:
+    await get_director(movie.director, db)
+    for genre_id in movie.genres:
+        await get_genre(genre_id, db)
+    movie_data = movie.model_dump()
+    genre_ids = movie_data.pop("genres")
+    result = await db.execute(select(Genre).where(Genre.id.in_(genre_ids)))
+    new_movie = Movie(**movie_data)
+    new_movie.genres = result.scalars().all()
+    db.add(new_movie)
+    await db.commit()
+    await db.refresh(new_movie)
+    result = await db.execute(
+        select(Movie).where(Movie.id == new_movie.id)
+        .options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre))
+    )
+    return MovieRead.model_validate(result.scalars().first())
+
+
+async def main(count: int) -> None:
+    random.seed(19)
+    for label, create in (("previous", previous_create_movie), ("create_movie", create_movie)):
+        async with temp_database() as (engine, session_factory):
+            director_ids = [str(uuid4()) for _ in range(100)]
+            genre_ids = [str(uuid4()) for _ in range(20)]
+            async with engine.begin() as conn:
+                await conn.execute(insert(Director), [{"id": id, "name": id} for id in director_ids])
+                await conn.execute(insert(Genre), [{"id": id, "name": id} for id in genre_ids])
+            movies = [
+                MovieCreate(
+                    title=f"Movie {i}", description="", year=2000, rating=5, language="English", duration=100,
+                    trailer="", image="", director=random.choice(director_ids), genres=random.sample(genre_ids, 3),
+                )
+                for i in range(count)
+            ]
+            statements = 0
+
+            def counter(*args):
+                nonlocal statements
+                statements += 1
+
+            event.listen(engine.sync_engine, "before_cursor_execute", counter)
+            started = time.perf_counter()
+            for movie in movies:
+                async with session_factory() as db:
+                    await create(movie, db)
+            elapsed = time.perf_counter() - started
+            print(f"{label:>12}: {statements / count:4.1f} statements/movie  {count / elapsed:7.0f} movies/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000))
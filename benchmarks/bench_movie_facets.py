@@ -0,0 +1,68 @@
+"""
+Faceted movie filtering (crud.movies.search_movies_faceted) against what clients do
+today: download the whole catalog through get_movies and filter it locally.
+
+    python -m benchmarks.bench_movie_facets [catalog size]
+"""
+import asyncio
+import random
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database, measure
+from crud.movies import get_movies, search_movies_faceted
+from models import Director, Genre, Movie, MovieGenre
+from schemas.movies import MovieFilter
+
+BATCH = 20_000
+LANGUAGES = ["English"] * 6 + ["French", "Spanish", "Japanese", "Korean", "German", "Italian"]
+
+
+async def seed(engine, size: int) -> list:
+    random.seed(15)
+    director_ids = [str(uuid4()) for _ in range(2_000)]
+    genre_ids = [str(uuid4()) for _ in range(20)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Director), [{"id": id, "name": f"Director {i}"} for i, id in enumerate(director_ids)])
+        await conn.execute(insert(Genre), [{"id": id, "name": f"Genre {i}"} for i, id in enumerate(genre_ids)])
+        for offset in range(0, size, BATCH):
+            movies = [
+                {
+                    "id": str(uuid4()), "title": f"Movie {offset + i}", "description": "", "year": random.randint(1930, 2025),
+                    "rating": random.randint(1, 10), "language": random.choice(LANGUAGES), "duration": random.randint(75, 200),
+                    "trailer": "", "image": "", "director": random.choice(director_ids),
+                }
+                for i in range(min(BATCH, size - offset))
+            ]
+            await conn.execute(insert(Movie), movies)
+            await conn.execute(insert(MovieGenre), [
+                {"movie_id": movie["id"], "genre_id": genre_id}
+                for movie in movies for genre_id in random.sample(genre_ids, random.randint(1, 3))
+            ])
+    return genre_ids
+
+
+async def main(size: int) -> None:
+    async with temp_database() as (engine, session_factory):
+        started = time.perf_counter()
+        genre_ids = await seed(engine, size)
+        print(f"seeded {size:,} movies in {time.perf_counter() - started:.1f} s")
+        cases = {
+            "no filters": MovieFilter(),
+            "1990s, rating >= 8": MovieFilter(year_from=1990, year_to=1999, min_rating=8),
+            "any of 2 genres, English": MovieFilter(genres=genre_ids[:2], language="English"),
+            "all of 2 genres, <= 120 min": MovieFilter(genres=genre_ids[:2], genre_match="all", max_duration=120),
+        }
+        async with session_factory() as db:
+            for label, filters in cases.items():
+                elapsed = await measure(lambda: search_movies_faceted(filters, db, 1, 20), repeat=5)
+                print(f"{label:>28}: page + facets {elapsed / 1000:7.1f} ms")
+            elapsed = await measure(lambda: get_movies(db, 1, size), repeat=1)
+            print(f"{'whole catalog download':>28}: {elapsed / 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
@@ -0,0 +1,86 @@
+"""
+Full-text movie search (crud.movies.search_movies, FTS5 + BM25) and a page of
+title matches (crud.movies.get_list_of_movies_by_title_like) against the old
+`title LIKE '%name%'` scan, which loaded every match, on a synthetic catalog.
+
+    python -m benchmarks.bench_movie_search [catalog size]
+"""
+import asyncio
+import random
+import sys
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import temp_database, measure
+from crud.movies import search_movies, get_list_of_movies_by_title_like
+from models import Director, Movie, MovieGenre
+
+SYLLABLES = "ka lo mi ra sen tu vel dor an is mar qu el no shi tan ber ol fi zen".split()
+BATCH = 50_000
+
+
+def make_vocabulary(size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(random.choice(SYLLABLES) for _ in range(random.randint(2, 4))))
+    return sorted(words)
+
+
+def sentence(vocabulary: list, weights: list, length: int) -> str:
+    return " ".join(random.choices(vocabulary, weights, k=length))
+
+
+async def seed(engine, size: int) -> list:
+    """Titles and descriptions draw words from a Zipf-like vocabulary, like real text."""
+    random.seed(11)
+    vocabulary = make_vocabulary(20_000)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    director_ids = [str(uuid4()) for _ in range(1_000)]
+    async with engine.begin() as conn:
+        await conn.execute(insert(Director), [
+            {"id": director_id, "name": f"{sentence(vocabulary, weights, 2).title()} {i}"}
+            for i, director_id in enumerate(director_ids)
+        ])
+        for offset in range(0, size, BATCH):
+            await conn.execute(insert(Movie), [
+                {
+                    "id": str(uuid4()),
+                    "title": sentence(vocabulary, weights, random.randint(1, 4)).title(),
+                    "description": sentence(vocabulary, weights, random.randint(10, 30)),
+                    "year": random.randint(1950, 2025),
+                    "director": random.choice(director_ids),
+                    "language": "en",
+                    "duration": random.randint(80, 180),
+                    "trailer": "",
+                    "image": "",
+                }
+                for _ in range(min(BATCH, size - offset))
+            ])
+    # A common word, a mid-frequency word, a rare word, a two-word query and a prefix.
+    return [vocabulary[0], vocabulary[200], vocabulary[15_000], f"{vocabulary[3]} {vocabulary[40]}", vocabulary[500][:4]]
+
+
+async def old_title_like(db, name: str) -> None:
+    await db.execute(select(Movie).where(Movie.title.like(f"%{name}%")).options(
+        selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
+
+
+async def main(size: int) -> None:
+    async with temp_database() as (engine, session_factory):
+        started = time.perf_counter()
+        queries = await seed(engine, size)
+        print(f"indexed {size:,} movies in {time.perf_counter() - started:.1f} s (FTS triggers included)")
+        async with session_factory() as db:
+            for query in queries:
+                fts = await measure(lambda: search_movies(query, db, 1, 20), repeat=20)
+                titles = await measure(lambda: get_list_of_movies_by_title_like(query, db, 1, 20), repeat=5)
+                like = await measure(lambda: old_title_like(db, query), repeat=5)
+                print(f"{query!r:>24}  fulltext page: {fts / 1000:7.1f} ms  "
+                      f"title_like page: {titles / 1000:7.1f} ms  old LIKE scan: {like / 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
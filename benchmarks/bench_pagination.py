@@ -0,0 +1,41 @@
+"""
+Deep-page latency of the list endpoints: OFFSET pages with a count versus cursor
+pages, through crud.director.get_directors.
+
+    python -m benchmarks.bench_pagination [number of rows]
+"""
+import asyncio
+import sys
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+
+from benchmarks.common import temp_database, measure
+from crud.director import get_directors
+from crud.pagination import encode_cursor
+from models import Director
+
+PAGE_SIZE = 20
+BATCH = 50_000
+
+
+async def main(size: int) -> None:
+    async with temp_database() as (engine, session_factory):
+        async with engine.begin() as conn:
+            for offset in range(0, size, BATCH):
+                await conn.execute(insert(Director), [
+                    {"id": str(uuid4()), "name": f"Director {offset + i}"} for i in range(min(BATCH, size - offset))
+                ])
+        async with session_factory() as db:
+            ids = (await db.execute(select(Director.id).order_by(Director.id))).scalars().all()
+            print(f"{size:,} directors, {PAGE_SIZE} per page")
+            for depth in (0, size // 100, size // 10, size // 2, size - PAGE_SIZE):
+                page = depth // PAGE_SIZE + 1
+                offset = await measure(lambda: get_directors(db, page, PAGE_SIZE), repeat=10)
+                cursor = encode_cursor(ids[depth - 1]) if depth else None
+                keyset = await measure(lambda: get_directors(db, page, PAGE_SIZE, cursor), repeat=10)
+                print(f"row {depth:>9,}: page + count {offset / 1000:8.2f} ms   cursor {keyset / 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000))
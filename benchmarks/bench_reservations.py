@@ -0,0 +1,62 @@
+"""
+Concurrency stress test for crud.function.reserve_seats: many buyers race for the
+seats of one function, each on its own pooled connection. Reports reservations/sec
+and exits non-zero if the seat count is inconsistent with what was sold.
+
+    python -m benchmarks.bench_reservations [buyers] [capacity]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database, seed_auditorium
+from crud.function import get_function, reserve_seats
+from models import Function
+from seat_map import new_seat_map
+
+
+async def main(buyers: int, capacity: int) -> int:
+    async with temp_database() as (engine, session_factory):
+        async with engine.begin() as conn:
+            movie_id, auditorium_id = await seed_auditorium(conn, capacity)
+            function_id = str(uuid4())
+            start_time = datetime.now() + timedelta(days=1)
+            await conn.execute(insert(Function).values(
+                id=function_id, movie_id=movie_id, auditorium_id=auditorium_id,
+                start_time=start_time, end_time=start_time + timedelta(hours=2),
+                price=10, available_seats=capacity, seat_map=new_seat_map(capacity, capacity),
+            ))
+
+        async def buy(seats):
+            async with session_factory() as db:
+                return await reserve_seats(db, function_id, seats)
+
+        requested = [1 + i % 4 for i in range(buyers)]
+        started = time.perf_counter()
+        results = await asyncio.gather(*[buy(seats) for seats in requested], return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        reservations = [result for result in results if not isinstance(result, Exception)]
+        busy = sum(isinstance(result, Exception) and "busy" in str(result.detail) for result in results)
+        seats = [seat for reservation in reservations for seat in reservation.seat_numbers]
+        sold = len(seats)
+        accepted = len(reservations)
+        async with session_factory() as db:
+            remaining = (await get_function(db, function_id)).available_seats
+
+    consistent = len(set(seats)) == sold <= capacity and remaining == capacity - sold
+    print(f"{buyers} buyers, {capacity} seats: {accepted} accepted, {buyers - accepted} rejected ({busy} gave up retrying)")
+    print(f"{buyers / elapsed:,.0f} reservation attempts/sec ({elapsed * 1000:.0f} ms total)")
+    print(f"sold {sold}, remaining {remaining}: {'consistent' if consistent else 'INCONSISTENT'}")
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    buyers = args[0] if args else 500
+    capacity = args[1] if len(args) > 1 else 400
+    sys.exit(asyncio.run(main(buyers, capacity)))
@@ -0,0 +1,72 @@
+"""
+Packs a week of showtimes for a 20-screen cinema with crud.schedule.pack_schedule,
+with some functions already scheduled, and persists the result.
+
+    python -m benchmarks.bench_schedule_packing [screens] [days] [movies]
+"""
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert
+
+from benchmarks.common import temp_database
+from crud.schedule import pack_schedule
+from models import Auditorium, Cinema, Director, Function, Movie
+from schemas.schedule import SchedulePackRequest
+from seat_map import new_seat_map
+
+
+async def main(screens: int, days: int, movie_count: int) -> None:
+    random.seed(7)
+    first_day = (datetime.now() + timedelta(days=1)).date()
+    async with temp_database() as (engine, session_factory):
+        async with engine.begin() as conn:
+            director_id, cinema_id = str(uuid4()), str(uuid4())
+            await conn.execute(insert(Director).values(id=director_id, name="Bench"))
+            await conn.execute(insert(Cinema).values(id=cinema_id, name="Bench", location="-", number=1))
+            movie_ids = [str(uuid4()) for _ in range(movie_count)]
+            await conn.execute(insert(Movie), [
+                {"id": movie_id, "title": f"Movie {i}", "duration": random.randint(85, 180), "director": director_id}
+                for i, movie_id in enumerate(movie_ids)
+            ])
+            auditorium_ids = [str(uuid4()) for _ in range(screens)]
+            await conn.execute(insert(Auditorium), [
+                {"id": auditorium_id, "name": f"Screen {i}", "cinema_id": cinema_id, "capacity": 250}
+                for i, auditorium_id in enumerate(auditorium_ids)
+            ])
+            # One premiere already booked per screen and day.
+            existing = []
+            for auditorium_id in auditorium_ids:
+                for day in range(days):
+                    start = datetime.combine(first_day, datetime.min.time()) + timedelta(days=day, hours=random.randint(12, 20))
+                    existing.append({
+                        "id": str(uuid4()), "movie_id": movie_ids[0], "auditorium_id": auditorium_id,
+                        "start_time": start, "end_time": start + timedelta(minutes=150),
+                        "price": 15, "available_seats": 250, "seat_map": new_seat_map(250, 250),
+                    })
+            await conn.execute(insert(Function), existing)
+
+        request = SchedulePackRequest(
+            movie_ids=movie_ids,
+            auditorium_ids=auditorium_ids,
+            from_date=first_day,
+            to_date=first_day + timedelta(days=days - 1),
+            price=10,
+            persist=True,
+        )
+        async with session_factory() as db:
+            started = time.perf_counter()
+            result = await pack_schedule(db, request)
+            elapsed = time.perf_counter() - started
+
+    print(f"{screens} screens x {days} days, {movie_count} movies: packed {len(result['created'])} showtimes "
+          f"around {len(existing)} existing ones in {elapsed * 1000:.0f} ms (persisted)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    asyncio.run(main(*(args + [20, 7, 30][len(args):])))
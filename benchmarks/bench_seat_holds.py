@@ -0,0 +1,71 @@
+"""
+Hold and release throughput for crud.seat_hold: concurrent buyers place holds
+across several functions, then every hold is expired and the sweeper's batch
+release is timed. Exits non-zero if any seat is left taken afterwards.
+
+    python -m benchmarks.bench_seat_holds [holds] [functions]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import insert, select, update
+
+from benchmarks.common import temp_database, seed_auditorium
+from crud.seat_hold import create_seat_hold, release_expired_seat_holds
+from models import Function, SeatHold
+from seat_map import new_seat_map
+from tasks import SWEEP_BATCH_SIZE
+
+CAPACITY = 2_000
+
+
+async def main(holds: int, functions: int) -> int:
+    async with temp_database() as (engine, session_factory):
+        async with engine.begin() as conn:
+            movie_id, auditorium_id = await seed_auditorium(conn, CAPACITY)
+            function_ids = [str(uuid4()) for _ in range(functions)]
+            start_time = datetime.now() + timedelta(days=1)
+            await conn.execute(insert(Function), [
+                {
+                    "id": function_id, "movie_id": movie_id, "auditorium_id": auditorium_id,
+                    "start_time": start_time + timedelta(hours=3 * i), "end_time": start_time + timedelta(hours=3 * i + 2),
+                    "price": 10, "available_seats": CAPACITY, "seat_map": new_seat_map(CAPACITY, CAPACITY),
+                }
+                for i, function_id in enumerate(function_ids)
+            ])
+
+        async def hold(i):
+            async with session_factory() as db:
+                return await create_seat_hold(db, function_ids[i % functions], "bench", seats=2)
+
+        started = time.perf_counter()
+        created = await asyncio.gather(*[hold(i) for i in range(holds)], return_exceptions=True)
+        hold_elapsed = time.perf_counter() - started
+        placed = sum(not isinstance(result, Exception) for result in created)
+
+        async with session_factory() as db:
+            await db.execute(update(SeatHold).values(expires_at=datetime.now() - timedelta(seconds=1)))
+            await db.commit()
+            started = time.perf_counter()
+            released = 0
+            while True:
+                batch = await release_expired_seat_holds(db, SWEEP_BATCH_SIZE)
+                released += batch
+                if batch < SWEEP_BATCH_SIZE:
+                    break
+            release_elapsed = time.perf_counter() - started
+            remaining = (await db.execute(select(Function.available_seats))).scalars().all()
+
+    consistent = released == placed and all(seats == CAPACITY for seats in remaining)
+    print(f"{placed}/{holds} holds over {functions} functions: {placed / hold_elapsed:,.0f} holds/sec")
+    print(f"sweeper released {released} holds: {released / release_elapsed:,.0f} releases/sec")
+    print("all seats free again" if consistent else "INCONSISTENT seat maps after release")
+    return 0 if consistent else 1
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    sys.exit(asyncio.run(main(args[0] if args else 2_000, args[1] if len(args) > 1 else 20)))
@@ -0,0 +1,89 @@
+"""
+Worker-fleet cold start: N processes boot against the same fresh SQLite file,
+each running the database part of main.lifespan, either coordinated through
+startup.prepare_database or the old way (create_all, migrations and seeding in
+every worker). A warm start, against the prepared file, is timed too. Times are
+for the slowest worker's database step; interpreter start-up and imports, which
+are the same either way, are left out.
+
+    python -m benchmarks.bench_startup [workers]
+"""
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+
+async def worker(path: str, mode: str) -> None:
+    from database import Base
+    from data_loader import load_data
+    from migrations import run_migrations
+    from startup import prepare_database
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    started = time.perf_counter()
+    try:
+        if mode == "coordinated":
+            await prepare_database(engine, session_factory)
+        else:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+                await conn.run_sync(run_migrations)
+            await engine.dispose()
+            async with session_factory() as db:
+                await load_data(db)
+    finally:
+        await engine.dispose()
+    print(time.perf_counter() - started)
+
+
+def fleet(path: str, mode: str, workers: int) -> tuple[float, int]:
+    """
+    Boots `workers` processes at once; returns (seconds the slowest one spent on the
+    database, after its imports, and how many failed).
+    """
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.bench_startup", "--worker", path, mode],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+        )
+        for _ in range(workers)
+    ]
+    seconds, failures = 0.0, 0
+    for process in processes:
+        output = process.communicate()[0]
+        if process.returncode != 0:
+            failures += 1
+        else:
+            seconds = max(seconds, float(output))
+    return seconds, failures
+
+
+def main(workers: int) -> None:
+    directory = tempfile.mkdtemp(prefix="cinema-startup-")
+    path = os.path.join(directory, "startup.db")
+    try:
+        for mode in ("uncoordinated", "coordinated"):
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            seconds, failures = fleet(path, mode, workers)
+            print(f"{mode:>13}, cold: {seconds * 1000:7.0f} ms for {workers} workers, {failures} failed")
+            seconds, failures = fleet(path, mode, workers)
+            print(f"{mode:>13}, warm: {seconds * 1000:7.0f} ms for {workers} workers, {failures} failed")
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--worker"]:
+        asyncio.run(worker(sys.argv[2], sys.argv[3]))
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 8)
@@ -0,0 +1,78 @@
+"""
+Typo-tolerant title lookups against the in-process trigram index (title_index).
+
+    python -m benchmarks.bench_title_index [number of titles]
+"""
+import random
+import sys
+import time
+import tracemalloc
+from statistics import median
+
+from title_index import TitleIndex
+
+ONSETS = "b c d f g h j k l m n p r s t v w br cr dr fr gr pr tr st sh ch th".split()
+VOWELS = "a e i o u ea ou ai ie oo".split()
+CODAS = ["", "", "n", "r", "s", "t", "l", "nd", "rk", "ng", "ck", "st"]
+FILLERS = ["the", "of", "a", "and", "in", "return", "night", "last", "part", "ii"]
+
+
+def make_word() -> str:
+    return "".join(random.choice(ONSETS) + random.choice(VOWELS) for _ in range(random.randint(1, 3))) + random.choice(CODAS)
+
+
+def make_title(words: list) -> str:
+    parts = [random.choice(words) for _ in range(random.randint(1, 3))]
+    if random.random() < 0.5:
+        parts.insert(random.randrange(len(parts) + 1), random.choice(FILLERS))
+    return " ".join(parts).title()
+
+
+def misspell(title: str) -> str:
+    """One substitution in the longest word, e.g. 'Shawshank' -> 'Shawshenk'."""
+    word = max(title.split(), key=len)
+    position = random.randrange(1, len(word))
+    return title.replace(word, word[:position] + random.choice("aeioulnrst") + word[position + 1:], 1)
+
+
+def longest_word(title: str) -> str:
+    return max(title.split(), key=len)
+
+
+def main(size: int) -> None:
+    random.seed(12)
+    words = [make_word() for _ in range(size // 4)]
+    titles = [(str(i), make_title(words)) for i in range(size)]
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    index = TitleIndex()
+    index.rebuild(titles)
+    built = time.perf_counter() - started
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"built index over {size:,} titles in {built:.1f} s, {memory / 2**20:.0f} MiB")
+
+    sample = random.sample(titles, 500)
+    for label, make_query in [("misspelled word", lambda title: longest_word(misspell(title))),
+                              ("title with a typo", misspell)]:
+        samples, found = [], 0
+        for movie_id, title in sample:
+            query = make_query(title)
+            started = time.perf_counter()
+            results = index.search(query, 10)
+            samples.append(time.perf_counter() - started)
+            found += movie_id in {result for result, _ in results}
+        samples.sort()
+        print(f"{label:>18}: median {median(samples) * 1000:.2f} ms, "
+              f"p95 {samples[int(len(samples) * 0.95)] * 1000:.2f} ms, "
+              f"intended title in top 10 for {found / len(sample):.0%}")
+
+    started = time.perf_counter()
+    for movie_id, title in titles[:10_000]:
+        index.add(movie_id, title + " Redux")
+    print(f"incremental update: {(time.perf_counter() - started) / 10_000 * 1_000_000:.0f} µs per title")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300_000)
@@ -0,0 +1,90 @@
+"""
+PUT /movies/{movie_id} through update_movie versus the previous load, setattr,
+commit, refresh and reload path (with the router's get_movie pre-check), by
+statements sent to SQLite and latency.
+
+    python -m benchmarks.bench_updates [catalog size]
+"""
+import asyncio
+import random
+import sys
+from uuid import uuid4
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import selectinload
+
+from benchmarks.common import temp_database, measure
+from crud.movies import get_movie, update_movie
+from models import Director, Genre, Movie, MovieGenre
+from schemas.movies import MovieRead, MovieUpdate
+
+BATCH = 20_000
+
+
+async def previous_update_movie(movie_id: str, movie: MovieUpdate, db) -> MovieRead:
+    await get_movie(movie_id, db)
+    options = selectinload(Movie.genres_association).selectinload(MovieGenre.genre)
+    result = await db.execute(select(Movie).where(Movie.id == movie_id).options(options))
+    existing_movie = result.scalars().first()
+    update_data = movie.model_dump(exclude_unset=True)
+    if "genres" in update_data:
+        genre_ids = update_data.pop("genres")
+        result = await db.execute(select(Genre).where(Genre.id.in_(genre_ids)))
+        existing_movie.genres = result.scalars().all()
+    for key, value in update_data.items():
+        setattr(existing_movie, key, value)
+    await db.commit()
+    await db.refresh(existing_movie)
+    result = await db.execute(select(Movie).where(Movie.id == movie_id).options(options))
+    return MovieRead.model_validate(result.scalars().first())
+
+
+async def main(size: int) -> None:
+    random.seed(17)
+    async with temp_database() as (engine, session_factory):
+        director_id = str(uuid4())
+        genre_ids = [str(uuid4()) for _ in range(10)]
+        movie_ids = [str(uuid4()) for _ in range(size)]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Director).values(id=director_id, name="Director"))
+            await conn.execute(insert(Genre), [{"id": id, "name": f"Genre {i}"} for i, id in enumerate(genre_ids)])
+            for offset in range(0, size, BATCH):
+                chunk = movie_ids[offset:offset + BATCH]
+                await conn.execute(insert(Movie), [
+                    {"id": id, "title": f"Movie {id}", "description": "", "year": 2000, "rating": 5, "language": "English",
+                     "duration": 100, "trailer": "", "image": "", "director": director_id}
+                    for id in chunk
+                ])
+                await conn.execute(insert(MovieGenre), [
+                    {"movie_id": id, "genre_id": genre_id} for id in chunk for genre_id in random.sample(genre_ids, 2)
+                ])
+
+        statements = 0
+
+        def count(*args):
+            nonlocal statements
+            statements += 1
+
+        event.listen(engine.sync_engine, "before_cursor_execute", count)
+        cases = {
+            "rating": lambda: MovieUpdate(rating=random.randint(1, 10)),
+            "genres": lambda: MovieUpdate(genres=random.sample(genre_ids, 3)),
+        }
+        for name, make_update in cases.items():
+            for label, update in (("previous", previous_update_movie), ("update_movie", update_movie)):
+                async with session_factory() as db:
+                    statements = 0
+                    await update(random.choice(movie_ids), make_update(), db)
+                    per_call = statements
+
+                    async def one_put():
+                        # A request gets a fresh session, so nothing is cached between calls.
+                        db.expunge_all()
+                        await update(random.choice(movie_ids), make_update(), db)
+
+                    latency = await measure(one_put, repeat=200)
+                print(f"{name:>6} {label:>12}: {per_call:2d} statements  {latency / 1000:6.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
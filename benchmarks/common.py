@@ -0,0 +1,56 @@
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from statistics import median
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from database import Base, EngineSettings, make_engine
+from models import Auditorium, Cinema, Director, Movie
+
+
+@asynccontextmanager
+async def temp_database(settings: EngineSettings | None = None):
+    """
+    Yields (engine, session factory) for a fresh SQLite file that is removed afterwards,
+    so benchmarks never touch main.db. With `settings`, the engine is configured like
+    the application's; otherwise it uses SQLAlchemy's and SQLite's defaults.
+    """
+    directory = tempfile.mkdtemp(prefix="cinema-bench-")
+    path = os.path.join(directory, "bench.db")
+    url = f"sqlite+aiosqlite:///{path}"
+    engine = make_engine(url, settings) if settings else create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        yield engine, session_factory
+    finally:
+        await engine.dispose()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+async def measure(coro_factory, repeat: int = 200) -> float:
+    """Returns the median latency of `coro_factory()` in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - started)
+    return median(samples) * 1_000_000
+
+
+async def seed_auditorium(conn, capacity: int = 100, duration: int = 120) -> tuple[str, str]:
+    """Inserts a director, movie, cinema and auditorium; returns (movie_id, auditorium_id)."""
+    director_id, movie_id, cinema_id, auditorium_id = (str(uuid4()) for _ in range(4))
+    await conn.execute(insert(Director).values(id=director_id, name=director_id))
+    await conn.execute(insert(Movie).values(id=movie_id, title="Bench", duration=duration, director=director_id))
+    await conn.execute(insert(Cinema).values(id=cinema_id, name="Bench", location="-", number=1))
+    await conn.execute(insert(Auditorium).values(id=auditorium_id, name="Bench", cinema_id=cinema_id, capacity=capacity))
+    return movie_id, auditorium_id
@@ -0,0 +1,45 @@
+"""
+Bulk-loads movies from a JSONL or CSV file into the configured database.
+
+    python bulk_loader.py catalog.jsonl
+    python bulk_loader.py catalog.csv --batch-size 5000
+
+See crud/bulk.py for the record format. A running server only picks the new
+titles up in its fuzzy title search when it restarts; POST /movies/bulk adds
+them to it right away.
+"""
+import argparse
+import asyncio
+from typing import AsyncIterator
+
+from database import SessionLocal
+from crud.bulk import BULK_BATCH_SIZE, create_movies_bulk, read_records
+
+
+async def file_lines(path: str) -> AsyncIterator[str]:
+    with open(path, encoding="utf-8-sig", newline="") as file:
+        for line in file:
+            yield line.rstrip("\n")
+
+
+async def main(path: str, format: str, batch_size: int) -> None:
+    async with SessionLocal() as db:
+        result = await create_movies_bulk(read_records(file_lines(path), format), db, batch_size)
+    for error in result.errors:
+        print(f"record {error.index}: {error.detail}")
+    if result.failed > len(result.errors):
+        print(f"... and {result.failed - len(result.errors)} more failed records")
+    print(
+        f"Inserted {result.inserted} movies, {result.failed} failed, "
+        f"in {result.seconds:.1f} s ({result.rows_per_second:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load movies from JSONL or CSV.")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE, help="rows per commit")
+    args = parser.parse_args()
+    format = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    asyncio.run(main(args.path, format, args.batch_size))
@@ -1,7 +1,10 @@
 from models.auditorium import Auditorium
 from schemas.auditorium import AuditoriumCreate, AuditoriumRead, AuditoriumUpdate
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from crud.pagination import paginate
 from typing import List, Optional
 
 async def create_auditorium(db: AsyncSession, auditorium: AuditoriumCreate) -> AuditoriumRead:
@@ -18,39 +21,50 @@ async def get_auditorium(db: AsyncSession, auditorium_id: str) -> AuditoriumRead
         return AuditoriumRead.model_validate(db_auditorium)
     return None
 
-async def get_auditoriums(db: AsyncSession, skip: int = 0, limit: int = 100) -> dict:
-    total_result = await db.execute(select(func.count()).select_from(Auditorium))
-    total = total_result.scalar_one()
-
-    result = await db.execute(select(Auditorium).offset(skip).limit(limit))
-    db_auditoriums = result.scalars().all()
+async def get_auditoriums(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str | None = None, include_total: bool | None = None) -> dict:
+    db_auditoriums, total, next_cursor = await paginate(db, Auditorium, skip, limit, cursor, include_total)
     
     auditoriums = [AuditoriumRead.model_validate(auditorium) for auditorium in db_auditoriums]
-    page = (skip // limit) + 1 if limit > 0 else 1
+    page = ((skip // limit) + 1 if limit > 0 else 1) if cursor is None else None
     return {
         "auditoriums": auditoriums,
         "total": total,
         "page": page,
         "size": limit,
+        "next_cursor": next_cursor,
     }
 
 async def update_auditorium(db: AsyncSession, auditorium_id: str, auditorium_update: AuditoriumUpdate) -> AuditoriumRead | None:
-    result = await db.execute(select(Auditorium).filter(Auditorium.id == auditorium_id))
+    update_data = auditorium_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_auditorium(db, auditorium_id)
+    try:
+        result = await db.execute(
+            update(Auditorium)
+            .filter(Auditorium.id == auditorium_id)
+            .values(**update_data)
+            .returning(Auditorium)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        )
+    except IntegrityError:
+        # auditoriums.cinema_id must name an existing cinema.
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Cinema does not exist")
     db_auditorium = result.scalar_one_or_none()
     if not db_auditorium:
         return None
-    update_data = auditorium_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_auditorium, key, value)
     await db.commit()
-    await db.refresh(db_auditorium)
     return AuditoriumRead.model_validate(db_auditorium)
 
 async def delete_auditorium(db: AsyncSession, auditorium_id: str) -> AuditoriumRead | None:
-    result = await db.execute(select(Auditorium).filter(Auditorium.id == auditorium_id))
+    result = await db.execute(
+        delete(Auditorium)
+        .filter(Auditorium.id == auditorium_id)
+        .returning(Auditorium)
+        .execution_options(synchronize_session=False)
+    )
     db_auditorium = result.scalar_one_or_none()
     if not db_auditorium:
         return None
-    await db.delete(db_auditorium)
     await db.commit()
     return AuditoriumRead.model_validate(db_auditorium)
\ No newline at end of file
@@ -0,0 +1,97 @@
+from models.movie import Movie
+from models.director import Director
+from models.genre import Genre
+from models.movie_genre import MovieGenre
+from schemas.autocomplete import Completion
+from prefix_index import PrefixIndex
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from typing import Dict, List, Tuple
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Writes in this process mark the indexes stale immediately; the TTL bounds how
+# long writes made by other workers can go unseen.
+AUTOCOMPLETE_TTL_SECONDS = int(os.getenv("AUTOCOMPLETE_TTL_SECONDS", "300"))
+# A stale index is rebuilt in the background and keeps answering meanwhile. The
+# lookup that starts the rebuild waits this long for it, so on small catalogs a
+# write shows up on the next keypress.
+AUTOCOMPLETE_REFRESH_WAIT_MS = int(os.getenv("AUTOCOMPLETE_REFRESH_WAIT_MS", "50"))
+
+# Directors and genres have no rating of their own and rank by their movies' average.
+SOURCES = {
+    "movies": select(Movie.id, Movie.title, Movie.rating),
+    "directors": select(Director.id, Director.name, func.avg(Movie.rating))
+    .outerjoin(Movie, Movie.director == Director.id)
+    .group_by(Director.id),
+    "genres": select(Genre.id, Genre.name, func.avg(Movie.rating))
+    .outerjoin(MovieGenre, MovieGenre.genre_id == Genre.id)
+    .outerjoin(Movie, Movie.id == MovieGenre.movie_id)
+    .group_by(Genre.id),
+}
+
+# kind: (index, time it was loaded, generation it was loaded at)
+_indexes: Dict[str, Tuple[PrefixIndex, float, int]] = {}
+_locks = {kind: asyncio.Lock() for kind in SOURCES}
+_generations = {kind: 0 for kind in SOURCES}
+_refreshes: Dict[str, asyncio.Task] = {}
+
+
+def invalidate(*kinds: str) -> None:
+    for kind in kinds:
+        _generations[kind] += 1
+
+
+async def refresh(kind: str, db: AsyncSession) -> PrefixIndex:
+    """Rebuilds the index for `kind` from `db` and swaps it in."""
+    generation = _generations[kind]
+    result = await db.execute(SOURCES[kind])
+    # Building is CPU-bound (seconds for a million titles); a worker thread
+    # lets the event loop keep serving other requests meanwhile.
+    index = await asyncio.to_thread(PrefixIndex, result.all())
+    # Swapped in even if a write landed while loading: it is still newer than the
+    # index it replaces, and the generation it records keeps it stale.
+    _indexes[kind] = (index, time.monotonic(), generation)
+    return index
+
+
+async def _refresh_in_background(kind: str, bind) -> PrefixIndex | None:
+    # The request that started the rebuild may be gone before it ends, so it
+    # reads through a session of its own.
+    try:
+        async with AsyncSession(bind) as db:
+            return await refresh(kind, db)
+    except Exception:
+        logger.exception("Rebuilding the %s autocomplete index failed", kind)
+        return None
+
+
+async def _get_index(kind: str, db: AsyncSession) -> PrefixIndex:
+    loaded = _indexes.get(kind)
+    if loaded is None:
+        # Nothing to answer from yet, so the first lookups wait for the build.
+        async with _locks[kind]:
+            loaded = _indexes.get(kind)
+            if loaded is None:
+                return await refresh(kind, db)
+    index, loaded_at, generation = loaded
+    if generation == _generations[kind] and time.monotonic() - loaded_at < AUTOCOMPLETE_TTL_SECONDS:
+        return index
+    running = _refreshes.get(kind)
+    if running is not None and not running.done():
+        return index
+    running = _refreshes[kind] = asyncio.create_task(_refresh_in_background(kind, db.bind))
+    try:
+        refreshed = await asyncio.wait_for(asyncio.shield(running), AUTOCOMPLETE_REFRESH_WAIT_MS / 1000)
+    except asyncio.TimeoutError:
+        return index
+    return index if refreshed is None else refreshed
+
+
+async def autocomplete(kind: str, query: str, db: AsyncSession, limit: int = 10) -> List[Completion]:
+    index = await _get_index(kind, db)
+    return [Completion(id=entry_id, name=name, rating=rating) for entry_id, name, rating in index.complete(query, limit)]
@@ -0,0 +1,162 @@
+"""
+Streaming bulk load of movies from JSONL or CSV.
+
+Records are read one at a time from an async stream of lines, so neither the
+CLI nor POST /movies/bulk holds the whole file. Directors and genres are
+resolved through name -> id maps loaded once, and the valid rows go in with one
+executemany per table every `batch_size` rows, each batch in its own commit.
+Invalid rows are skipped and reported by their index in the stream.
+
+CSV files have a header row with the MovieBulkRow fields; `genres` holds the
+genre names separated by "|".
+"""
+from models.movie import Movie
+from models.movie_genre import MovieGenre
+from models.director import Director
+from models.genre import Genre
+from schemas.movies import MovieBulkRow, MovieBulkError, MovieBulkResult
+from title_index import title_index
+from crud.autocomplete import invalidate as invalidate_autocomplete
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert
+from typing import AsyncIterable, AsyncIterator, Dict, List, Literal
+from uuid import uuid4
+import codecs
+import csv
+import json
+import time
+
+BULK_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+GENRE_SEPARATOR = "|"
+
+
+async def read_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    """Splits a stream of UTF-8 byte chunks into lines."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def _validate(record) -> MovieBulkRow | str:
+    if not isinstance(record, dict):
+        return "Expected an object"
+    try:
+        return MovieBulkRow.model_validate(record)
+    except ValidationError as error:
+        return "; ".join(f"{'.'.join(map(str, item['loc']))}: {item['msg']}" for item in error.errors())
+
+
+async def read_records(lines: AsyncIterable[str], format: Literal["jsonl", "csv"] = "jsonl") -> AsyncIterator[MovieBulkRow | str]:
+    """Yields a MovieBulkRow per record, or the reason it is invalid."""
+    if format == "jsonl":
+        async for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield f"Invalid JSON: {error}"
+                continue
+            yield _validate(record)
+        return
+
+    header = None
+    pending = ""
+    async for line in lines:
+        # A quoted field may span lines; a record is complete once its quotes pair up.
+        pending += line if not pending else "\n" + line
+        if not pending.strip():
+            pending = ""
+            continue
+        if pending.count('"') % 2:
+            continue
+        text, pending = pending, ""
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as error:
+            yield f"Invalid CSV: {error}"
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        record = {name: value for name, value in zip(header, values) if value != ""}
+        if "genres" in record:
+            record["genres"] = [name.strip() for name in record["genres"].split(GENRE_SEPARATOR) if name.strip()]
+        yield _validate(record)
+    if pending.strip():
+        yield "Unterminated quoted field"
+
+
+async def _name_map(db: AsyncSession, model) -> Dict[str, str]:
+    rows = (await db.execute(select(model.id, model.name))).all()
+    names = {id: id for id, _ in rows}
+    names.update({name: id for id, name in rows if name is not None})
+    return names
+
+
+async def create_movies_bulk(
+    records: AsyncIterable[MovieBulkRow | str], db: AsyncSession, batch_size: int = BULK_BATCH_SIZE
+) -> MovieBulkResult:
+    started = time.perf_counter()
+    directors = await _name_map(db, Director)
+    genres = await _name_map(db, Genre)
+    movies: List[dict] = []
+    links: List[dict] = []
+    inserted = failed = 0
+    errors: List[MovieBulkError] = []
+
+    async def flush():
+        nonlocal inserted
+        await db.execute(insert(Movie.__table__), movies)
+        if links:
+            await db.execute(insert(MovieGenre.__table__), links)
+        await db.commit()
+        for movie in movies:
+            title_index.add(movie["id"], movie["title"])
+        invalidate_autocomplete("movies", "directors", "genres")
+        inserted += len(movies)
+        movies.clear()
+        links.clear()
+
+    index = -1
+    async for record in records:
+        index += 1
+        detail = record if isinstance(record, str) else None
+        if detail is None:
+            director_id = directors.get(record.director)
+            genre_ids = list(dict.fromkeys(genres.get(name) for name in record.genres))
+            if director_id is None:
+                detail = f"Director not found: {record.director}"
+            elif None in genre_ids:
+                detail = "Genre not found: " + ", ".join(name for name in record.genres if name not in genres)
+        if detail is not None:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(MovieBulkError(index=index, detail=detail))
+            continue
+
+        movie_id = str(uuid4())
+        movies.append({**record.model_dump(exclude={"genres"}), "id": movie_id, "director": director_id})
+        links.extend({"movie_id": movie_id, "genre_id": genre_id} for genre_id in genre_ids)
+        if len(movies) >= batch_size:
+            await flush()
+    if movies:
+        await flush()
+
+    seconds = time.perf_counter() - started
+    return MovieBulkResult(
+        inserted=inserted,
+        failed=failed,
+        errors=errors,
+        seconds=round(seconds, 3),
+        rows_per_second=round(inserted / seconds, 1) if seconds > 0 else 0.0,
+    )
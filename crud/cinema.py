@@ -1,7 +1,8 @@
 from schemas.cinema import CinemaCreate, CinemaUpdate, CinemaRead
 from models.cinema import Cinema
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, update, delete
+from crud.pagination import paginate
 from typing import List
 
 async def create_cinema(db: AsyncSession, cinema: CinemaCreate) -> CinemaRead:
@@ -18,44 +19,49 @@ async def get_cinema(db: AsyncSession, cinema_id: str) -> CinemaRead:
         return None
     return CinemaRead.model_validate(db_cinema)
 
-async def get_cinemas(db: AsyncSession, skip: int = 0, limit: int = 100) -> dict:
-    total_result = await db.execute(select(func.count()).select_from(Cinema))
-    total = total_result.scalar_one()
-    
-    result = await db.execute(select(Cinema).offset(skip).limit(limit))
-    db_cinemas = result.scalars().all()
+async def get_cinemas(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: str | None = None, include_total: bool | None = None) -> dict:
+    db_cinemas, total, next_cursor = await paginate(db, Cinema, skip, limit, cursor, include_total)
     
     cinemas = [CinemaRead.model_validate(cinema) for cinema in db_cinemas]
-    page = (skip // limit) + 1 if limit > 0 else 1
+    page = ((skip // limit) + 1 if limit > 0 else 1) if cursor is None else None
     return {
         "cinemas": cinemas,
         "total": total,
         "page": page,
         "size": limit,
+        "next_cursor": next_cursor,
     }
 
 async def update_cinema(db: AsyncSession, cinema_id: str, cinema_update: CinemaUpdate) -> CinemaRead:
-    result = await db.execute(select(Cinema).filter(Cinema.id == cinema_id))
+    update_data = cinema_update.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_cinema(db, cinema_id)
+
+    result = await db.execute(
+        update(Cinema)
+        .filter(Cinema.id == cinema_id)
+        .values(**update_data)
+        .returning(Cinema)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
     db_cinema = result.scalar_one_or_none()
-    
     if not db_cinema:
         return None
-        
-    update_data = cinema_update.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_cinema, key, value)
-        
+
     await db.commit()
-    await db.refresh(db_cinema)
     return CinemaRead.model_validate(db_cinema)
 
 async def delete_cinema(db: AsyncSession, cinema_id: str) -> CinemaRead:
-    result = await db.execute(select(Cinema).filter(Cinema.id == cinema_id))
+    # Auditoriums, their functions and seat holds go with it (ON DELETE CASCADE).
+    result = await db.execute(
+        delete(Cinema)
+        .filter(Cinema.id == cinema_id)
+        .returning(Cinema)
+        .execution_options(synchronize_session=False)
+    )
     db_cinema = result.scalar_one_or_none()
-
     if not db_cinema:
         return None
-        
-    await db.delete(db_cinema)
+
     await db.commit()
     return CinemaRead.model_validate(db_cinema)
\ No newline at end of file
@@ -2,12 +2,17 @@ from models.director import Director
 from schemas.director import DirectorCreate, DirectorRead, DirectorUpdate, DirectorList
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from crud.autocomplete import invalidate as invalidate_autocomplete
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException
+from crud.pagination import paginate
 
 async def create_director(director: DirectorCreate, db: AsyncSession) -> DirectorRead:
     new_director = Director(**director.model_dump())
     db.add(new_director)
     await db.commit()
+    invalidate_autocomplete("directors")
     await db.refresh(new_director)
     return DirectorRead.model_validate(new_director)
 
@@ -18,44 +23,62 @@ async def get_director(director_id: str, db: AsyncSession) -> DirectorRead | Non
         return None
     return DirectorRead.model_validate(director)
 
-async def get_directors(db: AsyncSession, page: int = 1, size: int = 10) -> DirectorList:
+async def get_directors_by_ids(director_ids: List[str], db: AsyncSession) -> List[DirectorRead | None]:
+    result = await db.execute(select(Director).filter(Director.id.in_(set(director_ids))))
+    directors = {director.id: DirectorRead.model_validate(director) for director in result.scalars().all()}
+    return [directors.get(director_id) for director_id in director_ids]
+
+async def get_directors(db: AsyncSession, page: int = 1, size: int = 10, cursor: str | None = None, include_total: bool | None = None) -> DirectorList:
     skip = (page - 1) * size
     
-    total_result = await db.execute(select(func.count(Director.id)))
-    total = total_result.scalar_one()
-
-    directors_query = await db.execute(select(Director).offset(skip).limit(size))
-    directors = [DirectorRead.model_validate(director) for director in directors_query.scalars().all()]
+    db_directors, total, next_cursor = await paginate(db, Director, skip, size, cursor, include_total)
+    directors = [DirectorRead.model_validate(director) for director in db_directors]
     
     return DirectorList(
         directors=directors,
         total=total,
-        page=page,
-        size=size
+        page=page if cursor is None else None,
+        size=size,
+        next_cursor=next_cursor
     )
 
 async def update_director(director_id: str, director: DirectorUpdate, db: AsyncSession) -> DirectorRead | None:
-    result = await db.execute(select(Director).filter(Director.id == director_id))
-    update_director = result.scalars().first()
-    
-    if not update_director:
-        return None
-    
     update_data = director.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(update_director, key, value)
-        
+    if not update_data:
+        return await get_director(director_id, db)
+
+    result = await db.execute(
+        update(Director)
+        .filter(Director.id == director_id)
+        .values(**update_data)
+        .returning(Director)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+    updated_director = result.scalars().first()
+    if not updated_director:
+        return None
+
     await db.commit()
-    await db.refresh(update_director)
-    return DirectorRead.model_validate(update_director)
+    invalidate_autocomplete("directors")
+    return DirectorRead.model_validate(updated_director)
 
 async def delete_director(director_id: str, db: AsyncSession) -> DirectorRead | None:
-    result = await db.execute(select(Director).filter(Director.id == director_id))
+    try:
+        result = await db.execute(
+            delete(Director)
+            .filter(Director.id == director_id)
+            .returning(Director)
+            .execution_options(synchronize_session=False)
+        )
+    except IntegrityError:
+        # movies.director is ON DELETE RESTRICT.
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Director still has movies")
     director = result.scalars().first()
     if not director:
         return None
-    
+
     deleted_director = DirectorRead.model_validate(director)
-    await db.delete(director)
     await db.commit()
+    invalidate_autocomplete("directors")
     return deleted_director
@@ -1,23 +1,143 @@
 from models.function import Function
-from schemas.function import FunctionCreate, FunctionList, FunctionUpdate, FunctionRead
+from models.auditorium import Auditorium
+from models.movie import Movie
+from schemas.function import FunctionCreate, FunctionList, FunctionUpdate, FunctionRead, ReservationRead, SeatMapRead, FunctionBulkError
 from sqlalchemy.orm import Session
-from typing import List
+from fastapi import HTTPException
+from typing import Callable, List
 from datetime import datetime
-from sqlalchemy import select, func
+from collections import defaultdict
+from sqlalchemy import select, func, update, delete, and_, or_
+from base64 import b64encode
+from uuid import uuid4
+from crud.pagination import paginate
+import seat_map
 
+SEAT_MAP_ATTEMPTS = 100
 
-async def create_function(db: Session, function: FunctionCreate) -> FunctionRead:
-    db_function = Function(**function.model_dump())
+
+async def create_function(db: Session, function: FunctionCreate, capacity: int | None = None, commit: bool = True) -> FunctionRead:
+    if capacity is None:
+        result = await db.execute(select(Auditorium.capacity).filter(Auditorium.id == function.auditorium_id))
+        capacity = result.scalar_one()
+    db_function = Function(
+        **function.model_dump(),
+        seat_map=seat_map.new_seat_map(capacity, function.available_seats),
+    )
     db.add(db_function)
+    if not commit:
+        # Callers batching functions into one transaction get them inserted together
+        # by a single flush at commit time, so the id is assigned here instead.
+        db_function.id = str(uuid4())
+        return FunctionRead.model_validate(db_function)
     await db.commit()
     await db.refresh(db_function)
-    db_function.start_time = datetime.strptime(
-        db_function.start_time, "%Y-%m-%d %H:%M:%S"
-    )
-    db_function.end_time = datetime.strptime(db_function.end_time, "%Y-%m-%d %H:%M:%S")
     return FunctionRead.model_validate(db_function)
 
 
+async def create_functions_bulk(db: Session, functions: List[FunctionCreate]) -> dict:
+    """
+    Validates a whole batch of functions in one pass and inserts the valid ones in
+    a single transaction. Invalid items are reported by their index in the batch.
+    """
+    errors = {}
+    movie_ids = {function.movie_id for function in functions}
+    result = await db.execute(select(Movie.id).filter(Movie.id.in_(movie_ids)))
+    existing_movie_ids = set(result.scalars().all())
+    auditorium_ids = {function.auditorium_id for function in functions}
+    result = await db.execute(select(Auditorium.id, Auditorium.capacity).filter(Auditorium.id.in_(auditorium_ids)))
+    capacities = dict(result.all())
+
+    now = datetime.now()
+    by_auditorium = defaultdict(list)
+    for index, function in enumerate(functions):
+        if function.movie_id not in existing_movie_ids:
+            errors[index] = "Movie not found"
+        elif function.auditorium_id not in capacities:
+            errors[index] = "Auditorium not found"
+        elif function.available_seats > capacities[function.auditorium_id]:
+            errors[index] = "Available seats cannot be greater than auditorium capacity"
+        elif function.start_time > function.end_time:
+            errors[index] = "Start time cannot be after end time"
+        elif function.start_time < now:
+            errors[index] = "Start time cannot be in the past"
+        else:
+            by_auditorium[function.auditorium_id].append((function.start_time, function.end_time, index))
+
+    windows = {
+        auditorium_id: (min(start for start, _, _ in items), max(end for _, end, _ in items))
+        for auditorium_id, items in by_auditorium.items()
+    }
+    existing = await get_auditorium_schedules(db, windows)
+    for auditorium_id, items in by_auditorium.items():
+        errors.update(_find_conflicts(existing[auditorium_id], sorted(items)))
+
+    created = []
+    for index, function in enumerate(functions):
+        if index not in errors:
+            created.append(await create_function(db, function, capacities[function.auditorium_id], commit=False))
+    await db.commit()
+    return {
+        "created": created,
+        "errors": [FunctionBulkError(index=index, detail=detail) for index, detail in sorted(errors.items())],
+    }
+
+
+async def get_auditorium_schedules(db: Session, windows: dict) -> dict:
+    """
+    Returns {auditorium_id: [(start_time, end_time), ...]} in start order for every
+    function that can overlap the auditorium's (window_start, window_end) window,
+    with one ordered range scan per auditorium in a single query. Each range is the
+    functions starting inside the window plus the last one starting before it,
+    which is the only earlier function that can still be running.
+    """
+    ranges = []
+    for auditorium_id, (window_start, window_end) in windows.items():
+        previous_start = (
+            select(func.max(Function.start_time))
+            .filter(Function.auditorium_id == auditorium_id, Function.start_time < window_start)
+            .scalar_subquery()
+        )
+        ranges.append(and_(
+            Function.auditorium_id == auditorium_id,
+            Function.start_time >= func.coalesce(previous_start, window_start),
+            Function.start_time < window_end,
+        ))
+    schedules = defaultdict(list)
+    if not ranges:
+        return schedules
+    result = await db.execute(
+        select(Function.auditorium_id, Function.start_time, Function.end_time)
+        .filter(or_(*ranges))
+        .order_by(Function.auditorium_id, Function.start_time)
+    )
+    for auditorium_id, start_time, end_time in result.all():
+        schedules[auditorium_id].append((start_time, end_time))
+    return schedules
+
+
+def _find_conflicts(existing: list, items: list) -> dict:
+    """
+    Sweep line over one auditorium. `existing` and `items` are (start, end[, index])
+    tuples sorted by start; existing functions never overlap each other.
+    """
+    conflicts = {}
+    position = 0
+    busy_until = None
+    for start, end, index in items:
+        # Skip existing functions that end before this item starts; the next one is
+        # the only candidate for an overlap because existing ends are sorted too.
+        while position < len(existing) and existing[position][1] <= start:
+            position += 1
+        if position < len(existing) and existing[position][0] < end:
+            conflicts[index] = "Auditorium is not free"
+        elif busy_until is not None and start < busy_until:
+            conflicts[index] = "Overlaps another function in the batch"
+        else:
+            busy_until = end
+    return conflicts
+
+
 async def get_function(db: Session, function_id: str) -> FunctionRead | None:
     result = await db.execute(select(Function).filter(Function.id == function_id))
     db_function = result.scalar_one_or_none()
@@ -26,41 +146,145 @@ async def get_function(db: Session, function_id: str) -> FunctionRead | None:
     return FunctionRead.model_validate(db_function)
 
 
-async def get_functions(db: Session, skip: int = 0, limit: int = 100) -> FunctionList:
-    total = await db.execute(select(func.count(Function.id)))
-    total = total.scalar()
-    result = await db.execute(select(Function).offset(skip).limit(limit))
-    db_functions = result.scalars().all()
+async def get_functions(db: Session, skip: int = 0, limit: int = 100, cursor: str | None = None, include_total: bool | None = None) -> FunctionList:
+    db_functions, total, next_cursor = await paginate(db, Function, skip, limit, cursor, include_total)
     functions = [FunctionRead.model_validate(function) for function in db_functions]
-    page = (skip // limit) + 1 if limit > 0 else 1
+    page = ((skip // limit) + 1 if limit > 0 else 1) if cursor is None else None
     return {
         "functions": functions,
         "total": total,
         "page": page,
         "size": limit,
+        "next_cursor": next_cursor,
     }
 
 
-async def get_active_functions(db: Session) -> List[FunctionRead]:
-    now = datetime.now()
-    result = await db.execute(select(Function))
-    functions_list = result.scalars().all()
-    active_functions = []
-    for function in functions_list:
-        function_start_time = datetime.strptime(
-            function.start_time, "%Y-%m-%d %H:%M:%S"
+async def get_active_functions(
+    db: Session,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cinema_id: str | None = None,
+    movie_id: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> List[FunctionRead]:
+    # Functions starting in [start, end), upcoming ones by default, in start order
+    # so every page is a contiguous range of ix_functions_start_time.
+    query = select(Function).filter(Function.start_time >= (start or datetime.now()))
+    if end is not None:
+        query = query.filter(Function.start_time < end)
+    if movie_id is not None:
+        query = query.filter(Function.movie_id == movie_id)
+    if cinema_id is not None:
+        query = query.filter(
+            Function.auditorium_id.in_(select(Auditorium.id).filter(Auditorium.cinema_id == cinema_id))
+        )
+    result = await db.execute(
+        query.order_by(Function.start_time, Function.id).offset(skip).limit(limit)
+    )
+    return [FunctionRead.model_validate(function) for function in result.scalars().all()]
+
+
+async def get_seat_map(db: Session, function_id: str) -> SeatMapRead | None:
+    result = await db.execute(
+        select(Function.seat_map, Function.available_seats, Auditorium.capacity)
+        .join(Auditorium, Function.auditorium_id == Auditorium.id)
+        .filter(Function.id == function_id)
+    )
+    row = result.one_or_none()
+    if not row:
+        return None
+    return SeatMapRead(
+        function_id=function_id,
+        capacity=row.capacity,
+        available_seats=row.available_seats,
+        seat_map=b64encode(row.seat_map).decode(),
+    )
+
+
+async def update_seat_map(
+    db: Session, function_id: str, change: Callable[[bytearray, int], List[int]]
+) -> tuple[List[int], int] | None:
+    """
+    Applies `change` to the function's seat map, given with its auditorium's
+    capacity, with a compare-and-swap UPDATE and returns (seats changed, available
+    seats), or None if the function does not exist.
+    The UPDATE only matches while the map is still the one `change` saw, so
+    concurrent writers never lose each other's seats and no lock is held between
+    the read and the write. A lost race changes nothing, so it is retried in the
+    same transaction, and the caller commits the change together with whatever
+    else it wrote in that transaction.
+    """
+    for _ in range(SEAT_MAP_ATTEMPTS):
+        result = await db.execute(
+            select(Function.seat_map, Auditorium.capacity)
+            .join(Auditorium, Function.auditorium_id == Auditorium.id)
+            .filter(Function.id == function_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        current = row.seat_map
+        updated = bytearray(current)
+        seats = change(updated, row.capacity)
+        result = await db.execute(
+            update(Function)
+            .filter(Function.id == function_id, Function.seat_map == current)
+            .values(seat_map=bytes(updated), available_seats=seat_map.count_free(updated))
+            .returning(Function.available_seats)
+            .execution_options(synchronize_session=False)
         )
-        if function_start_time < now:
-            active_functions.append(FunctionRead.model_validate(function))
-    return active_functions
+        available_seats = result.scalar_one_or_none()
+        if available_seats is not None:
+            return seats, available_seats
+    raise HTTPException(status_code=409, detail="Seat map is busy, please retry")
+
+
+def take_seats(seats: int | None = None, seat_numbers: List[int] | None = None) -> Callable[[bytearray, int], List[int]]:
+    def change(current: bytearray, capacity: int) -> List[int]:
+        if seat_numbers is None:
+            chosen = seat_map.free_seats(current, seats)
+            if len(chosen) < seats:
+                raise HTTPException(status_code=409, detail="Not enough available seats")
+        else:
+            # The map is padded to whole bytes, and an auditorium resized after the
+            # function was created may not match it, so both bound the seat numbers.
+            last_seat = min(capacity, seat_map.size(current))
+            if len(set(seat_numbers)) != len(seat_numbers) or any(
+                seat < 1 or seat > last_seat for seat in seat_numbers
+            ):
+                raise HTTPException(status_code=400, detail="Invalid seat number")
+            if not all(seat_map.is_free(current, seat) for seat in seat_numbers):
+                raise HTTPException(status_code=409, detail="Seat not available")
+            chosen = sorted(seat_numbers)
+        seat_map.take(current, chosen)
+        return chosen
+    return change
+
+
+async def reserve_seats(
+    db: Session, function_id: str, seats: int | None = None, seat_numbers: List[int] | None = None
+) -> ReservationRead | None:
+    updated = await update_seat_map(db, function_id, take_seats(seats, seat_numbers))
+    if updated is None:
+        return None
+    await db.commit()
+    chosen, available_seats = updated
+    return ReservationRead(
+        function_id=function_id, seats=len(chosen), seat_numbers=chosen, available_seats=available_seats
+    )
 
 
 async def delete_function(db: Session, function_id: str) -> FunctionRead | None:
-    result = await db.execute(select(Function).filter(Function.id == function_id))
+    result = await db.execute(
+        delete(Function)
+        .filter(Function.id == function_id)
+        .returning(Function)
+        .execution_options(synchronize_session=False)
+    )
     db_function = result.scalar_one_or_none()
     if not db_function:
         return None
-    await db.delete(db_function)
     await db.commit()
     return FunctionRead.model_validate(db_function)
 
@@ -68,18 +292,21 @@ async def delete_function(db: Session, function_id: str) -> FunctionRead | None:
 async def check_auditorium_free(
     db: Session, auditorium_id: str, start_time: datetime, end_time: datetime
 ):
-    format_string = "%Y-%m-%d %H:%M:%S"
+    # Functions in an auditorium never overlap each other, so the one that starts
+    # last before the new function ends is the only one that can still be running
+    # when it starts. This is a single seek on ix_functions_auditorium_schedule
+    # instead of a scan over the auditorium's whole history.
     result = await db.execute(
-        select(Function).filter(Function.auditorium_id == auditorium_id)
+        select(Function.end_time)
+        .filter(
+            Function.auditorium_id == auditorium_id,
+            Function.start_time < end_time,
+        )
+        .order_by(Function.start_time.desc())
+        .limit(1)
     )
-    auditorium_functions_db = result.scalars().all()
-    if not auditorium_functions_db:
+    previous_end_time = result.scalar_one_or_none()
+    if previous_end_time is None:
         return True
-    for function in auditorium_functions_db:
-        start_time_datetime = datetime.strptime(function.start_time, format_string)
-        end_time_datetime = datetime.strptime(function.end_time, format_string)
-        # An overlap occurs if the new function starts before the existing one ends,
-        # and the new function ends after the existing one starts.
-        if (start_time < end_time_datetime) and (end_time > start_time_datetime):
-            return False  # Overlap found, auditorium is not free
-    return True  # No overlaps found
\ No newline at end of file
+    # An overlap occurs if the new function starts before the existing one ends.
+    return previous_end_time <= start_time
@@ -1,13 +1,16 @@
 from models.genre import Genre
 from schemas.genre import GenreCreate, GenreRead, GenreUpdate, GenreList
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.sql import func
+from crud.autocomplete import invalidate as invalidate_autocomplete
+from sqlalchemy import select, update, delete
+from crud.pagination import paginate
+from typing import List
 
 async def create_genre(genre: GenreCreate, db: AsyncSession) -> GenreRead:
     new_genre = Genre(**genre.model_dump())
     db.add(new_genre)
     await db.commit()
+    invalidate_autocomplete("genres")
     await db.refresh(new_genre)
     return GenreRead.model_validate(new_genre)
 
@@ -18,17 +21,20 @@ async def get_genre(genre_id: str, db: AsyncSession) -> GenreRead | None:
         return None
     return GenreRead.model_validate(genre)
 
-async def get_genres(db: AsyncSession, page: int = 1, size: int = 10) -> GenreList:
+async def get_genres_by_ids(genre_ids: List[str], db: AsyncSession) -> List[GenreRead | None]:
+    result = await db.execute(select(Genre).filter(Genre.id.in_(set(genre_ids))))
+    genres = {genre.id: GenreRead.model_validate(genre) for genre in result.scalars().all()}
+    return [genres.get(genre_id) for genre_id in genre_ids]
+
+async def get_genres(db: AsyncSession, page: int = 1, size: int = 10, cursor: str | None = None, include_total: bool | None = None) -> GenreList:
     skip = (page - 1) * size
-    total_result = await db.execute(select(func.count(Genre.id)))
-    total = total_result.scalar()
-    genres_result = await db.execute(select(Genre).offset(skip).limit(size))
-    genres = genres_result.scalars().all()
+    genres, total, next_cursor = await paginate(db, Genre, skip, size, cursor, include_total)
     return GenreList(
         genres=[GenreRead.model_validate(genre) for genre in genres],
         total=total,
-        page=page,
-        size=size
+        page=page if cursor is None else None,
+        size=size,
+        next_cursor=next_cursor
     )
 
 async def get_genre_by_name(name: str, db: AsyncSession) -> GenreRead | None:
@@ -39,24 +45,36 @@ async def get_genre_by_name(name: str, db: AsyncSession) -> GenreRead | None:
     return GenreRead.model_validate(genre)
 
 async def update_genre(genre_id: str, genre: GenreUpdate, db: AsyncSession) -> GenreRead:
-    result = await db.execute(select(Genre).filter(Genre.id == genre_id))
+    update_data = genre.model_dump(exclude_unset=True)
+    if not update_data:
+        return await get_genre(genre_id, db)
+
+    result = await db.execute(
+        update(Genre)
+        .filter(Genre.id == genre_id)
+        .values(**update_data)
+        .returning(Genre)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
     existing_genre = result.scalar_one_or_none()
     if not existing_genre:
         return None
-    
-    update_data = genre.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(existing_genre, key, value)
 
     await db.commit()
-    await db.refresh(existing_genre)
+    invalidate_autocomplete("genres")
     return GenreRead.model_validate(existing_genre)
 
 async def delete_genre(genre_id: str, db: AsyncSession) -> GenreRead:
-    result = await db.execute(select(Genre).filter(Genre.id == genre_id))
+    # The movie_genre links are removed by the database (ON DELETE CASCADE).
+    result = await db.execute(
+        delete(Genre)
+        .filter(Genre.id == genre_id)
+        .returning(Genre)
+        .execution_options(synchronize_session=False)
+    )
     genre = result.scalar_one_or_none()
     if not genre:
         return None
-    await db.delete(genre)
     await db.commit()
+    invalidate_autocomplete("genres")
     return GenreRead.model_validate(genre)
\ No newline at end of file
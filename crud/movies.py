@@ -1,37 +1,75 @@
 from models.movie import Movie
 from models.genre import Genre
 from models.movie_genre import MovieGenre
-from schemas.movies import MovieCreate, MovieRead, MovieUpdate, MovieList
+from models.director import Director
+from schemas.movies import MovieCreate, MovieRead, MovieUpdate, MovieList, MovieSearchHit, MovieSearchResult, MovieFilter, MovieFacet, MovieFacets, MovieFacetedResult
 from fastapi import HTTPException
 from typing import List
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, text, or_, String, cast, literal, null, union_all, update, delete, insert
 from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
+from crud.pagination import paginate
+from title_index import TitleIndex, title_index
+from crud.autocomplete import invalidate as invalidate_autocomplete
+from uuid import uuid4
+import asyncio
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+# Writes in this process update the title index directly; the TTL bounds how long
+# writes made by other workers can go unseen by fuzzy title lookups.
+TITLE_INDEX_TTL_SECONDS = int(os.getenv("TITLE_INDEX_TTL_SECONDS", "300"))
+
+_title_index_loaded_at = None
+_title_index_lock = asyncio.Lock()
+_title_index_refresh: asyncio.Task | None = None
 
 
 async def create_movie(movie: MovieCreate, db: AsyncSession) -> MovieRead:
-    print("Creating movie:", movie)
+    """
+    Checks the director and every genre with one query, then inserts the movie
+    with RETURNING and its genre links in one executemany. The response is built
+    from those rows, so nothing is read back.
+    """
     movie_data = movie.model_dump()
-    genre_ids = movie_data.pop("genres")
-
-    result = await db.execute(select(Genre).where(Genre.id.in_(genre_ids)))
-    db_genres = result.scalars().all()
+    genre_ids = list(dict.fromkeys(movie_data.pop("genres")))
 
-    if len(db_genres) != len(genre_ids):
-        raise HTTPException(status_code=404, detail="One or more genres not found")
+    references = union_all(
+        select(literal("director").label("kind"), Director.id, Director.name, null().label("description"))
+        .where(Director.id == movie.director),
+        select(literal("genre").label("kind"), Genre.id, Genre.name, Genre.description)
+        .where(Genre.id.in_(genre_ids)),
+    )
+    rows = (await db.execute(references)).all()
+    if not any(row.kind == "director" for row in rows):
+        raise HTTPException(status_code=400, detail="Director not found")
+    genres = {row.id: row for row in rows if row.kind == "genre"}
+    if len(genres) != len(genre_ids):
+        raise HTTPException(status_code=400, detail="Genre not found")
 
-    new_movie = Movie(**movie_data)
-    new_movie.genres = db_genres
-    
-    db.add(new_movie)
+    movie_id = str(uuid4())
+    result = await db.execute(insert(Movie).values(id=movie_id, **movie_data).returning(*Movie.__table__.columns))
+    created_movie = result.one()
+    if genre_ids:
+        await db.execute(insert(MovieGenre), [{"movie_id": movie_id, "genre_id": genre_id} for genre_id in genre_ids])
     await db.commit()
-    await db.refresh(new_movie)
-    
-    result = await db.execute(select(Movie).where(Movie.id == new_movie.id).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    created_movie = result.scalars().first()
-    
-    return MovieRead.model_validate(created_movie)
+    title_index.add(movie_id, created_movie.title)
+    # Directors and genres rank by their movies' average rating, which an
+    # unrated movie doesn't move.
+    if created_movie.rating is None:
+        invalidate_autocomplete("movies")
+    else:
+        invalidate_autocomplete("movies", "directors", "genres")
+    return MovieRead.model_validate({
+        **created_movie._mapping,
+        "genres": [{"id": genre_id, "name": genres[genre_id].name, "description": genres[genre_id].description} for genre_id in genre_ids],
+    })
 
 async def get_movie(movie_id: str, db: AsyncSession) -> MovieRead:
     result = await db.execute(select(Movie).where(Movie.id == movie_id).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
@@ -40,6 +78,12 @@ async def get_movie(movie_id: str, db: AsyncSession) -> MovieRead:
         return None
     return MovieRead.model_validate(movie)
 
+async def get_movies_by_ids(movie_ids: List[str], db: AsyncSession) -> List[MovieRead | None]:
+    """One IN query for all ids (plus one for their genres), in request order, None for misses."""
+    result = await db.execute(select(Movie).where(Movie.id.in_(set(movie_ids))).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
+    movies = {movie.id: MovieRead.model_validate(movie) for movie in result.scalars().all()}
+    return [movies.get(movie_id) for movie_id in movie_ids]
+
 async def get_movie_by_title(title: str, db: AsyncSession) -> MovieRead:
     result = await db.execute(select(Movie).where(Movie.title == title).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
     movie = result.scalars().first()
@@ -47,64 +91,332 @@ async def get_movie_by_title(title: str, db: AsyncSession) -> MovieRead:
         return None
     return MovieRead.model_validate(movie)
 
-async def get_list_of_movies_by_title_like(name: str, db: AsyncSession):
-    result = await db.execute(select(Movie).where(Movie.title.like(f"%{name}%")).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    movies_query = result.scalars().all()
-    return [MovieRead.model_validate(movie) for movie in movies_query]
+def _fts_query(query: str, columns: str) -> str | None:
+    # Every word of the user's input becomes a quoted term, so FTS5 syntax in the
+    # input is never interpreted. Only the last word, the one still being typed,
+    # is a prefix term: each prefix term merges the postings of every word it
+    # starts, which made multi-word queries several times slower.
+    words = re.findall(r"\w+", query)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return "{%s} : (%s)" % (columns, " ".join(terms))
 
-async def get_movies_by_genre(genre_id: str, db: AsyncSession) -> List[MovieRead]:
-    result = await db.execute(select(Movie).where(Movie.genres.any(id=genre_id)).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    movies = result.scalars().all()
+
+async def _get_movies_in_order(movie_ids: List[str], db: AsyncSession) -> List[Movie]:
+    result = await db.execute(select(Movie).where(Movie.id.in_(movie_ids)).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
+    movies = {movie.id: movie for movie in result.scalars().all()}
+    return [movies[movie_id] for movie_id in movie_ids if movie_id in movies]
+
+
+async def get_list_of_movies_by_title_like(name: str, db: AsyncSession, page: int = 1, size: int = 10) -> List[MovieRead]:
+    skip = (page - 1) * size
+    if db.bind.dialect.name != "sqlite":
+        result = await db.execute(
+            select(Movie).where(Movie.title.like(f"%{name}%")).order_by(Movie.title, Movie.id).offset(skip).limit(size)
+            .options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre))
+        )
+        return [MovieRead.model_validate(movie) for movie in result.scalars().all()]
+    match = _fts_query(name, "title")
+    if match is None:
+        return []
+    # Only the page's ids are taken from the index, best rank first, so a common
+    # word loads `size` movies instead of every match.
+    result = await db.execute(
+        text("SELECT movie_id FROM movies_fts WHERE movies_fts MATCH :match ORDER BY rank LIMIT :limit OFFSET :offset"),
+        {"match": match, "limit": size, "offset": skip},
+    )
+    movies = await _get_movies_in_order(list(result.scalars().all()), db)
     return [MovieRead.model_validate(movie) for movie in movies]
 
-async def get_movies(db: AsyncSession, page: int = 1, size: int = 10) -> MovieList:
+
+def _build_title_index(titles) -> TitleIndex:
+    index = TitleIndex()
+    index.rebuild(titles)
+    return index
+
+
+async def load_title_index(db: AsyncSession) -> None:
+    global _title_index_loaded_at
+    # Writes in this process while loading may be missing from the rows read;
+    # the journal replays them onto the new index before it is swapped in.
+    title_index.start_journal()
+    try:
+        result = await db.execute(select(Movie.id, Movie.title))
+        # The build takes seconds at a million titles, so it runs off the event loop.
+        index = await asyncio.to_thread(_build_title_index, result.all())
+    except BaseException:
+        title_index.end_journal()
+        raise
+    title_index.replace(index)
+    _title_index_loaded_at = time.monotonic()
+
+
+async def _reload_title_index(bind) -> None:
+    # Outlives the request that started it, so it reads through its own session.
+    try:
+        async with AsyncSession(bind) as db:
+            await load_title_index(db)
+    except Exception:
+        logger.exception("Reloading the title index failed")
+
+
+async def _refresh_title_index(db: AsyncSession) -> None:
+    global _title_index_refresh
+    if _title_index_loaded_at is None:
+        # Nothing to answer from yet, so the first lookups wait for the load.
+        async with _title_index_lock:
+            if _title_index_loaded_at is None:
+                await load_title_index(db)
+        return
+    if time.monotonic() - _title_index_loaded_at < TITLE_INDEX_TTL_SECONDS:
+        return
+    # Lookups keep answering from the current index until the reload swaps in.
+    if _title_index_refresh is None or _title_index_refresh.done():
+        _title_index_refresh = asyncio.create_task(_reload_title_index(db.bind))
+
+
+async def get_list_of_movies_by_title_fuzzy(name: str, db: AsyncSession, limit: int = 10) -> List[MovieRead]:
+    # Candidates come from the in-process trigram index, best match first; ids the
+    # index still holds for rows deleted elsewhere simply don't come back.
+    await _refresh_title_index(db)
+    matches = title_index.search(name, limit)
+    movies = await _get_movies_in_order([movie_id for movie_id, _ in matches], db)
+    return [MovieRead.model_validate(movie) for movie in movies]
+
+
+async def search_movies(query: str, db: AsyncSession, page: int = 1, size: int = 10) -> MovieSearchResult:
+    """
+    Full-text search over titles, descriptions and director names, ranked by BM25
+    with title matches weighted highest, with a highlighted snippet per hit.
+    """
+    if db.bind.dialect.name != "sqlite":
+        return await _search_movies_like(query, db, page, size)
+    match = _fts_query(query, "title description director")
+    if match is None:
+        return MovieSearchResult(results=[], total=0, page=page, size=size)
     skip = (page - 1) * size
-    total_result = await db.execute(select(func.count(Movie.id)))
+    total_result = await db.execute(text("SELECT count(*) FROM movies_fts WHERE movies_fts MATCH :match"), {"match": match})
     total = total_result.scalar()
-    
-    result = await db.execute(select(Movie).offset(skip).limit(size).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
+    result = await db.execute(
+        text(
+            "SELECT movie_id, bm25(movies_fts, 0.0, 10.0, 1.0, 5.0) AS score, "
+            "snippet(movies_fts, -1, '<b>', '</b>', '…', 16) AS snippet "
+            "FROM movies_fts WHERE movies_fts MATCH :match "
+            "ORDER BY score LIMIT :limit OFFSET :offset"
+        ),
+        {"match": match, "limit": size, "offset": skip},
+    )
+    hits = result.all()
+    movies = {movie.id: movie for movie in await _get_movies_in_order([hit.movie_id for hit in hits], db)}
+    return MovieSearchResult(
+        results=[
+            MovieSearchHit(movie=MovieRead.model_validate(movies[hit.movie_id]), score=-hit.score, snippet=hit.snippet)
+            for hit in hits if hit.movie_id in movies
+        ],
+        total=total,
+        page=page,
+        size=size,
+    )
+
+
+async def _search_movies_like(query: str, db: AsyncSession, page: int, size: int) -> MovieSearchResult:
+    # Databases without FTS5 fall back to unranked substring matching.
+    pattern = f"%{query}%"
+    condition = or_(Movie.title.ilike(pattern), Movie.description.ilike(pattern), Director.name.ilike(pattern))
+    base = select(Movie).join(Director, Director.id == Movie.director).where(condition)
+    total_result = await db.execute(select(func.count()).select_from(base.subquery()))
+    result = await db.execute(base.order_by(Movie.title).offset((page - 1) * size).limit(size).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
+    return MovieSearchResult(
+        results=[MovieSearchHit(movie=MovieRead.model_validate(movie), score=0.0, snippet=movie.title or "") for movie in result.scalars().all()],
+        total=total_result.scalar(),
+        page=page,
+        size=size,
+    )
+
+def _filter_movies(query, filters: MovieFilter):
+    if filters.year_from is not None:
+        query = query.where(Movie.year >= filters.year_from)
+    if filters.year_to is not None:
+        query = query.where(Movie.year <= filters.year_to)
+    if filters.min_rating is not None:
+        query = query.where(Movie.rating >= filters.min_rating)
+    if filters.language is not None:
+        query = query.where(Movie.language == filters.language)
+    if filters.director is not None:
+        query = query.where(Movie.director == filters.director)
+    if filters.max_duration is not None:
+        query = query.where(Movie.duration <= filters.max_duration)
+    if filters.genres:
+        # One uncorrelated pass over movie_genre instead of an EXISTS per movie;
+        # "all" keeps the movies that matched every requested genre.
+        genre_ids = list(dict.fromkeys(filters.genres))
+        matching = select(MovieGenre.movie_id).where(MovieGenre.genre_id.in_(genre_ids))
+        if filters.genre_match == "all":
+            matching = matching.group_by(MovieGenre.movie_id).having(func.count() == len(genre_ids))
+        query = query.where(Movie.id.in_(matching))
+    return query
+
+
+async def search_movies_faceted(filters: MovieFilter, db: AsyncSession, page: int = 1, size: int = 10) -> MovieFacetedResult:
+    """
+    Movies matching every given filter, best rated first, with the number of matches
+    per genre, language and decade. The total and all facets come from one statement
+    over the matches: a (language, decade) grouping that also yields the total, and
+    the per-genre counts, joined by UNION ALL.
+    """
+    filtered = filters != MovieFilter()
+    matches = _filter_movies(select(Movie.id, Movie.language, Movie.year), filters).cte("matches")
+    decade = cast((matches.c.year // 10) * 10, String)
+    genre_counts = select(MovieGenre.genre_id, func.count().label("count")).group_by(MovieGenre.genre_id)
+    if filtered:
+        genre_counts = genre_counts.where(MovieGenre.movie_id.in_(select(matches.c.id)))
+    genre_counts = genre_counts.subquery()
+    facet_query = union_all(
+        select(literal("cell").label("facet"), matches.c.language.label("value"), decade.label("label"), func.count().label("count"))
+        .group_by(matches.c.language, decade),
+        select(literal("genre"), Genre.id, Genre.name, genre_counts.c.count)
+        .join(genre_counts, genre_counts.c.genre_id == Genre.id),
+    )
+    total = 0
+    languages, decades, genres = {}, {}, []
+    for row in (await db.execute(facet_query)).all():
+        if row.facet == "genre":
+            genres.append(MovieFacet(value=row.value, label=row.label, count=row.count))
+            continue
+        total += row.count
+        if row.value is not None:
+            languages[row.value] = languages.get(row.value, 0) + row.count
+        if row.label is not None:
+            decades[row.label] = decades.get(row.label, 0) + row.count
+    facets = MovieFacets(
+        genres=genres,
+        languages=[MovieFacet(value=language, label=language, count=count) for language, count in languages.items()],
+        decades=[MovieFacet(value=decade, label=f"{decade}s", count=count) for decade, count in decades.items()],
+    )
+    for values in (facets.genres, facets.languages, facets.decades):
+        values.sort(key=lambda facet: (-facet.count, facet.label))
+
+    result = await db.execute(
+        _filter_movies(select(Movie), filters)
+        .order_by(Movie.rating.desc().nulls_last(), Movie.id)
+        .offset((page - 1) * size)
+        .limit(size)
+        .options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre))
+    )
+    return MovieFacetedResult(
+        movies=[MovieRead.model_validate(movie) for movie in result.scalars().all()],
+        total=total,
+        page=page,
+        size=size,
+        facets=facets,
+    )
+
+async def get_movies_by_genre(genre_id: str, db: AsyncSession) -> List[MovieRead]:
+    # An uncorrelated IN over ix_movie_genre_genre, not an EXISTS per movie.
+    genre_movies = select(MovieGenre.movie_id).where(MovieGenre.genre_id == genre_id)
+    result = await db.execute(select(Movie).where(Movie.id.in_(genre_movies)).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
     movies = result.scalars().all()
+    return [MovieRead.model_validate(movie) for movie in movies]
+
+async def get_movies(db: AsyncSession, page: int = 1, size: int = 10, cursor: str | None = None, include_total: bool | None = None) -> MovieList:
+    skip = (page - 1) * size
+    movies, total, next_cursor = await paginate(
+        db, Movie, skip, size, cursor, include_total,
+        options=[selectinload(Movie.genres_association).selectinload(MovieGenre.genre)],
+    )
     
     return MovieList(
         movies=[MovieRead.model_validate(movie) for movie in movies],
         total=total,
-        page=page,
-        size=size
+        page=page if cursor is None else None,
+        size=size,
+        next_cursor=next_cursor
     )
 
 async def update_movie(movie_id: str, movie: MovieUpdate, db: AsyncSession) -> MovieRead:
-    result = await db.execute(select(Movie).where(Movie.id == movie_id).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    existing_movie = result.scalars().first()
+    """
+    Updates the movie's columns with one UPDATE ... RETURNING and, when `genres`
+    is given, replaces its genres by deleting and inserting only the links that
+    changed. The response is built from the returned row without reloading it.
+    """
+    update_data = movie.model_dump(exclude_unset=True)
+    genre_ids = update_data.pop("genres", None)
+    if genre_ids is not None:
+        genre_ids = list(dict.fromkeys(genre_ids))
 
-    if not existing_movie:
+    columns = Movie.__table__.columns
+    if update_data:
+        try:
+            result = await db.execute(
+                update(Movie)
+                .where(Movie.id == movie_id)
+                .values(**update_data)
+                .returning(*columns)
+                .execution_options(synchronize_session=False)
+            )
+        except IntegrityError:
+            # movies.director must name an existing director.
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Director not found")
+    else:
+        result = await db.execute(select(*columns).where(Movie.id == movie_id))
+    updated_movie = result.one_or_none()
+    if updated_movie is None:
         return None
-    
-    update_data = movie.model_dump(exclude_unset=True)
-    
-    if "genres" in update_data:
-        genre_ids = update_data.pop("genres")
+
+    if genre_ids is None:
+        result = await db.execute(select(Genre).join(MovieGenre).where(MovieGenre.movie_id == movie_id))
+        db_genres = result.scalars().all()
+    else:
         result = await db.execute(select(Genre).where(Genre.id.in_(genre_ids)))
         db_genres = result.scalars().all()
         if len(db_genres) != len(genre_ids):
+            await db.rollback()
             raise HTTPException(status_code=404, detail="One or more genres not found")
-        existing_movie.genres = db_genres
+        await db.execute(
+            delete(MovieGenre)
+            .where(MovieGenre.movie_id == movie_id, MovieGenre.genre_id.not_in(genre_ids))
+            .execution_options(synchronize_session=False)
+        )
+        linked = select(MovieGenre.genre_id).where(MovieGenre.movie_id == movie_id)
+        await db.execute(
+            insert(MovieGenre).from_select(
+                ["movie_id", "genre_id"],
+                select(literal(movie_id), Genre.id).where(Genre.id.in_(genre_ids), Genre.id.not_in(linked)),
+            )
+        )
 
-    for key, value in update_data.items():
-        setattr(existing_movie, key, value)
-        
     await db.commit()
-    await db.refresh(existing_movie)
-    
-    result = await db.execute(select(Movie).where(Movie.id == existing_movie.id).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    updated_movie = result.scalars().first()
-    
-    return MovieRead.model_validate(updated_movie)
+    if "title" in update_data:
+        title_index.add(movie_id, updated_movie.title)
+    if update_data.keys() & {"title", "rating"}:
+        invalidate_autocomplete("movies")
+    if update_data.keys() & {"rating", "director"}:
+        invalidate_autocomplete("directors")
+    if "rating" in update_data or genre_ids is not None:
+        invalidate_autocomplete("genres")
+    return MovieRead.model_validate({**updated_movie._mapping, "genres": db_genres})
 
 async def delete_movie(movie_id: str, db: AsyncSession) -> MovieRead:
-    result = await db.execute(select(Movie).where(Movie.id == movie_id).options(selectinload(Movie.genres_association).selectinload(MovieGenre.genre)))
-    movie = result.scalars().first()
-    if not movie:
+    # The genres are read first because their links, and the movie's functions,
+    # are removed by the database along with the movie (ON DELETE CASCADE).
+    result = await db.execute(select(Genre).join(MovieGenre).where(MovieGenre.movie_id == movie_id))
+    db_genres = result.scalars().all()
+    result = await db.execute(
+        delete(Movie)
+        .where(Movie.id == movie_id)
+        .returning(*Movie.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    deleted_movie = result.one_or_none()
+    if deleted_movie is None:
         return None
-    await db.delete(movie)
     await db.commit()
-    return MovieRead.model_validate(movie)
\ No newline at end of file
+    title_index.remove(movie_id)
+    if deleted_movie.rating is None:
+        invalidate_autocomplete("movies")
+    else:
+        invalidate_autocomplete("movies", "directors", "genres")
+    return MovieRead.model_validate({**deleted_movie._mapping, "genres": db_genres})
\ No newline at end of file
@@ -0,0 +1,52 @@
+from fastapi import HTTPException
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List, Optional, Sequence, Tuple
+import json
+
+
+def encode_cursor(key: str) -> str:
+    return urlsafe_b64encode(json.dumps([key]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        (key,) = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, str):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+async def paginate(
+    db: Session,
+    model: Any,
+    skip: int = 0,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    options: Sequence[Any] = (),
+) -> Tuple[List[Any], Optional[int], Optional[str]]:
+    """
+    Returns (rows, total, next_cursor) for one page of `model` in primary key order.
+
+    With a cursor the page starts right after the row it points at, which is a seek
+    on the primary key index however deep the page is, and rows inserted or deleted
+    meanwhile don't shift later pages. Without one, `skip` rows are skipped as before.
+    The count only runs when `include_total` is set, by default only without a cursor.
+    """
+    query = select(model).order_by(model.id)
+    if cursor is not None:
+        query = query.filter(model.id > decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit + 1).options(*options))
+    rows = result.scalars().all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if limit > 0 and len(rows) > limit else None
+    total = None
+    if include_total if include_total is not None else cursor is None:
+        total_result = await db.execute(select(func.count()).select_from(model))
+        total = total_result.scalar_one()
+    return rows[:limit], total, next_cursor
@@ -0,0 +1,203 @@
+from models.auditorium import Auditorium
+from models.cinema import Cinema
+from models.function import Function
+from models.movie import Movie
+from schemas.schedule import FreeSlot, AuditoriumFreeSlots, SchedulePackRequest, CinemaSchedule, AuditoriumSchedule, ScheduledFunction, MovieSummary
+from schemas.cinema import CinemaRead
+from schemas.function import FunctionCreate
+from crud.function import get_auditorium_schedules, create_function
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from sqlalchemy import select, and_
+from datetime import datetime, date, timedelta
+from typing import List
+
+
+def find_gaps(schedule: list, start: datetime, end: datetime, min_length: timedelta = timedelta(0)) -> List[tuple]:
+    """Gaps of at least `min_length` between (start, end) intervals sorted by start, clipped to the window."""
+    gaps = []
+    cursor = start
+    for function_start, function_end in schedule:
+        gap_end = min(function_start, end)
+        if gap_end > cursor and gap_end - cursor >= min_length:
+            gaps.append((cursor, gap_end))
+        cursor = max(cursor, function_end)
+        if cursor >= end:
+            return gaps
+    if end > cursor and end - cursor >= min_length:
+        gaps.append((cursor, end))
+    return gaps
+
+
+async def get_free_slots(
+    db: Session, auditorium_ids: List[str], start: datetime, end: datetime, min_minutes: int = 0
+) -> List[AuditoriumFreeSlots]:
+    schedules = await get_auditorium_schedules(db, {auditorium_id: (start, end) for auditorium_id in auditorium_ids})
+    min_length = timedelta(minutes=min_minutes)
+    return [
+        AuditoriumFreeSlots(
+            auditorium_id=auditorium_id,
+            free_slots=[
+                FreeSlot(start_time=gap_start, end_time=gap_end)
+                for gap_start, gap_end in find_gaps(schedules[auditorium_id], start, end, min_length)
+            ],
+        )
+        for auditorium_id in auditorium_ids
+    ]
+
+
+async def get_cinema_auditorium_ids(db: Session, cinema_id: str) -> List[str]:
+    result = await db.execute(select(Auditorium.id).filter(Auditorium.cinema_id == cinema_id).order_by(Auditorium.name))
+    return list(result.scalars().all())
+
+
+def _align(moment: datetime, minutes: int) -> datetime:
+    remainder = (moment - datetime.min) % timedelta(minutes=minutes)
+    return moment if not remainder else moment + timedelta(minutes=minutes) - remainder
+
+
+def pack_day(gaps: List[tuple], movies: List[tuple], rotation: int, buffer: timedelta, align_minutes: int) -> tuple[List[tuple], int]:
+    """
+    Greedily fills each gap from its start. Movies are (movie_id, duration) and are
+    taken in round-robin order starting at `rotation`, skipping those too long for
+    what is left of the gap. Returns ([(movie_id, start, end), ...], next rotation).
+    """
+    shortest = min(duration for _, duration in movies)
+    placed = []
+    for gap_start, gap_end in gaps:
+        cursor = _align(gap_start, align_minutes)
+        while cursor + shortest <= gap_end:
+            for offset in range(len(movies)):
+                movie_id, duration = movies[(rotation + offset) % len(movies)]
+                if cursor + duration <= gap_end:
+                    placed.append((movie_id, cursor, cursor + duration))
+                    rotation = (rotation + offset + 1) % len(movies)
+                    next_cursor = _align(cursor + duration + buffer, align_minutes)
+                    # Callers reject durations <= 0; a cursor that stood still
+                    # would append to `placed` forever.
+                    assert next_cursor > cursor, "pack_day needs positive durations"
+                    cursor = next_cursor
+                    break
+            else:
+                break
+    return placed, rotation
+
+
+async def pack_schedule(db: Session, request: SchedulePackRequest) -> dict:
+    result = await db.execute(select(Movie.id, Movie.duration).filter(Movie.id.in_(request.movie_ids)))
+    durations = dict(result.all())
+    if len(durations) != len(set(request.movie_ids)):
+        raise HTTPException(status_code=404, detail="Movie not found")
+    if any(duration is None for duration in durations.values()):
+        raise HTTPException(status_code=400, detail="Movie duration is required")
+    if any(duration <= 0 for duration in durations.values()):
+        raise HTTPException(status_code=400, detail="Movie duration must be positive")
+    result = await db.execute(select(Auditorium.id, Auditorium.capacity).filter(Auditorium.id.in_(request.auditorium_ids)))
+    capacities = dict(result.all())
+    if len(capacities) != len(set(request.auditorium_ids)):
+        raise HTTPException(status_code=404, detail="Auditorium not found")
+
+    movies = [(movie_id, timedelta(minutes=durations[movie_id])) for movie_id in dict.fromkeys(request.movie_ids)]
+    buffer = timedelta(minutes=request.buffer_minutes)
+    days = []
+    day = request.from_date
+    while day <= (request.to_date or request.from_date):
+        opening = datetime.combine(day, request.opening_time)
+        closing = datetime.combine(day, request.closing_time)
+        if closing <= opening:
+            closing += timedelta(days=1)
+        days.append((opening, closing))
+        day += timedelta(days=1)
+
+    # Existing functions are widened by the cleaning buffer on both sides, so the
+    # gaps between them already leave room to clean before and after.
+    schedules = await get_auditorium_schedules(
+        db, {auditorium_id: (days[0][0] - buffer, days[-1][1] + buffer) for auditorium_id in capacities}
+    )
+    now = datetime.now()
+    rotation = 0
+    planned = []
+    for auditorium_id in dict.fromkeys(request.auditorium_ids):
+        busy = [(start - buffer, end + buffer) for start, end in schedules[auditorium_id]]
+        for opening, closing in days:
+            if closing <= now:
+                continue
+            gaps = find_gaps(busy, max(opening, now), closing)
+            placed, rotation = pack_day(gaps, movies, rotation, buffer, request.align_minutes)
+            planned.extend(
+                FunctionCreate(
+                    movie_id=movie_id,
+                    auditorium_id=auditorium_id,
+                    start_time=start,
+                    end_time=end,
+                    price=request.price,
+                    available_seats=capacities[auditorium_id],
+                )
+                for movie_id, start, end in placed
+            )
+
+    created = []
+    if request.persist:
+        for function in planned:
+            created.append(await create_function(db, function, capacities[function.auditorium_id], commit=False))
+        await db.commit()
+    return {"functions": planned, "created": created}
+
+
+async def get_cinema_schedule(db: Session, cinema_id: str, day: date) -> CinemaSchedule | None:
+    """
+    Everything showing at a cinema on one day from a single query: the cinema row
+    outer-joined to its auditoriums, their functions starting that day and each
+    function's movie. Movies are returned once, keyed by id, however often they show.
+    """
+    day_start = datetime.combine(day, datetime.min.time())
+    result = await db.execute(
+        select(
+            Cinema.id, Cinema.name, Cinema.location, Cinema.number,
+            Auditorium.id.label("auditorium_id"), Auditorium.name.label("auditorium_name"), Auditorium.capacity,
+            Function.id.label("function_id"), Function.start_time, Function.end_time, Function.price, Function.available_seats,
+            Movie.id.label("movie_id"), Movie.title, Movie.duration, Movie.rating, Movie.language, Movie.image,
+        )
+        .select_from(Cinema)
+        .outerjoin(Auditorium, Auditorium.cinema_id == Cinema.id)
+        .outerjoin(Function, and_(
+            Function.auditorium_id == Auditorium.id,
+            Function.start_time >= day_start,
+            Function.start_time < day_start + timedelta(days=1),
+        ))
+        .outerjoin(Movie, Movie.id == Function.movie_id)
+        .filter(Cinema.id == cinema_id)
+        .order_by(Auditorium.name, Auditorium.id, Function.start_time)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    auditoriums = {}
+    movies = {}
+    for row in rows:
+        if row.auditorium_id is None:
+            continue
+        auditorium = auditoriums.get(row.auditorium_id)
+        if auditorium is None:
+            auditorium = auditoriums[row.auditorium_id] = AuditoriumSchedule(
+                id=row.auditorium_id, name=row.auditorium_name, capacity=row.capacity, functions=[]
+            )
+        if row.function_id is None:
+            continue
+        auditorium.functions.append(ScheduledFunction(
+            id=row.function_id, movie_id=row.movie_id, start_time=row.start_time, end_time=row.end_time,
+            price=row.price, available_seats=row.available_seats,
+        ))
+        if row.movie_id not in movies:
+            movies[row.movie_id] = MovieSummary(
+                id=row.movie_id, title=row.title, duration=row.duration, rating=row.rating,
+                language=row.language, image=row.image,
+            )
+    first = rows[0]
+    return CinemaSchedule(
+        cinema=CinemaRead(id=first.id, name=first.name, location=first.location, number=first.number),
+        date=day,
+        auditoriums=list(auditoriums.values()),
+        movies=movies,
+    )
@@ -0,0 +1,103 @@
+from models.seat_hold import SeatHold
+from models.function import Function
+from schemas.seat_hold import SeatHoldRead
+from schemas.function import ReservationRead
+from crud.function import update_seat_map, take_seats
+from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from datetime import datetime, timedelta
+from collections import defaultdict
+from typing import List
+import seat_map
+import os
+
+SEAT_HOLD_MINUTES = int(os.getenv("SEAT_HOLD_MINUTES", "10"))
+
+
+def release_seats(seat_numbers: List[int]):
+    def change(current: bytearray, capacity: int) -> List[int]:
+        seat_map.release(current, seat_numbers)
+        return seat_numbers
+    return change
+
+
+async def create_seat_hold(
+    db: Session, function_id: str, user_id: str, seats: int | None = None, seat_numbers: List[int] | None = None
+) -> SeatHoldRead | None:
+    updated = await update_seat_map(db, function_id, take_seats(seats, seat_numbers))
+    if updated is None:
+        return None
+    chosen, _ = updated
+    db_hold = SeatHold(
+        function_id=function_id,
+        user_id=user_id,
+        seat_numbers=chosen,
+        expires_at=datetime.now() + timedelta(minutes=SEAT_HOLD_MINUTES),
+    )
+    db.add(db_hold)
+    await db.commit()
+    return SeatHoldRead.model_validate(db_hold)
+
+
+async def confirm_seat_hold(db: Session, hold_id: str, user_id: str) -> ReservationRead | None:
+    # Deleting the hold is the claim: a confirmed hold can no longer be swept, and
+    # an already swept or released hold can no longer be confirmed. Another user's
+    # hold is not found at all.
+    result = await db.execute(
+        delete(SeatHold)
+        .filter(SeatHold.id == hold_id, SeatHold.user_id == user_id, SeatHold.expires_at > datetime.now())
+        .returning(SeatHold.function_id, SeatHold.seat_numbers)
+    )
+    row = result.one_or_none()
+    await db.commit()
+    if not row:
+        return None
+    result = await db.execute(select(Function.available_seats).filter(Function.id == row.function_id))
+    return ReservationRead(
+        function_id=row.function_id,
+        seats=len(row.seat_numbers),
+        seat_numbers=row.seat_numbers,
+        available_seats=result.scalar_one(),
+    )
+
+
+async def release_seat_hold(db: Session, hold_id: str, user_id: str) -> SeatHoldRead | None:
+    # The hold is deleted and its seats freed in one transaction: if freeing them
+    # fails, the hold stays and can still be released or swept.
+    result = await db.execute(delete(SeatHold).filter(SeatHold.id == hold_id, SeatHold.user_id == user_id).returning(SeatHold))
+    db_hold = result.scalar_one_or_none()
+    if not db_hold:
+        await db.rollback()
+        return None
+    await update_seat_map(db, db_hold.function_id, release_seats(db_hold.seat_numbers))
+    await db.commit()
+    return SeatHoldRead.model_validate(db_hold)
+
+
+async def release_expired_seat_holds(db: Session, batch_size: int = 500) -> int:
+    """
+    Releases up to `batch_size` expired holds, oldest first, and returns how many
+    were released. The holds are claimed with one DELETE ... RETURNING on the
+    expires_at index, then each affected function's seat map is updated once, all
+    in one transaction so a failure leaves the holds in place for the next sweep.
+    """
+    expired = (
+        select(SeatHold.id)
+        .filter(SeatHold.expires_at <= datetime.now())
+        .order_by(SeatHold.expires_at)
+        .limit(batch_size)
+    )
+    result = await db.execute(
+        delete(SeatHold)
+        .filter(SeatHold.id.in_(expired))
+        .returning(SeatHold.function_id, SeatHold.seat_numbers)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    seats_by_function = defaultdict(list)
+    for row in rows:
+        seats_by_function[row.function_id].extend(row.seat_numbers)
+    for function_id, seat_numbers in seats_by_function.items():
+        await update_seat_map(db, function_id, release_seats(seat_numbers))
+    await db.commit()
+    return len(rows)
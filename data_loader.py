@@ -1,46 +1,115 @@
+"""
+Demo catalog seeded into new databases at startup.
+
+Seeding runs once per database: a SEED_MARKER row in `schema_migrations` records
+it, so later boots cost one primary key lookup. The marker is inserted first, in
+the same transaction as the rows, which also makes it a lock: a second worker
+booting at the same time waits for the first to commit, then fails on the marker's
+primary key and skips seeding. Databases that already hold a catalog only get the
+marker.
+"""
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from crud.director import create_director
-from crud.genre import create_genre
-from crud.movies import create_movie
-from crud.cinema import create_cinema
-from crud.auditorium import create_auditorium
-from crud.function import create_function
-from schemas.director import DirectorCreate
-from schemas.genre import GenreCreate
-from schemas.movies import MovieCreate
-from schemas.cinema import CinemaCreate
-from schemas.auditorium import AuditoriumCreate
-from schemas.function import FunctionCreate
-
-async def load_data(db: Session):
-    # Create directors
-    director1 = await create_director(DirectorCreate(name="Frank Darabont", bio="Some bio", birth_date="1959-01-28", nationality="USA", image="https://example.com/frank_darabont.jpg"), db)
-    director2 = await create_director(DirectorCreate(name="Francis Ford Coppola", bio="Some bio", birth_date="1939-04-07", nationality="USA", image="https://example.com/francis_ford_coppola.jpg"), db)
-    director3 = await create_director(DirectorCreate(name="Christopher Nolan", bio="Some bio", birth_date="1970-07-30", nationality="British", image="https://example.com/christopher_nolan.jpg"), db)
-
-    # Create genres
-    genre1 = await create_genre(GenreCreate(name="Drama", description="Movies that are serious in tone."), db)
-    genre2 = await create_genre(GenreCreate(name="Crime", description="Movies that focus on criminal activity."), db)
-    genre3 = await create_genre(GenreCreate(name="Action", description="Movies with a lot of action and adventure."), db)
-    genre4 = await create_genre(GenreCreate(name="Science Fiction", description="Movies with futuristic or imaginative themes."), db)
-
-    # Create movies
-    movie1 = await create_movie(MovieCreate(title="The Shawshank Redemption", year=1994, rating=9, description="Two imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.", image="https://example.com/the_shawshank_redemption.jpg", trailer="https://example.com/the_shawshank_redemption_trailer.mp4", duration=142, language="English", director=director1.id, genres=[genre1.id, genre2.id]), db)
-    movie2 = await create_movie(MovieCreate(title="The Godfather", year=1972, rating=9, description="The aging patriarch of an organized crime dynasty transfers control of his clandestine empire to his reluctant son.", image="https://example.com/the_godfather.jpg", trailer="https://example.com/the_godfather_trailer.mp4", duration=175, language="English", director=director2.id, genres=[genre1.id, genre2.id]), db)
-    movie3 = await create_movie(MovieCreate(title="The Dark Knight", year=2008, rating=9, description="When the menace known as the Joker wreaks havoc and chaos on the people of Gotham, Batman must accept one of the greatest psychological and physical tests of his ability to fight injustice.", image="https://example.com/the_dark_knight.jpg", trailer="https://example.com/the_dark_knight_trailer.mp4", duration=152, language="English", director=director3.id, genres=[genre3.id, genre2.id, genre1.id]), db)
-    movie4 = await create_movie(MovieCreate(title="Inception", year=2010, rating=8, description="A thief who steals corporate secrets through the use of dream-sharing technology is given the inverse task of planting an idea into the mind of a C.E.O.", image="https://example.com/inception.jpg", trailer="https://example.com/inception_trailer.mp4", duration=148, language="English", director=director3.id, genres=[genre3.id, genre4.id]), db)
-
-    # Create cinemas
-    cinema1 = await create_cinema(db, CinemaCreate(name="Cinema Paradiso", location="123 Main Street, Springfield", number=1))
-    cinema2 = await create_cinema(db, CinemaCreate(name="Cineplex", location="456 Oak Avenue, Shelbyville", number=2))
-
-    # Create auditoriums
-    auditorium1 = await create_auditorium(db, AuditoriumCreate(name="Auditorium 1", cinema_id=cinema1.id, capacity=100))
-    auditorium2 = await create_auditorium(db, AuditoriumCreate(name="Auditorium 2", cinema_id=cinema1.id, capacity=150))
-    auditorium3 = await create_auditorium(db, AuditoriumCreate(name="Auditorium 3", cinema_id=cinema2.id, capacity=200))
-
-    # Create functions
-    function1 = await create_function(db, FunctionCreate(movie_id=movie1.id, auditorium_id=auditorium1.id, start_time="2025-09-25 18:00:00", end_time="2025-09-25 20:22:00", price=10, available_seats=100))
-    function2 = await create_function(db, FunctionCreate(movie_id=movie2.id, auditorium_id=auditorium1.id, start_time="2025-09-25 21:00:00", end_time="2025-09-25 23:55:00", price=10, available_seats=100))
-    function3 = await create_function(db, FunctionCreate(movie_id=movie3.id, auditorium_id=auditorium2.id, start_time="2025-09-25 19:00:00", end_time="2025-09-25 21:32:00", price=12, available_seats=150))
-    function4 = await create_function(db, FunctionCreate(movie_id=movie4.id, auditorium_id=auditorium3.id, start_time="2025-09-25 20:00:00", end_time="2025-09-25 22:28:00", price=12, available_seats=200))
+from datetime import datetime
+from uuid import uuid4
+from models import Auditorium, Cinema, Director, Function, Genre, Movie, MovieGenre, SchemaMigration
+from seat_map import new_seat_map
+
+SEED_MARKER = "seed_0001_demo_catalog"
+
+DIRECTORS = [
+    {"name": "Frank Darabont", "bio": "Some bio", "birth_date": "1959-01-28", "nationality": "USA", "image": "https://example.com/frank_darabont.jpg"},
+    {"name": "Francis Ford Coppola", "bio": "Some bio", "birth_date": "1939-04-07", "nationality": "USA", "image": "https://example.com/francis_ford_coppola.jpg"},
+    {"name": "Christopher Nolan", "bio": "Some bio", "birth_date": "1970-07-30", "nationality": "British", "image": "https://example.com/christopher_nolan.jpg"},
+]
+
+GENRES = [
+    {"name": "Drama", "description": "Movies that are serious in tone."},
+    {"name": "Crime", "description": "Movies that focus on criminal activity."},
+    {"name": "Action", "description": "Movies with a lot of action and adventure."},
+    {"name": "Science Fiction", "description": "Movies with futuristic or imaginative themes."},
+]
+
+# Directors and genres are referenced by name.
+MOVIES = [
+    {"title": "The Shawshank Redemption", "year": 1994, "rating": 9, "description": "Two imprisoned men bond over a number of years, finding solace and eventual redemption through acts of common decency.", "image": "https://example.com/the_shawshank_redemption.jpg", "trailer": "https://example.com/the_shawshank_redemption_trailer.mp4", "duration": 142, "language": "English", "director": "Frank Darabont", "genres": ["Drama", "Crime"]},
+    {"title": "The Godfather", "year": 1972, "rating": 9, "description": "The aging patriarch of an organized crime dynasty transfers control of his clandestine empire to his reluctant son.", "image": "https://example.com/the_godfather.jpg", "trailer": "https://example.com/the_godfather_trailer.mp4", "duration": 175, "language": "English", "director": "Francis Ford Coppola", "genres": ["Drama", "Crime"]},
+    {"title": "The Dark Knight", "year": 2008, "rating": 9, "description": "When the menace known as the Joker wreaks havoc and chaos on the people of Gotham, Batman must accept one of the greatest psychological and physical tests of his ability to fight injustice.", "image": "https://example.com/the_dark_knight.jpg", "trailer": "https://example.com/the_dark_knight_trailer.mp4", "duration": 152, "language": "English", "director": "Christopher Nolan", "genres": ["Action", "Crime", "Drama"]},
+    {"title": "Inception", "year": 2010, "rating": 8, "description": "A thief who steals corporate secrets through the use of dream-sharing technology is given the inverse task of planting an idea into the mind of a C.E.O.", "image": "https://example.com/inception.jpg", "trailer": "https://example.com/inception_trailer.mp4", "duration": 148, "language": "English", "director": "Christopher Nolan", "genres": ["Action", "Science Fiction"]},
+]
+
+CINEMAS = [
+    {"name": "Cinema Paradiso", "location": "123 Main Street, Springfield", "number": 1},
+    {"name": "Cineplex", "location": "456 Oak Avenue, Shelbyville", "number": 2},
+]
+
+AUDITORIUMS = [
+    {"name": "Auditorium 1", "cinema": "Cinema Paradiso", "capacity": 100},
+    {"name": "Auditorium 2", "cinema": "Cinema Paradiso", "capacity": 150},
+    {"name": "Auditorium 3", "cinema": "Cineplex", "capacity": 200},
+]
+
+FUNCTIONS = [
+    {"movie": "The Shawshank Redemption", "auditorium": "Auditorium 1", "start_time": datetime(2025, 9, 25, 18, 0), "end_time": datetime(2025, 9, 25, 20, 22), "price": 10},
+    {"movie": "The Godfather", "auditorium": "Auditorium 1", "start_time": datetime(2025, 9, 25, 21, 0), "end_time": datetime(2025, 9, 25, 23, 55), "price": 10},
+    {"movie": "The Dark Knight", "auditorium": "Auditorium 2", "start_time": datetime(2025, 9, 25, 19, 0), "end_time": datetime(2025, 9, 25, 21, 32), "price": 12},
+    {"movie": "Inception", "auditorium": "Auditorium 3", "start_time": datetime(2025, 9, 25, 20, 0), "end_time": datetime(2025, 9, 25, 22, 28), "price": 12},
+]
+
+
+def _with_ids(rows: list, key: str) -> dict:
+    return {row[key]: {**row, "id": str(uuid4())} for row in rows}
+
+
+async def load_data(db: Session) -> bool:
+    """Seeds the demo catalog unless it was seeded before; returns whether it did."""
+    seeded = await db.execute(select(SchemaMigration.name).filter(SchemaMigration.name == SEED_MARKER))
+    if seeded.first() is not None:
+        return False
+    try:
+        await db.execute(insert(SchemaMigration).values(name=SEED_MARKER))
+    except IntegrityError:
+        # Another worker seeded the database while this one waited for the lock.
+        await db.rollback()
+        return False
+    existing = await db.execute(select(Director.id).limit(1))
+    if existing.first() is not None:
+        await db.commit()
+        return False
+
+    directors = _with_ids(DIRECTORS, "name")
+    genres = _with_ids(GENRES, "name")
+    movies = _with_ids(MOVIES, "title")
+    cinemas = _with_ids(CINEMAS, "name")
+    auditoriums = _with_ids(AUDITORIUMS, "name")
+    await db.execute(insert(Director), list(directors.values()))
+    await db.execute(insert(Genre), list(genres.values()))
+    await db.execute(insert(Movie), [
+        {**{key: value for key, value in movie.items() if key != "genres"}, "director": directors[movie["director"]]["id"]}
+        for movie in movies.values()
+    ])
+    await db.execute(insert(MovieGenre), [
+        {"movie_id": movie["id"], "genre_id": genres[name]["id"]} for movie in movies.values() for name in movie["genres"]
+    ])
+    await db.execute(insert(Cinema), list(cinemas.values()))
+    await db.execute(insert(Auditorium), [
+        {"id": auditorium["id"], "name": auditorium["name"], "capacity": auditorium["capacity"], "cinema_id": cinemas[auditorium["cinema"]]["id"]}
+        for auditorium in auditoriums.values()
+    ])
+    functions = []
+    for function in FUNCTIONS:
+        auditorium = auditoriums[function["auditorium"]]
+        functions.append({
+            "id": str(uuid4()),
+            "movie_id": movies[function["movie"]]["id"],
+            "auditorium_id": auditorium["id"],
+            "start_time": function["start_time"],
+            "end_time": function["end_time"],
+            "price": function["price"],
+            "available_seats": auditorium["capacity"],
+            "seat_map": new_seat_map(auditorium["capacity"], auditorium["capacity"]),
+        })
+    await db.execute(insert(Function), functions)
+    await db.commit()
+    return True
@@ -1,10 +1,95 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from pydantic import BaseModel
+from typing import Literal
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./main.db")
+# A replica for the read-only endpoints. Without one, a SQLite file is read through
+# a second pool of read-only connections, so reads never wait for a connection
+# behind writes in the primary pool. Writes always go to DATABASE_URL, so with a
+# lagging replica a GET right after a write may not see it yet.
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
 
-engine = create_async_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+class EngineSettings(BaseModel):
+    """
+    Connection pragmas (SQLite only) and pool parameters for an engine. Every field
+    can be set from the environment as DB_<FIELD>, e.g. DB_JOURNAL_MODE=DELETE.
+    """
+    # WAL lets readers run alongside the single writer instead of failing with
+    # "database is locked"; with it, synchronous=NORMAL is still safe against
+    # corruption and only risks the last commits on power loss.
+    journal_mode: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    synchronous: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    cache_size: int = -64000  # negative: KiB, so 64 MB of page cache per connection
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout: int = 5000  # ms a connection waits on a lock before giving up
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30
+    pool_recycle: int = -1
+    pool_pre_ping: bool = False
+
+    @classmethod
+    def from_env(cls, prefix: str = "DB_") -> "EngineSettings":
+        values = {name: os.environ[prefix + name.upper()] for name in cls.model_fields if prefix + name.upper() in os.environ}
+        return cls.model_validate(values)
+
+
+@event.listens_for(Engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces foreign keys, and with them ON DELETE CASCADE, on
+    # connections that ask for it.
+    if "sqlite" in type(dbapi_connection).__module__:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def make_engine(url: str, settings: EngineSettings) -> AsyncEngine:
+    url = make_url(url)
+    pool = settings.model_dump(include={"pool_size", "max_overflow", "pool_timeout", "pool_recycle", "pool_pre_ping"})
+    if url.get_backend_name() != "sqlite":
+        return create_async_engine(url, **pool)
+    if url.database in (None, "", ":memory:"):
+        # In-memory databases live on a single static connection; there is no pool to size.
+        pool = {}
+    engine = create_async_engine(url, connect_args={"check_same_thread": False}, **pool)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # busy_timeout first, so switching the journal mode waits out other connections.
+        cursor.execute(f"PRAGMA busy_timeout={settings.busy_timeout}")
+        cursor.execute(f"PRAGMA journal_mode={settings.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.synchronous}")
+        cursor.execute(f"PRAGMA cache_size={settings.cache_size}")
+        cursor.execute(f"PRAGMA mmap_size={settings.mmap_size}")
+        cursor.close()
+
+    return engine
+
+
+def read_only_url(url: str):
+    """`url` opened read-only if it is a SQLite file, else None."""
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    database = url.database if url.database.startswith("file:") else f"file:{os.path.abspath(url.database)}"
+    return url.set(database=database, query={**url.query, "mode": "ro", "uri": "true"})
+
+
+settings = EngineSettings.from_env()
+engine = make_engine(DATABASE_URL, settings)
+if READ_DATABASE_URL:
+    read_engine = make_engine(READ_DATABASE_URL, settings)
+elif read_only_url(DATABASE_URL) is not None:
+    read_engine = make_engine(read_only_url(DATABASE_URL), settings)
+else:
+    # In-memory and server databases without a replica read through the primary.
+    read_engine = engine
 
 SessionLocal = sessionmaker(
     bind=engine,
@@ -14,4 +99,12 @@ SessionLocal = sessionmaker(
     autoflush=False,
 )
 
-Base = declarative_base()
\ No newline at end of file
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+Base = declarative_base()
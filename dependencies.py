@@ -1,4 +1,4 @@
-from database import SessionLocal
+from database import SessionLocal, ReadSessionLocal
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 import jwt
@@ -22,6 +22,15 @@ async def get_db():
         await db.close()
 
 
+async def get_read_db():
+    """Session for endpoints that only read; see database.READ_DATABASE_URL."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
 def RoleRequired(allowed_roles: List[UserRole]):
     """
     Returns a FastAPI dependency that checks if the current user
@@ -1,9 +1,12 @@
 import os
+import asyncio
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from database import Base, engine
+from database import SessionLocal, engine
+from startup import prepare_database
 from dependencies import get_db
-from data_loader import load_data
+from crud.movies import load_title_index
+from tasks import sweep_expired_seat_holds
 from routers.genre import genre_router
 from routers.director import director_router
 from routers.movies import movie_router
@@ -20,14 +23,19 @@ TESTING = os.environ.get("TESTING")
 async def lifespan(app: FastAPI):
     # Startup logic
     print("Startup logic running...")
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-    if not TESTING:
-        async for db in get_db():
-            await load_data(db)
+    # With several workers, only one of them creates, migrates and seeds the database.
+    await prepare_database(engine, SessionLocal, seed=not TESTING)
+    async for db in get_db():
+        await load_title_index(db)
+    sweeper = asyncio.create_task(sweep_expired_seat_holds())
     yield
     # Shutdown logic (if any)
     print("Shutdown logic running...")
+    sweeper.cancel()
+    try:
+        await sweeper
+    except asyncio.CancelledError:
+        pass
 
 app = FastAPI(lifespan=lifespan)
 
@@ -0,0 +1,138 @@
+"""
+Data migrations for databases created before a model change.
+
+`Base.metadata.create_all` only creates missing tables, so columns whose storage
+changed on an existing table are brought up to date here. Every migration runs
+once per database and is recorded in `schema_migrations`; each one must also be a
+no-op on a freshly created schema, because `create_all` runs first.
+"""
+from sqlalchemy import Connection, Table, func, inspect, select, text, insert, update
+from sqlalchemy.schema import CreateTable
+import models  # noqa: F401  (registers every table on Base.metadata)
+from models.auditorium import Auditorium
+from models.function import Function
+from models.movie import Movie
+from models.movie_genre import MovieGenre
+from models.seat_hold import SeatHold
+from models.schema_migration import SchemaMigration
+from models.movie_search import MOVIE_SEARCH_DDL, REBUILD_MOVIE_SEARCH
+from database import Base
+from seat_map import new_seat_map
+
+
+def _function_times_as_datetime(conn: Connection):
+    # start_time/end_time used to be VARCHAR columns holding "%Y-%m-%d %H:%M:%S".
+    # SQLAlchemy's SQLite DateTime stores microseconds too, and the stored text is
+    # what range scans compare, so legacy values are padded to the same format.
+    for column in ("start_time", "end_time"):
+        conn.execute(text(
+            f"UPDATE functions SET {column} = {column} || '.000000' "
+            f"WHERE length({column}) = 19"
+        ))
+
+
+def _function_seat_maps(conn: Connection):
+    columns = {column["name"] for column in inspect(conn).get_columns("functions")}
+    if "seat_map" not in columns:
+        conn.execute(text("ALTER TABLE functions ADD COLUMN seat_map BLOB NOT NULL DEFAULT x''"))
+    # Existing functions get a map whose free seats match their available_seats.
+    rows = conn.execute(
+        select(Function.id, Function.available_seats, Auditorium.capacity)
+        .join(Auditorium, Function.auditorium_id == Auditorium.id)
+        .filter(func.length(Function.seat_map) == 0)
+    ).all()
+    for row in rows:
+        conn.execute(
+            update(Function)
+            .filter(Function.id == row.id)
+            .values(seat_map=new_seat_map(row.capacity, row.available_seats))
+        )
+
+
+def _seat_hold_owners(conn: Connection):
+    # Holds placed before owners were recorded belong to nobody; they expire and
+    # the sweeper frees their seats.
+    columns = {column["name"] for column in inspect(conn).get_columns("seat_holds")}
+    if "user_id" not in columns:
+        conn.execute(text("ALTER TABLE seat_holds ADD COLUMN user_id VARCHAR NOT NULL DEFAULT ''"))
+
+
+def _movie_search_index(conn: Connection):
+    # create_all only adds the FTS table and its triggers together with `movies`.
+    for statement in MOVIE_SEARCH_DDL + REBUILD_MOVIE_SEARCH:
+        conn.execute(text(statement))
+
+
+def _rebuild_table(conn: Connection, table: Table):
+    # SQLite cannot alter constraints, so the table is rebuilt the way its docs
+    # describe: create the new definition under another name, copy the rows, drop
+    # the old table and rename. Foreign keys must be off, or the DROP would cascade.
+    # Indexes are dropped with the old table and re-created by _create_missing_indexes.
+    rebuilt = f"{table.name}_rebuilt"
+    create = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.execute(text(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {rebuilt} ", 1)))
+    existing = {column["name"] for column in inspect(conn).get_columns(table.name)}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    conn.execute(text(f"INSERT INTO {rebuilt} ({columns}) SELECT {columns} FROM {table.name}"))
+    conn.execute(text(f"DROP TABLE {table.name}"))
+    conn.execute(text(f"ALTER TABLE {rebuilt} RENAME TO {table.name}"))
+
+
+def _cascading_foreign_keys(conn: Connection):
+    # Deletes now rely on ON DELETE CASCADE / RESTRICT, which older tables lack.
+    for table in (Auditorium.__table__, Movie.__table__, MovieGenre.__table__, Function.__table__, SeatHold.__table__):
+        current = {
+            tuple(key["constrained_columns"]): (key["options"].get("ondelete") or "").upper()
+            for key in inspect(conn).get_foreign_keys(table.name)
+        }
+        wanted = {
+            tuple(column.name for column in key.columns): (key.ondelete or "").upper()
+            for key in table.foreign_key_constraints
+        }
+        if current == wanted:
+            continue
+        if table.name == "movies":
+            # The FTS triggers are dropped with `movies`, and the one on `directors`
+            # would stop the rename while it points at a missing table.
+            conn.execute(text("DROP TRIGGER IF EXISTS movies_fts_director_update"))
+            _rebuild_table(conn, table)
+            for statement in MOVIE_SEARCH_DDL:
+                conn.execute(text(statement))
+        else:
+            _rebuild_table(conn, table)
+
+
+MIGRATIONS = [
+    ("0001_function_times_as_datetime", _function_times_as_datetime),
+    ("0002_function_seat_maps", _function_seat_maps),
+    ("0003_movie_search_index", _movie_search_index),
+    ("0004_cascading_foreign_keys", _cascading_foreign_keys),
+    ("0005_seat_hold_owners", _seat_hold_owners),
+]
+
+
+def _create_missing_indexes(conn: Connection):
+    # create_all skips tables that already exist, including indexes added later.
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+def run_migrations(conn: Connection):
+    """
+    Applies pending migrations. On SQLite, foreign key enforcement is switched off
+    for this connection first, while no transaction is open yet (the pragma is a
+    no-op inside one), and stays off; callers switch it back on after committing,
+    see startup.prepare_database.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("PRAGMA foreign_keys=OFF"))
+    applied = set(conn.execute(select(SchemaMigration.name)).scalars())
+    for name, migration in MIGRATIONS:
+        if name in applied:
+            continue
+        # The legacy databases these migrations fix were all SQLite files.
+        if conn.dialect.name == "sqlite":
+            migration(conn)
+        conn.execute(insert(SchemaMigration).values(name=name))
+    _create_missing_indexes(conn)
@@ -5,3 +5,6 @@ from .function import Function
 from .genre import Genre
 from .movie import Movie
 from .movie_genre import MovieGenre
+from .movie_search import MOVIE_SEARCH_DDL, REBUILD_MOVIE_SEARCH
+from .schema_migration import SchemaMigration
+from .seat_hold import SeatHold
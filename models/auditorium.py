@@ -1,5 +1,5 @@
 from database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -8,10 +8,15 @@ class Auditorium(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
     name = Column(String, nullable=False)
-    cinema_id = Column(String, ForeignKey('cinemas.id'), nullable=False)
+    cinema_id = Column(String, ForeignKey('cinemas.id', ondelete='CASCADE'), nullable=False)
     capacity = Column(Integer, nullable=False)
 
     cinema = relationship("Cinema", backref="auditoriums")
 
+    __table_args__ = (
+        # A cinema's auditoriums by name; also what ON DELETE CASCADE looks up.
+        Index("ix_auditoriums_cinema", "cinema_id", "name"),
+    )
+
     def __repr__(self):
         return f"<Auditorium(id={self.id}, name={self.name}, cinema_id={self.cinema_id}, capacity={self.capacity})>"
\ No newline at end of file
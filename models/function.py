@@ -1,5 +1,5 @@
 from database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from uuid import uuid4
 
@@ -7,15 +7,22 @@ class Function(Base):
     __tablename__ = 'functions'
 
     id = Column(String, primary_key=True, default=lambda: str(uuid4()))
-    movie_id = Column(String, ForeignKey('movies.id'), nullable=False)
-    auditorium_id = Column(String, ForeignKey('auditoriums.id'), nullable=False)
-    start_time = Column(String, nullable=False)
-    end_time = Column(String, nullable=False)
+    movie_id = Column(String, ForeignKey('movies.id', ondelete='CASCADE'), nullable=False)
+    auditorium_id = Column(String, ForeignKey('auditoriums.id', ondelete='CASCADE'), nullable=False)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
     price = Column(Integer, nullable=False)
     available_seats = Column(Integer, nullable=False)
+    seat_map = Column(LargeBinary, nullable=False)
 
     movie = relationship("Movie", backref="functions")
     auditorium = relationship("Auditorium", backref="functions")
 
+    __table_args__ = (
+        Index("ix_functions_auditorium_schedule", "auditorium_id", "start_time", "end_time"),
+        Index("ix_functions_start_time", "start_time"),
+        Index("ix_functions_movie_schedule", "movie_id", "start_time"),
+    )
+
     def __repr__(self):
         return f"<Function(id={self.id}, movie_id={self.movie_id}, auditorium_id={self.auditorium_id}, start_time={self.start_time}, end_time={self.end_time} price={self.price})>"
@@ -11,5 +11,5 @@ class Genre(Base):
     name = Column(String, unique=True)
     description = Column(String)
 
-    movies_association = relationship("MovieGenre", back_populates="genre", cascade="all, delete-orphan")
+    movies_association = relationship("MovieGenre", back_populates="genre", cascade="all, delete-orphan", passive_deletes=True)
     movies = association_proxy("movies_association", "movie")
\ No newline at end of file
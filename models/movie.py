@@ -1,5 +1,5 @@
 from database import Base
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.associationproxy import association_proxy
 from uuid import uuid4
@@ -16,9 +16,17 @@ class Movie(Base):
     trailer = Column(String)
     duration = Column(Integer)
     language = Column(String)
-    director = Column(String, ForeignKey("directors.id"), nullable=False)
+    director = Column(String, ForeignKey("directors.id", ondelete="RESTRICT"), nullable=False)
 
-    genres_association = relationship("MovieGenre", back_populates="movie", cascade="all, delete-orphan")
+    genres_association = relationship("MovieGenre", back_populates="movie", cascade="all, delete-orphan", passive_deletes=True)
     genres = association_proxy("genres_association", "genre")
     
-    director_rel = relationship("Director", back_populates="movies")
\ No newline at end of file
+    director_rel = relationship("Director", back_populates="movies")
+
+    __table_args__ = (
+        Index("ix_movies_title", "title"),
+        # Best rated first, as search_movies_faceted orders them, overall and per
+        # director; the director one also serves the ON DELETE RESTRICT check.
+        Index("ix_movies_rating", rating.desc(), id),
+        Index("ix_movies_director_rating", director, rating.desc(), id),
+    )
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+SQLite FTS5 index over movie titles, descriptions and director names.
+
+`movies_fts` keeps its own copy of the searchable text and is kept in sync by
+triggers on `movies` and `directors`. Rows are addressed through the indexed
+`movie_id` column (`movie_id:"<id>"` phrase queries) rather than by rowid,
+because VACUUM may renumber the rowids of `movies`.
+"""
+from sqlalchemy import DDL, event
+from .movie import Movie
+
+MOVIE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS movies_fts USING fts5(
+        movie_id, title, description, director,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_fts_insert AFTER INSERT ON movies BEGIN
+        INSERT INTO movies_fts (movie_id, title, description, director)
+        VALUES (new.id, new.title, new.description, (SELECT name FROM directors WHERE id = new.director));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_fts_update AFTER UPDATE OF title, description, director ON movies BEGIN
+        UPDATE movies_fts
+        SET title = new.title,
+            description = new.description,
+            director = (SELECT name FROM directors WHERE id = new.director)
+        WHERE movies_fts MATCH 'movie_id:"' || old.id || '"';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_fts_delete AFTER DELETE ON movies BEGIN
+        DELETE FROM movies_fts WHERE movies_fts MATCH 'movie_id:"' || old.id || '"';
+    END
+    """,
+    # Director renames are rare, so scanning the index for their movies is fine.
+    """
+    CREATE TRIGGER IF NOT EXISTS movies_fts_director_update AFTER UPDATE OF name ON directors BEGIN
+        UPDATE movies_fts SET director = new.name
+        WHERE movie_id IN (SELECT id FROM movies WHERE director = new.id);
+    END
+    """,
+]
+
+REBUILD_MOVIE_SEARCH = [
+    "DELETE FROM movies_fts",
+    """
+    INSERT INTO movies_fts (movie_id, title, description, director)
+    SELECT movies.id, movies.title, movies.description, directors.name
+    FROM movies LEFT JOIN directors ON directors.id = movies.director
+    """,
+]
+
+for statement in MOVIE_SEARCH_DDL:
+    event.listen(Movie.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Movie.__table__, "before_drop", DDL("DROP TABLE IF EXISTS movies_fts").execute_if(dialect="sqlite"))
@@ -0,0 +1,12 @@
+from database import Base
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+
+class SchemaMigration(Base):
+    __tablename__ = 'schema_migrations'
+
+    name = Column(String, primary_key=True)
+    applied_at = Column(DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"<SchemaMigration(name={self.name}, applied_at={self.applied_at})>"
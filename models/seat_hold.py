@@ -0,0 +1,16 @@
+from database import Base
+from sqlalchemy import Column, String, DateTime, JSON, ForeignKey
+from uuid import uuid4
+
+class SeatHold(Base):
+    __tablename__ = 'seat_holds'
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid4()))
+    function_id = Column(String, ForeignKey('functions.id', ondelete='CASCADE'), nullable=False, index=True)
+    seat_numbers = Column(JSON, nullable=False)
+    # Only the user who placed a hold may confirm or release it.
+    user_id = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<SeatHold(id={self.id}, function_id={self.function_id}, user_id={self.user_id}, seat_numbers={self.seat_numbers}, expires_at={self.expires_at})>"
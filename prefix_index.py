@@ -0,0 +1,113 @@
+"""
+Compact prefix index for autocomplete.
+
+Labels are normalized (lowercased, accents and punctuation stripped) and every
+word start becomes a key, so "dar" completes "The Dark Knight". Instead of a
+trie with an object per node, the keys are kept as one sorted array of packed
+`(entry << 8) | offset` integers pointing into the normalized labels, the way a
+suffix array does; a prefix lookup is two bisects over that array.
+
+Completions are ranked by rating, then label. The best `MAX_LIMIT` completions
+of every one- and two-character prefix are computed while building, since those
+ranges cover most of the catalog; other prefixes with a large range are memoized
+on first use, which is safe because the index is immutable.
+"""
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAX_OFFSET = 0xFF
+MAX_LIMIT = 50
+SHORT_PREFIX = 2
+CACHED_RANGE = 2_000
+
+
+def normalize(text: str) -> str:
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", text))
+
+
+class PrefixIndex:
+    def __init__(self, entries: Iterable[Tuple[str, str, Optional[float]]]) -> None:
+        """`entries` are (id, label, rating) tuples."""
+        self._ids: List[str] = []
+        self._labels: List[str] = []
+        self._keys: List[str] = []
+        self._ratings = array("d")
+        for entry_id, label, rating in entries:
+            if not label:
+                continue
+            self._ids.append(entry_id)
+            self._labels.append(label)
+            self._keys.append(normalize(label))
+            self._ratings.append(rating if rating is not None else float("-inf"))
+        packed = []
+        for entry, key in enumerate(self._keys):
+            # Normalized keys are words joined by single spaces.
+            offset = 0
+            for word in key.split(" "):
+                if offset > MAX_OFFSET:
+                    break
+                packed.append((entry << 8) | offset)
+                offset += len(word) + 1
+        packed.sort(key=self._key)
+        self._packed = array("Q", packed)
+        self._cache: Dict[Tuple[str, int], List[Tuple[str, str, Optional[float]]]] = {}
+        # Two stable sorts give (rating desc, label) order with C-level sort keys.
+        order = sorted(range(len(self._ids)), key=self._labels.__getitem__)
+        negated = array("d", (-rating for rating in self._ratings))
+        order.sort(key=negated.__getitem__)
+        self._rank = array("I", bytes(4 * len(order)))
+        for position, entry in enumerate(order):
+            self._rank[entry] = position
+        self._short: Dict[str, List[int]] = {}
+        for length in range(1, SHORT_PREFIX + 1):
+            start = 0
+            while start < len(self._packed):
+                prefix = self._key(self._packed[start])[:length]
+                if len(prefix) < length:
+                    # Skip the keys equal to a word shorter than `length`.
+                    start = bisect_left(self._packed, prefix + "\0", start, key=self._key)
+                    continue
+                end = self._range_end(prefix, start)
+                self._short[prefix] = self._best(start, end, MAX_LIMIT)
+                start = end
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _key(self, packed: int) -> str:
+        return self._keys[packed >> 8][packed & MAX_OFFSET:]
+
+    def _range_end(self, prefix: str, start: int) -> int:
+        return bisect_left(self._packed, prefix[:-1] + chr(ord(prefix[-1]) + 1), start, key=self._key)
+
+    def _best(self, start: int, end: int, limit: int) -> List[int]:
+        return heapq.nsmallest(limit, {packed >> 8 for packed in self._packed[start:end]}, key=self._rank.__getitem__)
+
+    def _completion(self, entry: int) -> Tuple[str, str, Optional[float]]:
+        rating = self._ratings[entry]
+        return self._ids[entry], self._labels[entry], rating if rating != float("-inf") else None
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Tuple[str, str, Optional[float]]]:
+        """Returns up to `limit` (id, label, rating) tuples whose words start with `prefix`."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= SHORT_PREFIX and limit <= MAX_LIMIT:
+            return [self._completion(entry) for entry in self._short.get(prefix, [])[:limit]]
+        cached = self._cache.get((prefix, limit))
+        if cached is not None:
+            return cached
+        start = bisect_left(self._packed, prefix, key=self._key)
+        end = self._range_end(prefix, start)
+        completions = [self._completion(entry) for entry in self._best(start, end, limit)]
+        if end - start > CACHED_RANGE:
+            self._cache[(prefix, limit)] = completions
+        return completions
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from schemas.auditorium import AuditoriumCreate, AuditoriumRead, AuditoriumUpdate, AuditoriumList
 from crud.auditorium import create_auditorium, get_auditorium, get_auditoriums, update_auditorium, delete_auditorium
 from crud.cinema import get_cinema
-from dependencies import get_db, RoleRequired
+from crud.schedule import get_free_slots
+from schemas.schedule import AuditoriumFreeSlots
+from dependencies import get_db, get_read_db, RoleRequired
 from schemas.user import UserRole
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import Optional
 
 auditorium_router = APIRouter(prefix="/auditoriums", tags=["auditoriums"])
 
@@ -19,15 +23,27 @@ async def create_auditorium_endpoint(auditorium: AuditoriumCreate, db: AsyncSess
     return new_auditorium
 
 @auditorium_router.get("/{auditorium_id}", response_model=AuditoriumRead)
-async def get_auditorium_endpoint(auditorium_id: str, db: AsyncSession = Depends(get_db)):
+async def get_auditorium_endpoint(auditorium_id: str, db: AsyncSession = Depends(get_read_db)):
     auditorium = await get_auditorium(db, auditorium_id)
     if not auditorium:
         raise HTTPException(status_code=404, detail="Auditorium not found")
     return auditorium
 
+@auditorium_router.get("/{auditorium_id}/free-slots", response_model=AuditoriumFreeSlots)
+async def get_auditorium_free_slots_endpoint(auditorium_id: str, from_: Optional[datetime] = Query(None, alias="from"), to: Optional[datetime] = None, min_minutes: int = Query(0, ge=0), db: AsyncSession = Depends(get_read_db)):
+    start = from_ or datetime.now()
+    end = to or start + timedelta(days=1)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    auditorium = await get_auditorium(db, auditorium_id)
+    if not auditorium:
+        raise HTTPException(status_code=404, detail="Auditorium not found")
+    free_slots = await get_free_slots(db, [auditorium_id], start, end, min_minutes)
+    return free_slots[0]
+
 @auditorium_router.get("/", response_model=AuditoriumList)
-async def get_auditoriums_endpoint(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    auditoriums_data = await get_auditoriums(db, skip=skip, limit=limit)
+async def get_auditoriums_endpoint(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: AsyncSession = Depends(get_read_db)):
+    auditoriums_data = await get_auditoriums(db, skip=skip, limit=limit, cursor=cursor, include_total=include_total)
     return AuditoriumList(**auditoriums_data)
 
 @auditorium_router.put("/{auditorium_id}", response_model=AuditoriumRead)
@@ -1,9 +1,13 @@
 from crud.cinema import create_cinema, get_cinema, get_cinemas, update_cinema, delete_cinema
+from crud.schedule import get_free_slots, get_cinema_auditorium_ids, get_cinema_schedule
 from schemas.cinema import CinemaCreate, CinemaUpdate, CinemaRead, CinemaList
-from fastapi import APIRouter, Depends, HTTPException
+from schemas.schedule import AuditoriumFreeSlots, CinemaSchedule
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from dependencies import get_db, RoleRequired
+from dependencies import get_db, get_read_db, RoleRequired
 from schemas.user import UserRole
+from datetime import datetime, date, timedelta
+from typing import List, Optional
 
 cinema_router = APIRouter(prefix="/cinemas", tags=["cinemas"])
 
@@ -12,15 +16,34 @@ async def create_cinema_endpoint(cinema: CinemaCreate, db: AsyncSession = Depend
     return await create_cinema(db, cinema)
 
 @cinema_router.get("/{cinema_id}", response_model=CinemaRead)
-async def get_cinema_endpoint(cinema_id: str, db: AsyncSession = Depends(get_db)):
+async def get_cinema_endpoint(cinema_id: str, db: AsyncSession = Depends(get_read_db)):
     db_cinema = await get_cinema(db, cinema_id)
     if not db_cinema:
         raise HTTPException(status_code=404, detail="Cinema not found")
     return db_cinema
 
+@cinema_router.get("/{cinema_id}/schedule", response_model=CinemaSchedule)
+async def get_cinema_schedule_endpoint(cinema_id: str, date: Optional[date] = None, db: AsyncSession = Depends(get_read_db)):
+    schedule = await get_cinema_schedule(db, cinema_id, date or datetime.now().date())
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Cinema not found")
+    return schedule
+
+@cinema_router.get("/{cinema_id}/free-slots", response_model=List[AuditoriumFreeSlots])
+async def get_cinema_free_slots_endpoint(cinema_id: str, from_: Optional[datetime] = Query(None, alias="from"), to: Optional[datetime] = None, min_minutes: int = Query(0, ge=0), db: AsyncSession = Depends(get_read_db)):
+    start = from_ or datetime.now()
+    end = to or start + timedelta(days=1)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    db_cinema = await get_cinema(db, cinema_id)
+    if not db_cinema:
+        raise HTTPException(status_code=404, detail="Cinema not found")
+    auditorium_ids = await get_cinema_auditorium_ids(db, cinema_id)
+    return await get_free_slots(db, auditorium_ids, start, end, min_minutes)
+
 @cinema_router.get("/", response_model=CinemaList)
-async def get_cinemas_endpoint(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_db)):
-    return await get_cinemas(db, skip, limit)
+async def get_cinemas_endpoint(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: AsyncSession = Depends(get_read_db)):
+    return await get_cinemas(db, skip, limit, cursor, include_total)
 
 @cinema_router.put("/{cinema_id}", response_model=CinemaRead)
 async def update_cinema_endpoint(cinema_id: str, cinema_update: CinemaUpdate, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN]))):
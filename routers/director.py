@@ -1,11 +1,14 @@
-from crud.director import create_director, get_director, get_directors, update_director, delete_director
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from crud.director import create_director, get_director, get_directors, get_directors_by_ids, update_director, delete_director
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 from schemas.director import DirectorCreate, DirectorRead, DirectorUpdate, DirectorList
-from dependencies import get_db, RoleRequired
+from dependencies import get_db, get_read_db, RoleRequired
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date
 from schemas.user import UserRole
+from schemas.autocomplete import Completion
+from schemas.batch import BatchRequest
+from crud.autocomplete import autocomplete
 
 director_router = APIRouter(prefix="/directors", tags=["directors"])
 
@@ -18,16 +21,24 @@ async def create_director_endpoint(director: DirectorCreate, db: AsyncSession =
         raise HTTPException(status_code=400, detail="Director could not be created")
     return new_director
 
+@director_router.post("/batch", response_model=List[Optional[DirectorRead]])
+async def get_directors_batch_endpoint(batch: BatchRequest, db: AsyncSession = Depends(get_read_db)):
+    return await get_directors_by_ids(batch.ids, db)
+
+@director_router.get("/autocomplete", response_model=List[Completion])
+async def autocomplete_directors_endpoint(q: str = Query(min_length=1), limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_read_db)):
+    return await autocomplete("directors", q, db, limit)
+
 @director_router.get("/{director_id}", response_model=DirectorRead)
-async def get_director_endpoint(director_id: str, db: AsyncSession = Depends(get_db)):
+async def get_director_endpoint(director_id: str, db: AsyncSession = Depends(get_read_db)):
     director = await get_director(director_id, db)
     if not director:
         raise HTTPException(status_code=404, detail="Director not found")
     return director
 
 @director_router.get("/", response_model=DirectorList)
-async def get_directors_endpoint(page: int = 1, size: int = 10, db: AsyncSession = Depends(get_db)):
-    return await get_directors(db, page, size)
+async def get_directors_endpoint(page: int = 1, size: int = 10, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: AsyncSession = Depends(get_read_db)):
+    return await get_directors(db, page, size, cursor, include_total)
 
 @director_router.put("/{director_id}", response_model=DirectorRead)
 async def update_director_endpoint(director_id: str, director: DirectorUpdate, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))):
@@ -1,13 +1,17 @@
-from crud.function import create_function, get_function, get_functions, delete_function, check_auditorium_free, get_active_functions
+from crud.function import create_function, get_function, get_functions, delete_function, check_auditorium_free, get_active_functions, reserve_seats, get_seat_map, create_functions_bulk
+from crud.schedule import pack_schedule
+from crud.seat_hold import create_seat_hold, confirm_seat_hold, release_seat_hold
 from crud.movies import get_movie
 from crud.auditorium import get_auditorium
-from schemas.function import FunctionCreate, FunctionRead, FunctionUpdate, FunctionList
-from fastapi import APIRouter, Depends, HTTPException
+from schemas.function import FunctionCreate, FunctionRead, FunctionUpdate, FunctionList, ReservationCreate, ReservationRead, SeatMapRead, FunctionBulkCreate, FunctionBulkResult
+from schemas.schedule import SchedulePackRequest, SchedulePackResult
+from schemas.seat_hold import SeatHoldCreate, SeatHoldRead
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from dependencies import get_db, RoleRequired
-from schemas.user import UserRole
+from dependencies import get_db, get_read_db, RoleRequired, get_current_user
+from schemas.user import UserRole, TokenData
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 
 function_router = APIRouter(prefix="/functions", tags=["functions"])
@@ -28,27 +32,77 @@ async def function_create_endpoint(function: FunctionCreate, db: Session = Depen
         raise HTTPException(status_code=400, detail="Start time cannot be after end time")
     if function.start_time < datetime.now():
         raise HTTPException(status_code=400, detail="Start time cannot be in the past")
-    function.start_time = function.start_time.strftime("%Y-%m-%d %H:%M:%S")
-    function.end_time = function.end_time.strftime("%Y-%m-%d %H:%M:%S")
-    db_function = await create_function(db, function)
+    db_function = await create_function(db, function, auditorium.capacity)
     if not db_function:
         raise HTTPException(status_code=400, detail="Failed to create function")
     return FunctionRead.model_validate(db_function)
 
+@function_router.post("/bulk", response_model=FunctionBulkResult)
+async def function_bulk_create_endpoint(batch: FunctionBulkCreate, db: Session = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))) -> FunctionBulkResult:
+    return await create_functions_bulk(db, batch.functions)
+
+@function_router.post("/pack", response_model=SchedulePackResult)
+async def function_pack_endpoint(request: SchedulePackRequest, db: Session = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))) -> SchedulePackResult:
+    return await pack_schedule(db, request)
+
 @function_router.get("/all", response_model=FunctionList)
-async def function_get_all_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)) -> FunctionList:
-    return await get_functions(db, skip, limit)
+async def function_get_all_endpoint(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: Session = Depends(get_read_db)) -> FunctionList:
+    return await get_functions(db, skip, limit, cursor, include_total)
 
 @function_router.get("/{function_id}", response_model=FunctionRead)
-async def function_get_endpoint(function_id: str, db: Session = Depends(get_db)) -> FunctionRead:
+async def function_get_endpoint(function_id: str, db: Session = Depends(get_read_db)) -> FunctionRead:
     db_function = await get_function(db, function_id)
     if not db_function:
         raise HTTPException(status_code=404, detail="Function not found")
     return db_function
 
 @function_router.get("/", response_model=List[FunctionRead])
-async def get_active_functions_endpoint(db: Session = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))) -> List[FunctionRead]:
-    return await get_active_functions(db)
+async def get_active_functions_endpoint(
+    from_: Optional[datetime] = Query(None, alias="from"),
+    to: Optional[datetime] = None,
+    cinema_id: Optional[str] = None,
+    movie_id: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db),
+    role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF])),
+) -> List[FunctionRead]:
+    return await get_active_functions(db, from_, to, cinema_id, movie_id, skip, limit)
+
+@function_router.post("/{function_id}/reservations", response_model=ReservationRead)
+async def function_reserve_endpoint(function_id: str, reservation: ReservationCreate, db: Session = Depends(get_db), user: TokenData = Depends(get_current_user)) -> ReservationRead:
+    db_reservation = await reserve_seats(db, function_id, reservation.seats, reservation.seat_numbers)
+    if not db_reservation:
+        raise HTTPException(status_code=404, detail="Function not found")
+    return db_reservation
+
+@function_router.post("/{function_id}/holds", response_model=SeatHoldRead)
+async def function_hold_endpoint(function_id: str, hold: SeatHoldCreate, db: Session = Depends(get_db), user: TokenData = Depends(get_current_user)) -> SeatHoldRead:
+    db_hold = await create_seat_hold(db, function_id, user.id, hold.seats, hold.seat_numbers)
+    if not db_hold:
+        raise HTTPException(status_code=404, detail="Function not found")
+    return db_hold
+
+@function_router.post("/holds/{hold_id}/confirm", response_model=ReservationRead)
+async def hold_confirm_endpoint(hold_id: str, db: Session = Depends(get_db), user: TokenData = Depends(get_current_user)) -> ReservationRead:
+    db_reservation = await confirm_seat_hold(db, hold_id, user.id)
+    if not db_reservation:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return db_reservation
+
+@function_router.delete("/holds/{hold_id}", response_model=SeatHoldRead)
+async def hold_release_endpoint(hold_id: str, db: Session = Depends(get_db), user: TokenData = Depends(get_current_user)) -> SeatHoldRead:
+    db_hold = await release_seat_hold(db, hold_id, user.id)
+    if not db_hold:
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return db_hold
+
+@function_router.get("/{function_id}/seats", response_model=SeatMapRead)
+async def function_seats_endpoint(function_id: str, db: Session = Depends(get_read_db)) -> SeatMapRead:
+    db_seat_map = await get_seat_map(db, function_id)
+    if not db_seat_map:
+        raise HTTPException(status_code=404, detail="Function not found")
+    return db_seat_map
 
 @function_router.delete("/{function_id}", response_model=FunctionRead)
 async def function_delete_endpoint(function_id: str, db: Session = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))) -> FunctionRead:
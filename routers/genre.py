@@ -1,8 +1,12 @@
-from crud.genre import create_genre, get_genre, get_genres, update_genre, delete_genre
-from fastapi import APIRouter, HTTPException, Depends
+from crud.genre import create_genre, get_genre, get_genres, get_genres_by_ids, update_genre, delete_genre
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 from schemas.genre import GenreCreate, GenreRead, GenreUpdate, GenreList
 from schemas.user import UserRole
-from dependencies import get_db, RoleRequired
+from schemas.autocomplete import Completion
+from schemas.batch import BatchRequest
+from crud.autocomplete import autocomplete
+from dependencies import get_db, get_read_db, RoleRequired
 from sqlalchemy.ext.asyncio import AsyncSession
 
 genre_router = APIRouter(prefix="/genres", tags=["genres"])
@@ -14,16 +18,24 @@ async def create_genre_endpoint(genre: GenreCreate, db: AsyncSession = Depends(g
         raise HTTPException(status_code=400, detail="Genre could not be created")
     return new_genre
 
+@genre_router.post("/batch", response_model=List[Optional[GenreRead]])
+async def get_genres_batch_endpoint(batch: BatchRequest, db: AsyncSession = Depends(get_read_db)):
+    return await get_genres_by_ids(batch.ids, db)
+
+@genre_router.get("/autocomplete", response_model=List[Completion])
+async def autocomplete_genres_endpoint(q: str = Query(min_length=1), limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_read_db)):
+    return await autocomplete("genres", q, db, limit)
+
 @genre_router.get("/{genre_id}", response_model=GenreRead)
-async def get_genre_endpoint(genre_id: str, db: AsyncSession = Depends(get_db)):
+async def get_genre_endpoint(genre_id: str, db: AsyncSession = Depends(get_read_db)):
     genre = await get_genre(genre_id, db)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
     return genre
 
 @genre_router.get("/", response_model=GenreList)
-async def get_genres_endpoint(page: int = 1, size: int = 10, db: AsyncSession = Depends(get_db)):
-    return await get_genres(db, page, size)
+async def get_genres_endpoint(page: int = 1, size: int = 10, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: AsyncSession = Depends(get_read_db)):
+    return await get_genres(db, page, size, cursor, include_total)
 
 @genre_router.put("/{genre_id}", response_model=GenreRead)
 async def update_genre_endpoint(genre_id: str, genre: GenreUpdate, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))):
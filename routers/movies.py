@@ -1,69 +1,106 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
-from schemas.movies import MovieCreate, MovieRead, MovieUpdate, MovieList
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Literal, Optional
+from schemas.movies import MovieCreate, MovieRead, MovieUpdate, MovieList, MovieSearchResult, MovieFilter, MovieFacetedResult, MovieBulkResult
 from schemas.user import UserRole
-from dependencies import get_db, RoleRequired
+from dependencies import get_db, get_read_db, RoleRequired
 from sqlalchemy.ext.asyncio import AsyncSession
-from crud.movies import create_movie as create_movie_crud, get_movie, get_movies, update_movie, delete_movie, get_movie_by_title, get_list_of_movies_by_title_like, get_movies_by_genre
-from crud.director import get_director
+from crud.movies import create_movie as create_movie_crud, get_movie, get_movies, get_movies_by_ids, update_movie, delete_movie, get_movie_by_title, get_list_of_movies_by_title_like, get_list_of_movies_by_title_fuzzy, get_movies_by_genre, search_movies, search_movies_faceted
 from crud.genre import get_genre
+from crud.autocomplete import autocomplete
+from crud.bulk import BULK_BATCH_SIZE, create_movies_bulk, read_lines, read_records
+from schemas.autocomplete import Completion
+from schemas.batch import BatchRequest
 
 movie_router = APIRouter(prefix="/movies", tags=["movies"])
 
 @movie_router.post("/", response_model=MovieRead)
 async def create_movie(movie: MovieCreate, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))):
-    director = await get_director(movie.director, db)
-    print(director)
-    if not director:
-        raise HTTPException(status_code=400, detail="Director not found")
-    for genre_id in movie.genres:
-        genre = await get_genre(genre_id, db)
-        print(genre)
-        if not genre:
-            raise HTTPException(status_code=400, detail="Genre not found")
     return await create_movie_crud(movie, db)
 
+@movie_router.get("/fulltext", response_model=MovieSearchResult)
+async def search_movies_endpoint(q: str = Query(min_length=1), page: int = Query(1, ge=1), size: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_read_db)):
+    return await search_movies(q, db, page, size)
+
+@movie_router.post("/bulk", response_model=MovieBulkResult)
+async def create_movies_bulk_endpoint(
+    request: Request,
+    format: Literal["jsonl", "csv"] = "jsonl",
+    batch_size: int = Query(BULK_BATCH_SIZE, ge=1, le=10_000),
+    db: AsyncSession = Depends(get_db),
+    role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF])),
+):
+    """Loads the JSONL or CSV request body as it streams in; see crud/bulk.py for the format."""
+    return await create_movies_bulk(read_records(read_lines(request.stream()), format), db, batch_size)
+
+@movie_router.post("/batch", response_model=List[Optional[MovieRead]])
+async def get_movies_batch_endpoint(batch: BatchRequest, db: AsyncSession = Depends(get_read_db)):
+    return await get_movies_by_ids(batch.ids, db)
+
+@movie_router.get("/search", response_model=MovieFacetedResult)
+async def search_movies_faceted_endpoint(
+    year_from: Optional[int] = None,
+    year_to: Optional[int] = None,
+    min_rating: Optional[float] = None,
+    language: Optional[str] = None,
+    director: Optional[str] = None,
+    genres: List[str] = Query([]),
+    genre_match: Literal["any", "all"] = "any",
+    max_duration: Optional[int] = None,
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+):
+    filters = MovieFilter(
+        year_from=year_from, year_to=year_to, min_rating=min_rating, language=language,
+        director=director, genres=genres, genre_match=genre_match, max_duration=max_duration,
+    )
+    return await search_movies_faceted(filters, db, page, size)
+
+@movie_router.get("/autocomplete", response_model=List[Completion])
+async def autocomplete_movies_endpoint(q: str = Query(min_length=1), limit: int = Query(10, ge=1, le=50), db: AsyncSession = Depends(get_read_db)):
+    return await autocomplete("movies", q, db, limit)
+
 @movie_router.get("/{movie_id}", response_model=MovieRead)
-async def get_movie_endpoint(movie_id: str, db: AsyncSession = Depends(get_db)):
+async def get_movie_endpoint(movie_id: str, db: AsyncSession = Depends(get_read_db)):
     searched_movie = await get_movie(movie_id, db)
     if not searched_movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     return searched_movie
 
 @movie_router.get("/title/{title}", response_model=MovieRead)
-async def get_movie_by_title_endpoint(title: str, db: AsyncSession = Depends(get_db)):
+async def get_movie_by_title_endpoint(title: str, db: AsyncSession = Depends(get_read_db)):
     searched_movie = await get_movie_by_title(title, db)
     if not searched_movie:
         raise HTTPException(status_code=404, detail="Movie not found")
     return searched_movie
 
 @movie_router.get("/title_like/{name}", response_model=List[MovieRead])
-async def get_list_of_movies_by_title_like_endpoint(name: str, db: AsyncSession = Depends(get_db)):
-    return await get_list_of_movies_by_title_like(name, db)
+async def get_list_of_movies_by_title_like_endpoint(name: str, fuzzy: bool = False, page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_read_db)):
+    if fuzzy:
+        return await get_list_of_movies_by_title_fuzzy(name, db, limit)
+    return await get_list_of_movies_by_title_like(name, db, page, limit)
 
 @movie_router.get("/genre/{genre_id}", response_model=List[MovieRead])
-async def get_movies_by_genre_endpoint(genre_id: str, db: AsyncSession = Depends(get_db)):
+async def get_movies_by_genre_endpoint(genre_id: str, db: AsyncSession = Depends(get_read_db)):
     genre = await get_genre(genre_id, db)
     if not genre:
         raise HTTPException(status_code=404, detail="Genre not found")
     return await get_movies_by_genre(genre_id, db)
 
 @movie_router.get("/", response_model=MovieList)
-async def get_movies_endpoint(page: int = 1, size: int = 10, db: AsyncSession = Depends(get_db)):
-    return await get_movies(db, page, size)
+async def get_movies_endpoint(page: int = 1, size: int = 10, cursor: Optional[str] = None, include_total: Optional[bool] = None, db: AsyncSession = Depends(get_read_db)):
+    return await get_movies(db, page, size, cursor, include_total)
 
 @movie_router.put("/{movie_id}", response_model=MovieRead)
 async def update_movie_endpoint(movie_id: str, movie: MovieUpdate, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))):
-    existing_movie = await get_movie(movie_id, db)
-    if not existing_movie:
-        raise HTTPException(status_code=404, detail="Movie not found")
     updated_movie = await update_movie(movie_id, movie, db)
+    if not updated_movie:
+        raise HTTPException(status_code=404, detail="Movie not found")
     return updated_movie
 
 @movie_router.delete("/{movie_id}", response_model=MovieRead)
 async def delete_movie_endpoint(movie_id: str, db: AsyncSession = Depends(get_db), role: UserRole = Depends(RoleRequired([UserRole.ADMIN, UserRole.STAFF]))):
-    movie = await get_movie(movie_id, db)
-    if not movie:
+    deleted_movie = await delete_movie(movie_id, db)
+    if not deleted_movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    await delete_movie(movie_id, db)
-    return movie
\ No newline at end of file
+    return deleted_movie
\ No newline at end of file
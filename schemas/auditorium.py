@@ -20,6 +20,7 @@ class AuditoriumUpdate(BaseModel):
 
 class AuditoriumList(BaseModel):
     auditoriums: list[AuditoriumRead]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
+    next_cursor: Optional[str] = None
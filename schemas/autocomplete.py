@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+
+class Completion(BaseModel):
+    id: str
+    name: str
+    rating: Optional[float] = None
@@ -0,0 +1,7 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+MAX_BATCH_IDS = 500
+
+class BatchRequest(BaseModel):
+    ids: List[str] = Field(min_length=1, max_length=MAX_BATCH_IDS)
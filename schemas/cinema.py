@@ -20,6 +20,7 @@ class CinemaUpdate(BaseModel):
 
 class CinemaList(BaseModel):
     cinemas: List[CinemaRead]
-    total: int
-    page: int
-    size: int
\ No newline at end of file
+    total: int | None = None
+    page: int | None = None
+    size: int
+    next_cursor: str | None = None
\ No newline at end of file
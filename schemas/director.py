@@ -23,6 +23,7 @@ class DirectorUpdate(BaseModel):
 
 class DirectorList(BaseModel):
     directors: List[DirectorRead]
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     size: int
+    next_cursor: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 from typing import List, Optional
 from datetime import datetime, date
 
@@ -25,8 +25,44 @@ class FunctionUpdate(BaseModel):
     movie_id: Optional[str] = None
     auditorium_id: Optional[str] = None
 
+class FunctionBulkCreate(BaseModel):
+    functions: List[FunctionCreate] = Field(min_length=1, max_length=2000)
+
+class FunctionBulkError(BaseModel):
+    index: int
+    detail: str
+
+class FunctionBulkResult(BaseModel):
+    created: List[FunctionRead]
+    errors: List[FunctionBulkError]
+
 class FunctionList(BaseModel):
     functions: List[FunctionRead]
-    total: int
-    page: int
-    size: int
\ No newline at end of file
+    total: Optional[int] = None
+    page: Optional[int] = None
+    size: int
+    next_cursor: Optional[str] = None
+
+class ReservationCreate(BaseModel):
+    seats: Optional[int] = Field(default=None, gt=0)
+    seat_numbers: Optional[List[int]] = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def check_seats(self):
+        if self.seat_numbers is None and self.seats is None:
+            raise ValueError("Either seats or seat_numbers is required")
+        if self.seat_numbers is not None and self.seats not in (None, len(self.seat_numbers)):
+            raise ValueError("seats does not match the number of seat_numbers")
+        return self
+
+class ReservationRead(BaseModel):
+    function_id: str
+    seats: int
+    seat_numbers: List[int]
+    available_seats: int
+
+class SeatMapRead(BaseModel):
+    function_id: str
+    capacity: int
+    available_seats: int
+    seat_map: str
\ No newline at end of file
@@ -18,6 +18,7 @@ class GenreUpdate(BaseModel):
 
 class GenreList(BaseModel):
     genres: List[GenreRead]
-    total: int
-    page: int
-    size: int
\ No newline at end of file
+    total: Optional[int] = None
+    page: Optional[int] = None
+    size: int
+    next_cursor: Optional[str] = None
\ No newline at end of file
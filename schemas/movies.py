@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from typing import List, Literal, Optional
 from .genre import GenreRead
 
 class MovieBase(BaseModel):
@@ -34,7 +34,61 @@ class MovieUpdate(BaseModel):
     director: Optional[str] = None
     
 class MovieList(BaseModel):
+    movies: List[MovieRead]
+    total: Optional[int] = None
+    page: Optional[int] = None
+    size: int
+    next_cursor: Optional[str] = None
+
+class MovieSearchHit(BaseModel):
+    movie: MovieRead
+    score: float
+    snippet: str
+
+class MovieSearchResult(BaseModel):
+    results: List[MovieSearchHit]
+    total: int
+    page: int
+    size: int
+
+class MovieFilter(BaseModel):
+    year_from: Optional[int] = None
+    year_to: Optional[int] = None
+    min_rating: Optional[float] = None
+    language: Optional[str] = None
+    director: Optional[str] = None
+    genres: List[str] = []
+    genre_match: Literal["any", "all"] = "any"
+    max_duration: Optional[int] = None
+
+class MovieFacet(BaseModel):
+    value: str
+    label: str
+    count: int
+
+class MovieFacets(BaseModel):
+    genres: List[MovieFacet]
+    languages: List[MovieFacet]
+    decades: List[MovieFacet]
+
+class MovieFacetedResult(BaseModel):
     movies: List[MovieRead]
     total: int
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    facets: MovieFacets
+
+class MovieBulkRow(MovieBase):
+    """A movie of a bulk load; `director` and `genres` may be names or ids."""
+    genres: List[str] = []
+
+class MovieBulkError(BaseModel):
+    index: int
+    detail: str
+
+class MovieBulkResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: List[MovieBulkError]
+    seconds: float
+    rows_per_second: float
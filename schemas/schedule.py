@@ -0,0 +1,67 @@
+from pydantic import BaseModel, Field, model_validator
+from typing import Dict, List, Optional
+from datetime import datetime, date, time, timedelta
+from .function import FunctionCreate, FunctionRead
+from .cinema import CinemaRead
+
+class FreeSlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+class AuditoriumFreeSlots(BaseModel):
+    auditorium_id: str
+    free_slots: List[FreeSlot]
+
+
+class SchedulePackRequest(BaseModel):
+    movie_ids: List[str] = Field(min_length=1)
+    auditorium_ids: List[str] = Field(min_length=1)
+    from_date: date
+    to_date: Optional[date] = None
+    opening_time: time = time(10, 0)
+    closing_time: time = time(23, 59)
+    buffer_minutes: int = Field(default=15, ge=0)
+    align_minutes: int = Field(default=5, ge=1, le=60)
+    price: float
+    persist: bool = False
+
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.to_date is not None and self.to_date < self.from_date:
+            raise ValueError("to_date cannot be before from_date")
+        if (self.to_date or self.from_date) - self.from_date > timedelta(days=31):
+            raise ValueError("A schedule can span at most 31 days")
+        return self
+
+class SchedulePackResult(BaseModel):
+    functions: List[FunctionCreate]
+    created: List[FunctionRead]
+
+
+class ScheduledFunction(BaseModel):
+    id: str
+    movie_id: str
+    start_time: datetime
+    end_time: datetime
+    price: float
+    available_seats: int
+
+class AuditoriumSchedule(BaseModel):
+    id: str
+    name: str
+    capacity: int
+    functions: List[ScheduledFunction]
+
+class MovieSummary(BaseModel):
+    id: str
+    title: str
+    duration: Optional[int] = None
+    rating: Optional[float] = None
+    language: Optional[str] = None
+    image: Optional[str] = None
+
+class CinemaSchedule(BaseModel):
+    cinema: CinemaRead
+    date: date
+    auditoriums: List[AuditoriumSchedule]
+    movies: Dict[str, MovieSummary]
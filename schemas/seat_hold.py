@@ -0,0 +1,14 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List
+from datetime import datetime
+from .function import ReservationCreate
+
+class SeatHoldCreate(ReservationCreate):
+    pass
+
+class SeatHoldRead(BaseModel):
+    id: str
+    function_id: str
+    seat_numbers: List[int]
+    expires_at: datetime
+    model_config = ConfigDict(from_attributes=True)
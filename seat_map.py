@@ -0,0 +1,51 @@
+"""
+Bitmap seat maps for functions.
+
+Seat `n` (1-based) is bit `(n - 1) % 8` of byte `(n - 1) // 8`; a set bit means the
+seat is taken. Padding bits past the auditorium capacity are always set, so
+counting clear bits gives the number of free seats without knowing the capacity.
+"""
+from typing import Iterable, List
+
+
+def new_seat_map(capacity: int, available_seats: int) -> bytes:
+    """Seats above `available_seats` start out taken, matching the function's counter."""
+    seat_map = bytearray(b"\xff" * ((capacity + 7) // 8))
+    for seat in range(1, available_seats + 1):
+        seat_map[(seat - 1) // 8] &= ~(1 << ((seat - 1) % 8))
+    return bytes(seat_map)
+
+
+def size(seat_map: bytes) -> int:
+    return len(seat_map) * 8
+
+
+def count_free(seat_map: bytes) -> int:
+    return size(seat_map) - int.from_bytes(seat_map, "little").bit_count()
+
+
+def is_free(seat_map: bytes, seat: int) -> bool:
+    return not seat_map[(seat - 1) // 8] & (1 << ((seat - 1) % 8))
+
+
+def free_seats(seat_map: bytes, limit: int | None = None) -> List[int]:
+    seats = []
+    for index, byte in enumerate(seat_map):
+        if byte == 0xFF:
+            continue
+        for bit in range(8):
+            if not byte & (1 << bit):
+                seats.append(index * 8 + bit + 1)
+                if limit is not None and len(seats) == limit:
+                    return seats
+    return seats
+
+
+def take(seat_map: bytearray, seats: Iterable[int]) -> None:
+    for seat in seats:
+        seat_map[(seat - 1) // 8] |= 1 << ((seat - 1) % 8)
+
+
+def release(seat_map: bytearray, seats: Iterable[int]) -> None:
+    for seat in seats:
+        seat_map[(seat - 1) // 8] &= ~(1 << ((seat - 1) % 8))
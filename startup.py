@@ -0,0 +1,98 @@
+"""
+Database preparation at startup, coordinated between worker processes.
+
+`uvicorn main:app --workers N` runs the lifespan in every worker at once, and
+each would create tables, migrate and seed the same SQLite file, contending for
+its write lock and failing on each other's inserts. Instead every worker first
+checks whether the database is ready (two reads), and only if not takes an
+exclusive lock on a file next to the database, checks again and prepares it.
+The workers that queued on the lock find it ready once they get it.
+"""
+import asyncio
+import os
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from database import Base
+from data_loader import SEED_MARKER, load_data
+from migrations import MIGRATIONS, run_migrations
+from models.schema_migration import SchemaMigration
+
+try:
+    import fcntl
+except ImportError:  # Windows: a single worker, nothing to coordinate with.
+    fcntl = None
+
+
+def _expected_objects() -> set:
+    names = {"movies_fts"}
+    for table in Base.metadata.sorted_tables:
+        names.add(table.name)
+        names.update(index.name for index in table.indexes)
+    return names
+
+
+async def is_ready(engine: AsyncEngine, seed: bool = True) -> bool:
+    """Whether every table, index and migration is in place, and the seed if wanted."""
+    if engine.dialect.name != "sqlite":
+        return False
+    async with engine.connect() as conn:
+        existing = set((await conn.execute(text(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'index')"
+        ))).scalars())
+        if not _expected_objects() <= existing:
+            return False
+        applied = set((await conn.execute(select(SchemaMigration.name))).scalars())
+    wanted = {name for name, _ in MIGRATIONS}
+    if seed:
+        wanted.add(SEED_MARKER)
+    return wanted <= applied
+
+
+def _lock_path(engine: AsyncEngine) -> str | None:
+    database = engine.url.database
+    if fcntl is None or engine.dialect.name != "sqlite" or database in (None, "", ":memory:"):
+        return None
+    return os.path.abspath(database) + ".lock"
+
+
+async def _prepare(engine: AsyncEngine, session_factory, seed: bool):
+    async with engine.connect() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(run_migrations)
+        await conn.commit()
+        if engine.dialect.name == "sqlite":
+            # Migrations leave foreign keys off on their connection. Switch them back
+            # on, now that no transaction is open, before it returns to the pool;
+            # disposing the pool instead would lose an in-memory database.
+            await conn.execute(text("PRAGMA foreign_keys=ON"))
+            await conn.commit()
+    if seed:
+        async with session_factory() as db:
+            await load_data(db)
+
+
+async def prepare_database(engine: AsyncEngine, session_factory, seed: bool = True) -> bool:
+    """
+    Creates, migrates and optionally seeds the database unless it is ready already.
+    Returns whether this process did the work.
+    """
+    if await is_ready(engine, seed):
+        return False
+    path = _lock_path(engine)
+    if path is None:
+        await _prepare(engine, session_factory, seed)
+        return True
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        # flock blocks, so wait in a thread to keep this worker's event loop free.
+        await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+        if await is_ready(engine, seed):
+            return False
+        await _prepare(engine, session_factory, seed)
+        return True
+    finally:
+        # Closing the descriptor releases the lock; the file stays for the next boot.
+        os.close(fd)
@@ -0,0 +1,24 @@
+import asyncio
+import logging
+from database import SessionLocal
+from crud.seat_hold import release_expired_seat_holds
+
+SWEEP_BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+async def sweep_expired_seat_holds(interval: float = 30, batch_size: int = SWEEP_BATCH_SIZE):
+    """
+    Background loop started from the app lifespan. Every `interval` seconds it
+    releases expired seat holds in batches until none are left, so requests never
+    have to look for expired holds themselves.
+    """
+    while True:
+        try:
+            async with SessionLocal() as db:
+                while await release_expired_seat_holds(db, batch_size) == batch_size:
+                    pass
+        except Exception:
+            logger.exception("Seat hold sweep failed")
+        await asyncio.sleep(interval)
@@ -8,7 +8,7 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from main import app
 from database import Base
-from dependencies import get_db
+from dependencies import get_db, get_read_db
 from datetime import datetime, timedelta
 import jwt
 from schemas.user import UserRole
@@ -38,6 +38,7 @@ async def override_get_db():
         yield session
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_read_db] = override_get_db
 
 @pytest_asyncio.fixture(scope="function")
 async def client():
@@ -1,3 +1,4 @@
+from datetime import datetime, timedelta
 from uuid import uuid4
 
 async def test_create_auditorium(client, cinema_fixture, admin_token_fixture):
@@ -74,6 +75,15 @@ async def test_update_auditorium(client, auditorium_fixture, admin_token_fixture
     data = response.json()
     assert data["name"] == "Updated Name"
 
+async def test_update_auditorium_cinema_not_found(client, auditorium_fixture, admin_token_fixture):
+    """Test that moving an auditorium to a missing cinema is rejected."""
+    auditorium_id = auditorium_fixture["id"]
+    headers = {"Authorization": f"Bearer {admin_token_fixture}"}
+    response = await client.put(f"/auditoriums/{auditorium_id}", json={"cinema_id": "nope"}, headers=headers)
+    assert response.status_code == 400
+    response = await client.get(f"/auditoriums/{auditorium_id}")
+    assert response.json()["cinema_id"] == auditorium_fixture["cinema_id"]
+
 async def test_delete_auditorium(client, auditorium_fixture, admin_token_fixture):
     """Test deleting an auditorium."""
     auditorium_id = auditorium_fixture["id"]
@@ -82,4 +92,42 @@ async def test_delete_auditorium(client, auditorium_fixture, admin_token_fixture
     assert response.status_code == 200
     # Verify that the auditorium is deleted
     response = await client.get(f"/auditoriums/{auditorium_id}")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+async def test_get_auditorium_free_slots(client, auditorium_fixture, function_fixture):
+    """Test that free slots are the gaps around existing functions."""
+    auditorium_id = auditorium_fixture["id"]
+    function_start = datetime.fromisoformat(function_fixture["data"]["start_time"])
+    function_end = datetime.fromisoformat(function_fixture["data"]["end_time"])
+    window_start = function_start - timedelta(hours=2)
+    window_end = function_end + timedelta(hours=3)
+    response = await client.get(f"/auditoriums/{auditorium_id}/free-slots", params={"from": window_start.isoformat(), "to": window_end.isoformat()})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["auditorium_id"] == auditorium_id
+    assert [(datetime.fromisoformat(slot["start_time"]), datetime.fromisoformat(slot["end_time"])) for slot in data["free_slots"]] == [
+        (window_start, function_start),
+        (function_end, window_end),
+    ]
+
+    response = await client.get(f"/auditoriums/{auditorium_id}/free-slots", params={"from": window_start.isoformat(), "to": window_end.isoformat(), "min_minutes": 150})
+    assert [datetime.fromisoformat(slot["start_time"]) for slot in response.json()["free_slots"]] == [function_end]
+
+async def test_get_auditorium_free_slots_inside_function(client, auditorium_fixture, function_fixture):
+    """Test that a window covered by a function has no free slots."""
+    function_start = datetime.fromisoformat(function_fixture["data"]["start_time"])
+    params = {"from": (function_start + timedelta(minutes=10)).isoformat(), "to": (function_start + timedelta(minutes=20)).isoformat()}
+    response = await client.get(f"/auditoriums/{auditorium_fixture['id']}/free-slots", params=params)
+    assert response.status_code == 200
+    assert response.json()["free_slots"] == []
+
+async def test_get_auditorium_free_slots_not_found(client):
+    """Test free slots for an auditorium that does not exist."""
+    response = await client.get("/auditoriums/non-existent-id/free-slots")
+    assert response.status_code == 404
+
+async def test_get_auditorium_free_slots_invalid_window(client, auditorium_fixture):
+    """Test free slots with 'to' before 'from'."""
+    params = {"from": "2030-01-02T00:00:00", "to": "2030-01-01T00:00:00"}
+    response = await client.get(f"/auditoriums/{auditorium_fixture['id']}/free-slots", params=params)
+    assert response.status_code == 400
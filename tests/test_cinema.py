@@ -1,3 +1,5 @@
+from datetime import datetime, timedelta
+
 async def test_create_cinema(client, admin_token_fixture):
     headers = {"Authorization": f"Bearer {admin_token_fixture}"}
     response = await client.post("/cinemas/", json={"name": "New Cinema", "location": "456 Oak Ave", "number": 2}, headers=headers)
@@ -112,3 +114,49 @@ async def test_get_cinemas_pagination(client, admin_token_fixture):
     # The number of items on the second page depends on the initial total
     # This makes the test more robust
     assert len(data["cinemas"]) > 0
+
+async def test_get_cinema_free_slots(client, cinema_fixture, auditorium_fixture, function_fixture, admin_token_fixture):
+    headers = {"Authorization": f"Bearer {admin_token_fixture}"}
+    response = await client.post("/auditoriums/", json={"name": "2B", "cinema_id": cinema_fixture["id"], "capacity": 50}, headers=headers)
+    empty_auditorium_id = response.json()["id"]
+    function_start = datetime.fromisoformat(function_fixture["data"]["start_time"])
+    window_start = function_start - timedelta(hours=1)
+    window_end = function_start + timedelta(hours=3)
+    response = await client.get(f"/cinemas/{cinema_fixture['id']}/free-slots", params={"from": window_start.isoformat(), "to": window_end.isoformat(), "min_minutes": 30})
+    assert response.status_code == 200
+    slots = {auditorium["auditorium_id"]: auditorium["free_slots"] for auditorium in response.json()}
+    assert len(slots[auditorium_fixture["id"]]) == 2
+    assert slots[empty_auditorium_id] == [{"start_time": window_start.isoformat(), "end_time": window_end.isoformat()}]
+
+async def test_get_cinema_free_slots_not_found(client):
+    response = await client.get("/cinemas/non-existent-id/free-slots")
+    assert response.status_code == 404
+
+async def test_get_cinema_schedule(client, cinema_fixture, auditorium_fixture, function_fixture, movie_fixture, admin_token_fixture):
+    headers = {"Authorization": f"Bearer {admin_token_fixture}"}
+    response = await client.post("/auditoriums/", json={"name": "ZZ", "cinema_id": cinema_fixture["id"], "capacity": 50}, headers=headers)
+    empty_auditorium_id = response.json()["id"]
+    day = function_fixture["start_time"][:10]
+    response = await client.get(f"/cinemas/{cinema_fixture['id']}/schedule", params={"date": day})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cinema"]["id"] == cinema_fixture["id"]
+    assert data["date"] == day
+    assert [auditorium["id"] for auditorium in data["auditoriums"]] == [auditorium_fixture["id"], empty_auditorium_id]
+    assert [function["id"] for function in data["auditoriums"][0]["functions"]] == [function_fixture["data"]["id"]]
+    assert data["auditoriums"][1]["functions"] == []
+    assert data["movies"][movie_fixture["id"]]["title"] == movie_fixture["title"]
+
+    next_day = (datetime.fromisoformat(day) + timedelta(days=1)).date().isoformat()
+    response = await client.get(f"/cinemas/{cinema_fixture['id']}/schedule", params={"date": next_day})
+    assert all(auditorium["functions"] == [] for auditorium in response.json()["auditoriums"])
+    assert response.json()["movies"] == {}
+
+async def test_get_cinema_schedule_without_auditoriums(client, cinema_fixture):
+    response = await client.get(f"/cinemas/{cinema_fixture['id']}/schedule")
+    assert response.status_code == 200
+    assert response.json()["auditoriums"] == []
+
+async def test_get_cinema_schedule_not_found(client):
+    response = await client.get("/cinemas/non-existent-id/schedule")
+    assert response.status_code == 404
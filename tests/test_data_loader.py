@@ -0,0 +1,29 @@
+from sqlalchemy import func, insert, select
+from data_loader import load_data, MOVIES
+from models import Director, Function, Movie, MovieGenre
+from tests.conftest import TestingSessionLocal
+
+
+async def test_load_data_once(client):
+    async with TestingSessionLocal() as db:
+        assert await load_data(db) is True
+        assert await load_data(db) is False
+        assert await db.scalar(select(func.count()).select_from(Movie)) == len(MOVIES)
+        assert await db.scalar(select(func.count()).select_from(MovieGenre)) == sum(len(movie["genres"]) for movie in MOVIES)
+        assert await db.scalar(select(func.count()).select_from(Function)) == 4
+
+    response = await client.get("/movies/title/Inception")
+    assert response.status_code == 200
+    assert sorted(genre["name"] for genre in response.json()["genres"]) == ["Action", "Science Fiction"]
+    response = await client.get("/movies/fulltext", params={"q": "nolan"})
+    assert response.json()["total"] == 2
+
+
+async def test_load_data_keeps_existing_catalog(client):
+    async with TestingSessionLocal() as db:
+        await db.execute(insert(Director).values(id="existing", name="Frank Darabont"))
+        await db.commit()
+        assert await load_data(db) is False
+        assert await load_data(db) is False
+        assert await db.scalar(select(func.count()).select_from(Director)) == 1
+        assert await db.scalar(select(func.count()).select_from(Movie)) == 0
@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from database import EngineSettings, make_engine, read_only_url
+
+
+def test_engine_settings_from_env(monkeypatch):
+    monkeypatch.setenv("DB_JOURNAL_MODE", "DELETE")
+    monkeypatch.setenv("DB_BUSY_TIMEOUT", "250")
+    monkeypatch.setenv("DB_POOL_PRE_PING", "true")
+    settings = EngineSettings.from_env()
+    assert settings.journal_mode == "DELETE"
+    assert settings.busy_timeout == 250
+    assert settings.pool_pre_ping is True
+    assert settings.synchronous == "NORMAL"
+
+
+async def test_make_engine_applies_pragmas(tmp_path):
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}", EngineSettings(synchronous="FULL", busy_timeout=1234, pool_size=3))
+    try:
+        async with engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 2
+            assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == 1234
+            assert (await conn.execute(text("PRAGMA foreign_keys"))).scalar() == 1
+        assert engine.pool.size() == 3
+    finally:
+        await engine.dispose()
+
+
+async def test_read_only_engine(tmp_path):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}"
+    assert read_only_url("sqlite+aiosqlite:///:memory:") is None
+    assert read_only_url("postgresql+asyncpg://db/cinema") is None
+    engine = make_engine(url, EngineSettings())
+    read_engine = make_engine(read_only_url(url), EngineSettings())
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE seen (id INTEGER)"))
+            await conn.execute(text("INSERT INTO seen VALUES (1)"))
+        async with read_engine.connect() as conn:
+            assert (await conn.execute(text("SELECT count(*) FROM seen"))).scalar() == 1
+            with pytest.raises(OperationalError, match="readonly"):
+                await conn.execute(text("INSERT INTO seen VALUES (2)"))
+    finally:
+        await read_engine.dispose()
+        await engine.dispose()
@@ -69,6 +69,15 @@ async def test_delete_director_not_found(client, staff_token_fixture):
     response = await client.delete("/directors/non_existent_id", headers=headers)
     assert response.status_code == 404
 
+async def test_delete_director_with_movies(client, movie_fixture, director_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.delete(f"/directors/{director_fixture['id']}", headers=headers)
+    assert response.status_code == 409
+    response = await client.get(f"/directors/{director_fixture['id']}")
+    assert response.status_code == 200
+    response = await client.get(f"/movies/{movie_fixture['id']}")
+    assert response.status_code == 200
+
 async def test_create_director_missing_field(client, staff_token_fixture):
     headers = {"Authorization": f"Bearer {staff_token_fixture}"}
     response = await client.post("/directors/", json={"nationality": "USA"}, headers=headers)
@@ -107,3 +116,37 @@ async def test_get_directors_pagination(client, staff_token_fixture):
     # The number of items on the second page depends on the initial total
     # This makes the test more robust
     assert len(data["directors"]) > 0
+
+async def test_autocomplete_directors(client, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    director = (await client.post("/directors/", json={"name": "Agnès Varda"}, headers=headers)).json()
+    response = await client.get("/directors/autocomplete", params={"q": "agnes"})
+    assert response.status_code == 200
+    assert [completion["id"] for completion in response.json()] == [director["id"]]
+    response = await client.get("/directors/autocomplete", params={"q": "var"})
+    assert [completion["name"] for completion in response.json()] == ["Agnès Varda"]
+
+    await client.delete(f"/directors/{director['id']}", headers=headers)
+    response = await client.get("/directors/autocomplete", params={"q": "var"})
+    assert response.json() == []
+
+async def test_read_directors_by_cursor(client, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    for i in range(3):
+        await client.post("/directors/", json={"name": f"Cursor Director {i}"}, headers=headers)
+    first = (await client.get("/directors/", params={"size": 2})).json()
+    response = await client.get("/directors/", params={"size": 2, "cursor": first["next_cursor"], "include_total": True})
+    assert response.status_code == 200
+    second = response.json()
+    assert second["total"] == 3
+    assert second["next_cursor"] is None
+    assert len(first["directors"]) + len(second["directors"]) == 3
+    response = await client.get("/directors/", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+async def test_get_directors_batch(client, director_fixture):
+    response = await client.post("/directors/batch", json={"ids": ["missing", director_fixture["id"]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data[0] is None
+    assert data[1]["id"] == director_fixture["id"]
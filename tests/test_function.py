@@ -1,5 +1,19 @@
+import base64
+import asyncio
 from datetime import datetime, timedelta
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from models import Auditorium, Cinema, Director, Function, Movie, SeatHold
+from crud.function import get_function, reserve_seats
+import crud.seat_hold
+from crud.seat_hold import release_expired_seat_holds, release_seat_hold
+from tests.conftest import TestingSessionLocal
+from schemas.function import ReservationRead
+from seat_map import new_seat_map
 
 @pytest.mark.asyncio
 async def test_create_function(client, movie_fixture, auditorium_fixture, staff_token_fixture):
@@ -141,3 +155,396 @@ async def test_delete_function_not_found(client, staff_token_fixture):
     response = await client.delete("/functions/non-existent-id", headers=headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "Function not found"
+
+@pytest.mark.asyncio
+async def test_delete_movie_removes_functions(client, function_fixture, movie_fixture, staff_token_fixture, user_token_fixture):
+    function_id = function_fixture["data"]["id"]
+    hold = (await client.post(f"/functions/{function_id}/holds", json={"seats": 2}, headers={"Authorization": f"Bearer {user_token_fixture}"})).json()
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.delete(f"/movies/{movie_fixture['id']}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["genres"] == movie_fixture["genres"]
+
+    response = await client.get(f"/functions/{function_id}")
+    assert response.status_code == 404
+    response = await client.delete(f"/functions/holds/{hold['id']}", headers={"Authorization": f"Bearer {user_token_fixture}"})
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_delete_cinema_removes_functions(client, function_fixture, auditorium_fixture, admin_token_fixture):
+    headers = {"Authorization": f"Bearer {admin_token_fixture}"}
+    response = await client.delete(f"/cinemas/{auditorium_fixture['cinema_id']}", headers=headers)
+    assert response.status_code == 200
+    response = await client.get(f"/auditoriums/{auditorium_fixture['id']}")
+    assert response.status_code == 404
+    response = await client.get(f"/functions/{function_fixture['data']['id']}")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_function_auditorium_partial_overlap(client, movie_fixture, auditorium_fixture, function_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    start_time = datetime.fromisoformat(function_fixture["start_time"]) - timedelta(minutes=30)
+    end_time = start_time + timedelta(hours=1)
+    response = await client.post("/functions/", json={"movie_id": movie_fixture["id"], "auditorium_id": auditorium_fixture["id"], "start_time": start_time.isoformat(), "end_time": end_time.isoformat(), "available_seats": 100, "price": 10}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Auditorium is not free"
+
+@pytest.mark.asyncio
+async def test_create_function_back_to_back(client, movie_fixture, auditorium_fixture, function_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    start_time = datetime.fromisoformat(function_fixture["end_time"]).replace(microsecond=0) + timedelta(seconds=1)
+    end_time = start_time + timedelta(hours=1)
+    response = await client.post("/functions/", json={"movie_id": movie_fixture["id"], "auditorium_id": auditorium_fixture["id"], "start_time": start_time.isoformat(), "end_time": end_time.isoformat(), "available_seats": 100, "price": 10}, headers=headers)
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_get_active_functions_window(client, function_fixture, movie_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    start_time = datetime.fromisoformat(function_fixture["start_time"])
+    params = {"from": (start_time - timedelta(hours=1)).isoformat(), "to": (start_time + timedelta(hours=1)).isoformat(), "movie_id": movie_fixture["id"]}
+    response = await client.get("/functions/", params=params, headers=headers)
+    assert response.status_code == 200
+    assert [function["id"] for function in response.json()] == [function_id]
+
+    params["from"] = (start_time + timedelta(minutes=1)).isoformat()
+    response = await client.get("/functions/", params=params, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_get_active_functions_by_cinema(client, function_fixture, cinema_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.get("/functions/", params={"cinema_id": cinema_fixture["id"]}, headers=headers)
+    assert response.status_code == 200
+    assert [function["id"] for function in response.json()] == [function_fixture["data"]["id"]]
+
+    response = await client.get("/functions/", params={"cinema_id": "non-existent-id"}, headers=headers)
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_get_active_functions_pagination(client, function_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.get("/functions/", params={"skip": 1, "limit": 1}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await client.get("/functions/", params={"limit": 1000}, headers=headers)
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_reserve_seats(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seats": 3}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"function_id": function_id, "seats": 3, "seat_numbers": [1, 2, 3], "available_seats": 97}
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 97
+
+@pytest.mark.asyncio
+async def test_reserve_seats_sold_out(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seats": 101}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Not enough available seats"
+
+@pytest.mark.asyncio
+async def test_reserve_seats_unauthorized(client, function_fixture):
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seats": 1})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_reserve_seats_function_not_found(client, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    response = await client.post("/functions/non-existent-id/reservations", json={"seats": 1}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Function not found"
+
+@pytest.mark.asyncio
+async def test_reserve_seats_concurrent_never_oversells(tmp_path):
+    # The shared in-memory test database has a single connection, so this runs
+    # against a file database where every buyer gets its own pooled connection.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reservations.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(Director).values(id="director", name="Director"))
+        await conn.execute(insert(Movie).values(id="movie", title="Movie", director="director"))
+        await conn.execute(insert(Cinema).values(id="cinema", name="Cinema", location="-", number=1))
+        await conn.execute(insert(Auditorium).values(id="auditorium", name="1A", cinema_id="cinema", capacity=100))
+        start_time = datetime.now() + timedelta(days=1)
+        await conn.execute(insert(Function).values(id="function", movie_id="movie", auditorium_id="auditorium", start_time=start_time, end_time=start_time + timedelta(hours=2), price=10, available_seats=100, seat_map=new_seat_map(100, 100)))
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def buy(seats):
+        async with session_factory() as db:
+            return await reserve_seats(db, "function", seats)
+
+    results = await asyncio.gather(*[buy(1 + i % 3) for i in range(150)], return_exceptions=True)
+    reservations = [result for result in results if isinstance(result, ReservationRead)]
+    assert all(isinstance(result, ReservationRead) or result.status_code == 409 for result in results)
+    sold = [seat for reservation in reservations for seat in reservation.seat_numbers]
+    async with session_factory() as db:
+        function = await get_function(db, "function")
+    await engine.dispose()
+    assert len(sold) == len(set(sold)) <= 100
+    assert function.available_seats == 100 - len(sold)
+    assert min(reservation.available_seats for reservation in reservations) == function.available_seats
+
+@pytest.mark.asyncio
+async def test_reserve_seat_numbers(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": [10, 1]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["seat_numbers"] == [1, 10]
+    assert response.json()["available_seats"] == 98
+
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": [2, 10]}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Seat not available"
+
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seats": 2}, headers=headers)
+    assert response.json()["seat_numbers"] == [2, 3]
+
+@pytest.mark.asyncio
+async def test_reserve_seat_numbers_invalid(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    for seat_numbers in ([0], [1, 1], [1000]):
+        response = await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": seat_numbers}, headers=headers)
+        assert response.status_code == 400
+    response = await client.post(f"/functions/{function_id}/reservations", json={}, headers=headers)
+    assert response.status_code == 422
+    # Seats past the capacity only exist as padding in the last byte of the map.
+    for seat in range(101, 105):
+        response = await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": [seat]}, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid seat number"
+
+@pytest.mark.asyncio
+async def test_get_seat_map(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": [1, 9]}, headers=headers)
+    response = await client.get(f"/functions/{function_id}/seats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["capacity"] == 100
+    assert data["available_seats"] == 98
+    seat_map = base64.b64decode(data["seat_map"])
+    assert len(seat_map) == 13
+    assert seat_map[0] == 0b1 and seat_map[1] == 0b1
+    assert seat_map[12] == 0b11110000
+
+@pytest.mark.asyncio
+async def test_get_seat_map_not_found(client):
+    response = await client.get("/functions/non-existent-id/seats")
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_seat_hold_confirm(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/holds", json={"seat_numbers": [5, 6]}, headers=headers)
+    assert response.status_code == 200
+    hold = response.json()
+    assert hold["seat_numbers"] == [5, 6]
+    assert datetime.fromisoformat(hold["expires_at"]) > datetime.now()
+
+    response = await client.post(f"/functions/{function_id}/reservations", json={"seat_numbers": [5]}, headers=headers)
+    assert response.status_code == 409
+
+    response = await client.post(f"/functions/holds/{hold['id']}/confirm", headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"function_id": function_id, "seats": 2, "seat_numbers": [5, 6], "available_seats": 98}
+
+    response = await client.post(f"/functions/holds/{hold['id']}/confirm", headers=headers)
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_seat_hold_release(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    response = await client.post(f"/functions/{function_id}/holds", json={"seats": 3}, headers=headers)
+    hold = response.json()
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 97
+
+    response = await client.delete(f"/functions/holds/{hold['id']}", headers=headers)
+    assert response.status_code == 200
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 100
+
+    response = await client.delete(f"/functions/holds/{hold['id']}", headers=headers)
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_seat_hold_other_user(client, function_fixture, user_token_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    other = {"Authorization": f"Bearer {staff_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    hold = (await client.post(f"/functions/{function_id}/holds", json={"seats": 2}, headers=headers)).json()
+
+    response = await client.post(f"/functions/holds/{hold['id']}/confirm", headers=other)
+    assert response.status_code == 404
+    response = await client.delete(f"/functions/holds/{hold['id']}", headers=other)
+    assert response.status_code == 404
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 98
+
+    response = await client.post(f"/functions/holds/{hold['id']}/confirm", headers=headers)
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_seat_hold_function_not_found(client, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    response = await client.post("/functions/non-existent-id/holds", json={"seats": 1}, headers=headers)
+    assert response.status_code == 404
+
+@pytest.mark.asyncio
+async def test_release_expired_seat_holds(client, function_fixture, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    expired = (await client.post(f"/functions/{function_id}/holds", json={"seats": 2}, headers=headers)).json()
+    active = (await client.post(f"/functions/{function_id}/holds", json={"seats": 1}, headers=headers)).json()
+    async with TestingSessionLocal() as db:
+        await db.execute(update(SeatHold).filter(SeatHold.id == expired["id"]).values(expires_at=datetime.now() - timedelta(seconds=1)))
+        await db.commit()
+        assert await release_expired_seat_holds(db) == 1
+        assert await release_expired_seat_holds(db) == 0
+
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 99
+    response = await client.post(f"/functions/holds/{expired['id']}/confirm", headers=headers)
+    assert response.status_code == 404
+    response = await client.post(f"/functions/holds/{active['id']}/confirm", headers=headers)
+    assert response.status_code == 200
+
+@pytest.mark.asyncio
+async def test_seat_hold_kept_when_seats_cannot_be_freed(client, function_fixture, user_token_fixture, monkeypatch):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    function_id = function_fixture["data"]["id"]
+    released = (await client.post(f"/functions/{function_id}/holds", json={"seats": 2}, headers=headers)).json()
+    expired = (await client.post(f"/functions/{function_id}/holds", json={"seats": 1}, headers=headers)).json()
+
+    async def busy_seat_map(db, function_id, change):
+        raise HTTPException(status_code=409, detail="Seat map is busy, please retry")
+
+    monkeypatch.setattr(crud.seat_hold, "update_seat_map", busy_seat_map)
+    async with TestingSessionLocal() as db:
+        await db.execute(update(SeatHold).filter(SeatHold.id == expired["id"]).values(expires_at=datetime.now() - timedelta(seconds=1)))
+        await db.commit()
+        with pytest.raises(HTTPException):
+            await release_seat_hold(db, released["id"], "user")
+        await db.rollback()
+        with pytest.raises(HTTPException):
+            await release_expired_seat_holds(db)
+        await db.rollback()
+        assert len((await db.execute(select(SeatHold.id))).all()) == 2
+
+    monkeypatch.undo()
+    response = await client.delete(f"/functions/holds/{released['id']}", headers=headers)
+    assert response.status_code == 200
+    async with TestingSessionLocal() as db:
+        assert await release_expired_seat_holds(db) == 1
+    response = await client.get(f"/functions/{function_id}")
+    assert response.json()["available_seats"] == 100
+
+@pytest.mark.asyncio
+async def test_bulk_create_functions(client, movie_fixture, auditorium_fixture, function_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    existing_start = datetime.fromisoformat(function_fixture["start_time"])
+    def item(start, hours=1, **overrides):
+        return {"movie_id": movie_fixture["id"], "auditorium_id": auditorium_fixture["id"], "start_time": start.isoformat(), "end_time": (start + timedelta(hours=hours)).isoformat(), "available_seats": 100, "price": 10, **overrides}
+    batch = [
+        item(existing_start + timedelta(hours=4)),
+        item(existing_start + timedelta(minutes=30)),
+        item(existing_start + timedelta(hours=2)),
+        item(existing_start + timedelta(hours=4, minutes=30)),
+        item(existing_start + timedelta(hours=6), movie_id="non-existent-id"),
+        item(existing_start + timedelta(hours=6), auditorium_id="non-existent-id"),
+        item(existing_start + timedelta(hours=6), available_seats=500),
+        item(existing_start - timedelta(days=2)),
+    ]
+    response = await client.post("/functions/bulk", json={"functions": batch}, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [datetime.fromisoformat(function["start_time"]) for function in data["created"]] == [existing_start + timedelta(hours=4), existing_start + timedelta(hours=2)]
+    assert data["errors"] == [
+        {"index": 1, "detail": "Auditorium is not free"},
+        {"index": 3, "detail": "Overlaps another function in the batch"},
+        {"index": 4, "detail": "Movie not found"},
+        {"index": 5, "detail": "Auditorium not found"},
+        {"index": 6, "detail": "Available seats cannot be greater than auditorium capacity"},
+        {"index": 7, "detail": "Start time cannot be in the past"},
+    ]
+    response = await client.get("/functions/all")
+    assert response.json()["total"] == 3
+    response = await client.get(f"/functions/{data['created'][0]['id']}/seats")
+    assert response.json()["available_seats"] == 100
+
+@pytest.mark.asyncio
+async def test_bulk_create_functions_forbidden(client, user_token_fixture):
+    headers = {"Authorization": f"Bearer {user_token_fixture}"}
+    response = await client.post("/functions/bulk", json={"functions": []}, headers=headers)
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_pack_schedule(client, movie_fixture, auditorium_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    await client.put(f"/movies/{movie_fixture['id']}", json={"duration": 120}, headers=headers)
+    day = (datetime.now() + timedelta(days=3)).date()
+    request = {"movie_ids": [movie_fixture["id"]], "auditorium_ids": [auditorium_fixture["id"]], "from_date": day.isoformat(), "opening_time": "10:00", "closing_time": "16:00", "buffer_minutes": 15, "price": 12}
+    response = await client.post("/functions/pack", json=request, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [(function["start_time"][11:16], function["end_time"][11:16]) for function in data["functions"]] == [("10:00", "12:00"), ("12:15", "14:15")]
+    assert data["created"] == []
+    assert (await client.get("/functions/all")).json()["total"] == 0
+
+    request["persist"] = True
+    response = await client.post("/functions/pack", json=request, headers=headers)
+    assert len(response.json()["created"]) == 2
+    assert (await client.get("/functions/all")).json()["total"] == 2
+
+    # The persisted functions now occupy the day, leaving no room for another pass.
+    response = await client.post("/functions/pack", json=request, headers=headers)
+    assert response.json()["functions"] == []
+
+@pytest.mark.asyncio
+async def test_pack_schedule_invalid_duration(client, movie_fixture, auditorium_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    day = (datetime.now() + timedelta(days=3)).date().isoformat()
+    request = {"movie_ids": [movie_fixture["id"]], "auditorium_ids": [auditorium_fixture["id"]], "from_date": day, "buffer_minutes": 15, "price": 12}
+    for duration in (0, -15):
+        await client.put(f"/movies/{movie_fixture['id']}", json={"duration": duration}, headers=headers)
+        response = await client.post("/functions/pack", json=request, headers=headers)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Movie duration must be positive"
+
+@pytest.mark.asyncio
+async def test_pack_schedule_around_existing_function(client, movie_fixture, auditorium_fixture, function_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    existing_start = datetime.fromisoformat(function_fixture["start_time"])
+    existing_end = datetime.fromisoformat(function_fixture["end_time"])
+    request = {"movie_ids": [movie_fixture["id"]], "auditorium_ids": [auditorium_fixture["id"]], "from_date": existing_start.date().isoformat(), "opening_time": "00:00", "closing_time": "00:00", "buffer_minutes": 10, "price": 12}
+    response = await client.post("/functions/pack", json=request, headers=headers)
+    assert response.status_code == 200
+    for function in response.json()["functions"]:
+        start, end = datetime.fromisoformat(function["start_time"]), datetime.fromisoformat(function["end_time"])
+        assert end + timedelta(minutes=10) <= existing_start or start >= existing_end + timedelta(minutes=10)
+
+@pytest.mark.asyncio
+async def test_pack_schedule_not_found(client, movie_fixture, auditorium_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    day = (datetime.now() + timedelta(days=3)).date().isoformat()
+    response = await client.post("/functions/pack", json={"movie_ids": ["non-existent-id"], "auditorium_ids": [auditorium_fixture["id"]], "from_date": day, "price": 12}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Movie not found"
+    response = await client.post("/functions/pack", json={"movie_ids": [movie_fixture["id"]], "auditorium_ids": ["non-existent-id"], "from_date": day, "price": 12}, headers=headers)
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Auditorium not found"
@@ -73,3 +73,27 @@ async def test_delete_genre_not_found(client, staff_token_fixture):
     headers = {"Authorization": f"Bearer {staff_token_fixture}"}
     response = await client.delete("/genres/non_existent_id", headers=headers)
     assert response.status_code == 404
+
+async def test_delete_genre_detaches_movies(client, movie_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.delete(f"/genres/{genre_fixture['id']}", headers=headers)
+    assert response.status_code == 200
+    response = await client.get(f"/movies/{movie_fixture['id']}")
+    assert response.status_code == 200
+    assert response.json()["genres"] == []
+
+async def test_autocomplete_genres(client, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    genre = (await client.post("/genres/", json={"name": "Science Fiction", "description": "Futuristic movies"}, headers=headers)).json()
+    response = await client.get("/genres/autocomplete", params={"q": "fict"})
+    assert response.status_code == 200
+    assert response.json() == [{"id": genre["id"], "name": "Science Fiction", "rating": None}]
+    response = await client.get("/genres/autocomplete", params={"q": "x"})
+    assert response.json() == []
+
+async def test_get_genres_batch(client, genre_fixture):
+    response = await client.post("/genres/batch", json={"ids": [genre_fixture["id"], "missing"]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data[0]["id"] == genre_fixture["id"]
+    assert data[1] is None
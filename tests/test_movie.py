@@ -1,4 +1,12 @@
+import asyncio
+import json
 import pytest
+from sqlalchemy import update
+import crud.autocomplete
+import crud.movies
+from models.movie import Movie
+from tests.conftest import TestingSessionLocal
+from title_index import TitleIndex
 
 @pytest.mark.asyncio
 async def test_create_movie(client, director_fixture, genre_fixture, staff_token_fixture):
@@ -17,6 +25,18 @@ async def test_create_movie(client, director_fixture, genre_fixture, staff_token
     assert data["trailer"] == "https://example.com/trailer"
     assert data["image"] == "https://example.com/image"
 
+@pytest.mark.asyncio
+async def test_create_movie_several_genres(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    drama = (await client.post("/genres/", json={"name": "Drama", "description": "Drama movies"}, headers=headers)).json()
+    genre_ids = [drama["id"], genre_fixture["id"], drama["id"]]
+    response = await client.post("/movies/", json={"title": "Test Movie", "year": 2022, "rating": 5, "description": "Test description", "language": "English", "duration": 150, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": genre_ids}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["genres"] == [drama, genre_fixture]
+
+    response = await client.get(f"/movies/{response.json()['id']}")
+    assert sorted(genre["id"] for genre in response.json()["genres"]) == sorted([drama["id"], genre_fixture["id"]])
+
 @pytest.mark.asyncio
 async def test_create_movie_unauthorized(client, director_fixture, genre_fixture):
     director_id = director_fixture["id"]
@@ -65,6 +85,17 @@ async def test_get_list_of_movies_by_title_like(client, movie_fixture):
     data = response.json()
     assert len(data) > 0
 
+@pytest.mark.asyncio
+async def test_get_list_of_movies_by_title_like_pages(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"year": 2000, "rating": 5, "description": "Test description", "language": "English", "duration": 90, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}
+    # The more of a title the query covers, the better its rank.
+    ids = [(await client.post("/movies/", json={**movie, "title": title}, headers=headers)).json()["id"] for title in ("Heat", "Heat Wave", "The Heat of the Night")]
+    response = await client.get("/movies/title_like/heat", params={"limit": 2})
+    assert [movie["id"] for movie in response.json()] == ids[:2]
+    response = await client.get("/movies/title_like/heat", params={"limit": 2, "page": 2})
+    assert [movie["id"] for movie in response.json()] == ids[2:]
+
 @pytest.mark.asyncio
 async def test_get_movies_by_genre(client, movie_fixture, genre_fixture):
     genre_id = genre_fixture["id"]
@@ -98,6 +129,57 @@ async def test_update_movie_not_found(client, staff_token_fixture):
     response = await client.put("/movies/non_existent_id", json={"title": "Updated Movie"}, headers=headers)
     assert response.status_code == 404
 
+@pytest.mark.asyncio
+async def test_update_movie_director_not_found(client, movie_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie_id = movie_fixture["id"]
+    response = await client.put(f"/movies/{movie_id}", json={"director": "nope"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Director not found"
+    response = await client.get(f"/movies/{movie_id}")
+    assert response.json()["director"] == movie_fixture["director"]
+
+@pytest.mark.asyncio
+async def test_update_movie_keeps_genres(client, movie_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.put(f"/movies/{movie_fixture['id']}", json={"rating": 9}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["rating"] == 9
+    assert [genre["id"] for genre in response.json()["genres"]] == [genre_fixture["id"]]
+
+@pytest.mark.asyncio
+async def test_update_movie_genres(client, movie_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie_id = movie_fixture["id"]
+    drama = (await client.post("/genres/", json={"name": "Drama", "description": "Drama"}, headers=headers)).json()
+    response = await client.put(f"/movies/{movie_id}", json={"genres": [genre_fixture["id"], drama["id"]]}, headers=headers)
+    assert response.status_code == 200
+    assert {genre["id"] for genre in response.json()["genres"]} == {genre_fixture["id"], drama["id"]}
+
+    response = await client.put(f"/movies/{movie_id}", json={"title": "Drama Only", "genres": [drama["id"]]}, headers=headers)
+    assert response.status_code == 200
+    assert [genre["id"] for genre in response.json()["genres"]] == [drama["id"]]
+    response = await client.get(f"/movies/{movie_id}")
+    assert response.json()["title"] == "Drama Only"
+    assert [genre["id"] for genre in response.json()["genres"]] == [drama["id"]]
+
+@pytest.mark.asyncio
+async def test_update_movie_duplicate_genres(client, movie_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.put(f"/movies/{movie_fixture['id']}", json={"genres": [genre_fixture["id"], genre_fixture["id"]]}, headers=headers)
+    assert response.status_code == 200
+    assert [genre["id"] for genre in response.json()["genres"]] == [genre_fixture["id"]]
+
+@pytest.mark.asyncio
+async def test_update_movie_genre_not_found_keeps_movie(client, movie_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie_id = movie_fixture["id"]
+    response = await client.put(f"/movies/{movie_id}", json={"title": "Changed", "genres": ["non_existent_genre"]}, headers=headers)
+    assert response.status_code == 404
+    response = await client.get(f"/movies/{movie_id}")
+    assert response.json()["title"] == movie_fixture["title"]
+    assert response.json()["genres"] == movie_fixture["genres"]
+
 @pytest.mark.asyncio
 async def test_delete_movie(client, movie_fixture, staff_token_fixture):
     headers = {"Authorization": f"Bearer {staff_token_fixture}"}
@@ -132,4 +214,301 @@ async def test_update_movie_genre_not_found(client, movie_fixture, staff_token_f
     headers = {"Authorization": f"Bearer {staff_token_fixture}"}
     movie_id = movie_fixture["id"]
     response = await client.put(f"/movies/{movie_id}", json={"genres": ["non_existent_genre"]}, headers=headers)
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+@pytest.mark.asyncio
+async def test_search_movies(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"year": 2010, "rating": 8, "language": "English", "duration": 148, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}
+    inception = (await client.post("/movies/", json={**movie, "title": "Inception", "description": "A thief plants an idea through dream-sharing technology."}, headers=headers)).json()
+    other = (await client.post("/movies/", json={**movie, "title": "Dreamcatcher", "description": "Friends fight an alien."}, headers=headers)).json()
+
+    response = await client.get("/movies/fulltext", params={"q": "dream"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    # A title match outranks a description match.
+    assert [hit["movie"]["id"] for hit in data["results"]] == [other["id"], inception["id"]]
+    assert "<b>dream</b>" in data["results"][1]["snippet"].lower()
+
+    response = await client.get("/movies/fulltext", params={"q": "thief idea", "size": 1})
+    assert [hit["movie"]["id"] for hit in response.json()["results"]] == [inception["id"]]
+    response = await client.get("/movies/fulltext", params={"q": "dream", "size": 1, "page": 2})
+    assert [hit["movie"]["id"] for hit in response.json()["results"]] == [inception["id"]]
+    assert "<b>dream</b>" in response.json()["results"][0]["snippet"].lower()
+
+    response = await client.get("/movies/fulltext", params={"q": director_fixture["name"].split()[0]})
+    assert response.json()["total"] == 2
+
+@pytest.mark.asyncio
+async def test_search_movies_stays_in_sync(client, movie_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie_id = movie_fixture["id"]
+    await client.put(f"/movies/{movie_id}", json={"title": "Zanzibar Nights"}, headers=headers)
+    response = await client.get("/movies/fulltext", params={"q": "zanzibar"})
+    assert [hit["movie"]["id"] for hit in response.json()["results"]] == [movie_id]
+    response = await client.get("/movies/fulltext", params={"q": "Test Movie"})
+    assert response.json()["total"] == 0
+
+    await client.delete(f"/movies/{movie_id}", headers=headers)
+    response = await client.get("/movies/fulltext", params={"q": "zanzibar"})
+    assert response.json()["total"] == 0
+
+@pytest.mark.asyncio
+async def test_search_movies_ignores_query_syntax(client, movie_fixture):
+    response = await client.get("/movies/fulltext", params={"q": '"Test" OR NEAR( *'})
+    assert response.status_code == 200
+    response = await client.get("/movies/fulltext", params={"q": "!!!"})
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+@pytest.mark.asyncio
+async def test_search_movies_director_rename(client, movie_fixture, director_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    await client.put(f"/directors/{director_fixture['id']}", json={"name": "Agnes Varda"}, headers=headers)
+    response = await client.get("/movies/fulltext", params={"q": "varda"})
+    assert [hit["movie"]["id"] for hit in response.json()["results"]] == [movie_fixture["id"]]
+
+@pytest.mark.asyncio
+async def test_get_list_of_movies_by_title_fuzzy(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"year": 1994, "rating": 9, "description": "Test description", "language": "English", "duration": 142, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}
+    shawshank = (await client.post("/movies/", json={**movie, "title": "The Shawshank Redemption"}, headers=headers)).json()
+    inception = (await client.post("/movies/", json={**movie, "title": "Inception"}, headers=headers)).json()
+
+    response = await client.get("/movies/title_like/Shawshenk")
+    assert response.json() == []
+    response = await client.get("/movies/title_like/Shawshenk", params={"fuzzy": True})
+    assert response.status_code == 200
+    assert [movie["id"] for movie in response.json()] == [shawshank["id"]]
+    response = await client.get("/movies/title_like/Incepton", params={"fuzzy": True})
+    assert [movie["id"] for movie in response.json()][0] == inception["id"]
+
+    await client.put(f"/movies/{inception['id']}", json={"title": "Interstellar"}, headers=headers)
+    response = await client.get("/movies/title_like/Intersteller", params={"fuzzy": True})
+    assert [movie["id"] for movie in response.json()] == [inception["id"]]
+    response = await client.get("/movies/title_like/Incepton", params={"fuzzy": True})
+    assert response.json() == []
+
+    await client.delete(f"/movies/{shawshank['id']}", headers=headers)
+    response = await client.get("/movies/title_like/Shawshenk", params={"fuzzy": True})
+    assert response.json() == []
+
+@pytest.mark.asyncio
+async def test_title_fuzzy_sees_other_workers_writes(client, movie_fixture, monkeypatch):
+    async with TestingSessionLocal() as db:
+        await crud.movies.load_title_index(db)
+    # Rename the movie behind this process's back, as another worker would.
+    async with TestingSessionLocal() as db:
+        await db.execute(update(Movie).where(Movie.id == movie_fixture["id"]).values(title="Mulholland Drive"))
+        await db.commit()
+    monkeypatch.setattr(crud.movies, "TITLE_INDEX_TTL_SECONDS", 0)
+    # The stale index keeps answering while the reload runs in the background.
+    response = await client.get("/movies/title_like/Mulholand", params={"fuzzy": True})
+    assert response.json() == []
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        response = await client.get("/movies/title_like/Mulholand", params={"fuzzy": True})
+        if response.json():
+            break
+    assert [movie["id"] for movie in response.json()] == [movie_fixture["id"]]
+
+def test_title_index_replays_writes_made_during_a_rebuild():
+    index = TitleIndex()
+    index.rebuild([("1", "Vertigo"), ("2", "Psycho")])
+    index.start_journal()
+    # Rows read for the rebuild, before the writes below.
+    rebuilt = TitleIndex()
+    rebuilt.rebuild([("1", "Vertigo"), ("2", "Psycho")])
+    index.add("3", "The Birds")
+    index.remove("2")
+    index.replace(rebuilt)
+    assert [movie_id for movie_id, _ in index.search("birds")] == ["3"]
+    assert index.search("psycho") == []
+
+@pytest.mark.asyncio
+async def test_autocomplete_movies(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"year": 2008, "description": "Test description", "language": "English", "duration": 120, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}
+    knight = (await client.post("/movies/", json={**movie, "title": "The Dark Knight", "rating": 9}, headers=headers)).json()
+    city = (await client.post("/movies/", json={**movie, "title": "Dark City", "rating": 7}, headers=headers)).json()
+    darkman = (await client.post("/movies/", json={**movie, "title": "Darkman", "rating": 6}, headers=headers)).json()
+
+    response = await client.get("/movies/autocomplete", params={"q": "dar"})
+    assert response.status_code == 200
+    assert [completion["id"] for completion in response.json()] == [knight["id"], city["id"], darkman["id"]]
+    assert response.json()[0] == {"id": knight["id"], "name": "The Dark Knight", "rating": 9}
+
+    response = await client.get("/movies/autocomplete", params={"q": "dark k"})
+    assert [completion["id"] for completion in response.json()] == [knight["id"]]
+    response = await client.get("/movies/autocomplete", params={"q": "dar", "limit": 1})
+    assert [completion["id"] for completion in response.json()] == [knight["id"]]
+
+    await client.put(f"/movies/{darkman['id']}", json={"rating": 10}, headers=headers)
+    response = await client.get("/movies/autocomplete", params={"q": "dar"})
+    assert [completion["id"] for completion in response.json()] == [darkman["id"], knight["id"], city["id"]]
+
+@pytest.mark.asyncio
+async def test_autocomplete_serves_stale_index_while_rebuilding(client, movie_fixture, staff_token_fixture, monkeypatch):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    response = await client.get("/movies/autocomplete", params={"q": "test mov"})
+    assert [completion["id"] for completion in response.json()] == [movie_fixture["id"]]
+
+    monkeypatch.setattr(crud.autocomplete, "AUTOCOMPLETE_REFRESH_WAIT_MS", 0)
+    await client.put(f"/movies/{movie_fixture['id']}", json={"title": "Vertigo"}, headers=headers)
+    response = await client.get("/movies/autocomplete", params={"q": "test mov"})
+    assert [completion["id"] for completion in response.json()] == [movie_fixture["id"]]
+    for _ in range(100):
+        response = await client.get("/movies/autocomplete", params={"q": "vert"})
+        if response.json():
+            break
+        await asyncio.sleep(0.01)
+    assert [completion["id"] for completion in response.json()] == [movie_fixture["id"]]
+
+@pytest.mark.asyncio
+async def test_update_movie_invalidates_affected_autocomplete_indexes(client, movie_fixture, director_fixture, staff_token_fixture, monkeypatch):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    invalidated = []
+    monkeypatch.setattr(crud.movies, "invalidate_autocomplete", lambda *kinds: invalidated.extend(kinds))
+    await client.put(f"/movies/{movie_fixture['id']}", json={"description": "Changed"}, headers=headers)
+    assert invalidated == []
+    await client.put(f"/movies/{movie_fixture['id']}", json={"title": "Renamed"}, headers=headers)
+    assert invalidated == ["movies"]
+    invalidated.clear()
+    await client.put(f"/movies/{movie_fixture['id']}", json={"rating": 8}, headers=headers)
+    assert sorted(invalidated) == ["directors", "genres", "movies"]
+
+@pytest.mark.asyncio
+async def test_get_movies_cursor_pagination(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"year": 2022, "rating": 5, "description": "Test description", "language": "English", "duration": 90, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}
+    created = {(await client.post("/movies/", json={**movie, "title": f"Paged {i}"}, headers=headers)).json()["id"] for i in range(5)}
+
+    response = await client.get("/movies/", params={"size": 2})
+    data = response.json()
+    assert data["total"] == 5 and data["page"] == 1
+    seen = [movie["id"] for movie in data["movies"]]
+    cursor = data["next_cursor"]
+    while cursor:
+        response = await client.get("/movies/", params={"size": 2, "cursor": cursor})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None and data["page"] is None
+        seen += [movie["id"] for movie in data["movies"]]
+        cursor = data["next_cursor"]
+        # Deleting a row already returned doesn't shift the following pages.
+        if len(seen) == 2:
+            await client.delete(f"/movies/{seen[0]}", headers=headers)
+    assert len(seen) == 5 and set(seen) == created
+
+    response = await client.get("/movies/", params={"size": 10})
+    assert response.json()["next_cursor"] is None
+    response = await client.get("/movies/", params={"cursor": "bogus"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_search_movies_with_facets(client, director_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    drama = (await client.post("/genres/", json={"name": "Drama"}, headers=headers)).json()
+    crime = (await client.post("/genres/", json={"name": "Crime"}, headers=headers)).json()
+    movie = {"description": "Test description", "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"]}
+    godfather = (await client.post("/movies/", json={**movie, "title": "The Godfather", "year": 1972, "rating": 9, "language": "English", "duration": 175, "genres": [drama["id"], crime["id"]]}, headers=headers)).json()
+    amelie = (await client.post("/movies/", json={**movie, "title": "Amelie", "year": 2001, "rating": 8, "language": "French", "duration": 122, "genres": [drama["id"]]}, headers=headers)).json()
+    heat = (await client.post("/movies/", json={**movie, "title": "Heat", "year": 1995, "rating": 7, "language": "English", "duration": 170, "genres": [crime["id"]]}, headers=headers)).json()
+
+    response = await client.get("/movies/search")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [movie["id"] for movie in data["movies"]] == [godfather["id"], amelie["id"], heat["id"]]
+    assert data["facets"]["genres"] == [
+        {"value": crime["id"], "label": "Crime", "count": 2},
+        {"value": drama["id"], "label": "Drama", "count": 2},
+    ]
+    assert data["facets"]["languages"] == [{"value": "English", "label": "English", "count": 2}, {"value": "French", "label": "French", "count": 1}]
+    assert [(facet["label"], facet["count"]) for facet in data["facets"]["decades"]] == [("1970s", 1), ("1990s", 1), ("2000s", 1)]
+
+    response = await client.get("/movies/search", params={"genres": [drama["id"], crime["id"]], "genre_match": "all"})
+    assert [movie["id"] for movie in response.json()["movies"]] == [godfather["id"]]
+    response = await client.get("/movies/search", params={"genres": [drama["id"], crime["id"]], "size": 2})
+    assert response.json()["total"] == 3 and len(response.json()["movies"]) == 2
+
+    response = await client.get("/movies/search", params={"year_from": 1990, "max_duration": 150})
+    data = response.json()
+    assert [movie["id"] for movie in data["movies"]] == [amelie["id"]]
+    assert data["facets"]["genres"] == [{"value": drama["id"], "label": "Drama", "count": 1}]
+
+    response = await client.get("/movies/search", params={"language": "English", "min_rating": 8, "director": director_fixture["id"]})
+    assert [movie["id"] for movie in response.json()["movies"]] == [godfather["id"]]
+    response = await client.get("/movies/search", params={"genre_match": "some"})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_get_movies_batch(client, movie_fixture, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    other = (await client.post("/movies/", json={"title": "Other", "year": 2001, "rating": 7, "description": "Test description", "language": "English", "duration": 100, "trailer": "https://example.com/trailer", "image": "https://example.com/image", "director": director_fixture["id"], "genres": [genre_fixture["id"]]}, headers=headers)).json()
+    response = await client.post("/movies/batch", json={"ids": [other["id"], "missing", movie_fixture["id"], other["id"]]})
+    assert response.status_code == 200
+    data = response.json()
+    assert [movie and movie["id"] for movie in data] == [other["id"], None, movie_fixture["id"], other["id"]]
+    assert data[2]["genres"][0]["id"] == genre_fixture["id"]
+
+    response = await client.post("/movies/batch", json={"ids": []})
+    assert response.status_code == 422
+    response = await client.post("/movies/batch", json={"ids": [str(i) for i in range(501)]})
+    assert response.status_code == 422
+
+@pytest.mark.asyncio
+async def test_create_movies_bulk_jsonl(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    movie = {"description": "Bulk", "year": 1999, "rating": 7, "language": "English", "duration": 120, "trailer": "https://example.com/trailer", "image": "https://example.com/image"}
+    lines = [
+        json.dumps({**movie, "title": "Bulk One", "director": director_fixture["name"], "genres": [genre_fixture["name"]]}),
+        json.dumps({**movie, "title": "Bulk Two", "director": director_fixture["id"], "genres": []}),
+        json.dumps({**movie, "title": "Bulk Three", "director": "Nobody", "genres": []}),
+        "{not json",
+        "",
+        json.dumps({**movie, "title": "Bulk Four", "director": director_fixture["name"], "genres": ["Unknown"]}),
+        json.dumps({"title": "Bulk Five"}),
+        json.dumps({**movie, "title": "Bulk Six", "director": director_fixture["name"], "genres": [genre_fixture["id"]]}),
+    ]
+    response = await client.post("/movies/bulk", params={"batch_size": 2}, content="\n".join(lines), headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["inserted"] == 3
+    assert data["failed"] == 4
+    assert [error["index"] for error in data["errors"]] == [2, 3, 4, 5]
+    assert data["errors"][0]["detail"] == "Director not found: Nobody"
+
+    response = await client.get("/movies/search", params={"director": director_fixture["id"], "size": 10})
+    assert sorted(movie["title"] for movie in response.json()["movies"]) == ["Bulk One", "Bulk Six", "Bulk Two"]
+    response = await client.get("/movies/genre/" + genre_fixture["id"])
+    assert sorted(movie["title"] for movie in response.json()) == ["Bulk One", "Bulk Six"]
+    response = await client.get("/movies/title_like/Bulk Sx", params={"fuzzy": True})
+    assert response.json()[0]["title"] == "Bulk Six"
+
+@pytest.mark.asyncio
+async def test_create_movies_bulk_csv(client, director_fixture, genre_fixture, staff_token_fixture):
+    headers = {"Authorization": f"Bearer {staff_token_fixture}"}
+    body = (
+        "title,description,year,rating,language,duration,trailer,image,director,genres\r\n"
+        f'"Line, Break","Two\r\nlines",2001,,English,90,t,i,{director_fixture["name"]},{genre_fixture["name"]}|{genre_fixture["name"]}\r\n'
+        "\r\n"
+        f"Bad Year,d,soon,5,English,90,t,i,{director_fixture['name']},\r\n"
+    )
+    response = await client.post("/movies/bulk", params={"format": "csv"}, content=body.encode(), headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["inserted"], data["failed"]) == (1, 1)
+    assert data["errors"][0]["index"] == 1
+    assert data["errors"][0]["detail"].startswith("year:")
+
+    response = await client.get("/movies/title/Line, Break")
+    assert response.status_code == 200
+    assert response.json()["description"] == "Two\r\nlines"
+    assert response.json()["rating"] is None
+    assert [genre["id"] for genre in response.json()["genres"]] == [genre_fixture["id"]]
+
+@pytest.mark.asyncio
+async def test_create_movies_bulk_forbidden(client, user_token_fixture):
+    response = await client.post("/movies/bulk", content="", headers={"Authorization": f"Bearer {user_token_fixture}"})
+    assert response.status_code == 403
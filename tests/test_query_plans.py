@@ -0,0 +1,191 @@
+"""
+Runs every query the crud functions issue through EXPLAIN QUERY PLAN and fails on
+a bare `SCAN <table>`, i.e. a full table scan without an index. Each scenario
+calls one crud function against a small seeded database; the few that read a
+whole table on purpose list it next to their call. A new public crud
+coroutine fails test_every_crud_function_has_a_scenario until it gets one.
+"""
+import importlib
+import inspect
+import pkgutil
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy import event, insert
+import crud
+from crud import auditorium, autocomplete, bulk, cinema, director, function, genre, movies, pagination, schedule, seat_hold
+from database import Base
+from models import Auditorium, Cinema, Director, Function, Genre, Movie, MovieGenre, SeatHold
+from schemas.auditorium import AuditoriumCreate, AuditoriumUpdate
+from schemas.cinema import CinemaCreate, CinemaUpdate
+from schemas.director import DirectorCreate, DirectorUpdate
+from schemas.function import FunctionCreate
+from schemas.genre import GenreCreate, GenreUpdate
+from schemas.movies import MovieCreate, MovieFilter, MovieUpdate
+from schemas.schedule import SchedulePackRequest
+from seat_map import new_seat_map
+from tests.conftest import engine, TestingSessionLocal
+
+TOMORROW = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+MOVIE = {"title": "Plan", "description": "A movie.", "year": 2001, "rating": 7, "language": "English", "duration": 100, "trailer": "-", "image": "-"}
+
+
+async def seed(db):
+    await db.execute(insert(Director), [{"id": "director", "name": "Director"}, {"id": "idle", "name": "Idle"}])
+    await db.execute(insert(Genre), [{"id": "drama", "name": "Drama"}, {"id": "crime", "name": "Crime"}])
+    await db.execute(insert(Movie).values(id="movie", director="director", **MOVIE))
+    await db.execute(insert(MovieGenre), [{"movie_id": "movie", "genre_id": "drama"}, {"movie_id": "movie", "genre_id": "crime"}])
+    await db.execute(insert(Cinema).values(id="cinema", name="Cinema", location="-", number=1))
+    await db.execute(insert(Auditorium).values(id="auditorium", name="Auditorium", cinema_id="cinema", capacity=50))
+    await db.execute(insert(Function).values(
+        id="function", movie_id="movie", auditorium_id="auditorium", start_time=TOMORROW + timedelta(hours=18),
+        end_time=TOMORROW + timedelta(hours=20), price=10, available_seats=48, seat_map=new_seat_map(50, 48),
+    ))
+    await db.execute(insert(SeatHold).values(id="hold", function_id="function", user_id="user", seat_numbers=[1, 2], expires_at=datetime.now() + timedelta(minutes=5)))
+    await db.commit()
+
+
+def new_function(hours: int) -> FunctionCreate:
+    start = TOMORROW + timedelta(hours=hours)
+    return FunctionCreate(movie_id="movie", auditorium_id="auditorium", start_time=start, end_time=start + timedelta(hours=1), price=10, available_seats=50)
+
+
+async def bulk_records():
+    yield '{"title": "Bulk", "director": "Director", "genres": ["Drama"]}'
+
+
+def facets(**filters):
+    return lambda db: movies.search_movies_faceted(MovieFilter(**filters), db)
+
+
+def fresh_autocomplete(kind):
+    # A stale index is rebuilt in the background, so build it in the call itself.
+    async def run(db):
+        await autocomplete.refresh(kind, db)
+        return await autocomplete.autocomplete(kind, "d", db)
+    return run
+
+
+# name: (call, tables it may scan in full)
+SCENARIOS = {
+    "auditorium.create_auditorium": (lambda db: auditorium.create_auditorium(db, AuditoriumCreate(name="New", cinema_id="cinema", capacity=10)), ()),
+    "auditorium.get_auditorium": (lambda db: auditorium.get_auditorium(db, "auditorium"), ()),
+    "auditorium.get_auditoriums": (lambda db: auditorium.get_auditoriums(db), ()),
+    "auditorium.update_auditorium": (lambda db: auditorium.update_auditorium(db, "auditorium", AuditoriumUpdate(name="Renamed")), ()),
+    "auditorium.delete_auditorium": (lambda db: auditorium.delete_auditorium(db, "auditorium"), ()),
+    # The prefix index is built from every title.
+    "autocomplete.autocomplete": (fresh_autocomplete("movies"), ("movies",)),
+    "autocomplete.refresh/movies": (lambda db: autocomplete.refresh("movies", db), ("movies",)),
+    "autocomplete.refresh/directors": (lambda db: autocomplete.refresh("directors", db), ()),
+    "autocomplete.refresh/genres": (lambda db: autocomplete.refresh("genres", db), ()),
+    # Names are resolved through maps of every director and genre.
+    "bulk.create_movies_bulk": (lambda db: bulk.create_movies_bulk(bulk.read_records(bulk_records()), db), ("directors", "genres")),
+    "cinema.create_cinema": (lambda db: cinema.create_cinema(db, CinemaCreate(name="New", location="-", number=2)), ()),
+    "cinema.get_cinema": (lambda db: cinema.get_cinema(db, "cinema"), ()),
+    "cinema.get_cinemas": (lambda db: cinema.get_cinemas(db), ()),
+    "cinema.update_cinema": (lambda db: cinema.update_cinema(db, "cinema", CinemaUpdate(name="Renamed")), ()),
+    "cinema.delete_cinema": (lambda db: cinema.delete_cinema(db, "cinema"), ()),
+    "director.create_director": (lambda db: director.create_director(DirectorCreate(name="New"), db), ()),
+    "director.get_director": (lambda db: director.get_director("director", db), ()),
+    "director.get_directors_by_ids": (lambda db: director.get_directors_by_ids(["director", "missing"], db), ()),
+    "director.get_directors": (lambda db: director.get_directors(db), ()),
+    "director.update_director": (lambda db: director.update_director("director", DirectorUpdate(name="Renamed"), db), ()),
+    "director.delete_director": (lambda db: director.delete_director("idle", db), ()),
+    "function.create_function": (lambda db: function.create_function(db, new_function(12)), ()),
+    "function.create_functions_bulk": (lambda db: function.create_functions_bulk(db, [new_function(12), new_function(14)]), ()),
+    "function.get_auditorium_schedules": (lambda db: function.get_auditorium_schedules(db, {"auditorium": (TOMORROW, TOMORROW + timedelta(days=1))}), ()),
+    "function.get_function": (lambda db: function.get_function(db, "function"), ()),
+    "function.get_functions": (lambda db: function.get_functions(db), ()),
+    "function.get_active_functions": (lambda db: function.get_active_functions(db), ()),
+    "function.get_active_functions/cinema": (lambda db: function.get_active_functions(db, cinema_id="cinema"), ()),
+    "function.get_active_functions/movie": (lambda db: function.get_active_functions(db, movie_id="movie"), ()),
+    "function.get_seat_map": (lambda db: function.get_seat_map(db, "function"), ()),
+    "function.update_seat_map": (lambda db: function.update_seat_map(db, "function", function.take_seats(1)), ()),
+    "function.reserve_seats": (lambda db: function.reserve_seats(db, "function", 2), ()),
+    "function.delete_function": (lambda db: function.delete_function(db, "function"), ()),
+    "function.check_auditorium_free": (lambda db: function.check_auditorium_free(db, "auditorium", TOMORROW, TOMORROW + timedelta(hours=2)), ()),
+    "genre.create_genre": (lambda db: genre.create_genre(GenreCreate(name="New"), db), ()),
+    "genre.get_genre": (lambda db: genre.get_genre("drama", db), ()),
+    "genre.get_genres_by_ids": (lambda db: genre.get_genres_by_ids(["drama", "missing"], db), ()),
+    "genre.get_genres": (lambda db: genre.get_genres(db), ()),
+    "genre.get_genre_by_name": (lambda db: genre.get_genre_by_name("Drama", db), ()),
+    "genre.update_genre": (lambda db: genre.update_genre("drama", GenreUpdate(name="Renamed"), db), ()),
+    "genre.delete_genre": (lambda db: genre.delete_genre("drama", db), ()),
+    "movies.create_movie": (lambda db: movies.create_movie(MovieCreate(**MOVIE, director="director", genres=["drama", "crime"]), db), ()),
+    "movies.get_movie": (lambda db: movies.get_movie("movie", db), ()),
+    "movies.get_movies_by_ids": (lambda db: movies.get_movies_by_ids(["movie", "missing"], db), ()),
+    "movies.get_movie_by_title": (lambda db: movies.get_movie_by_title("Plan", db), ()),
+    "movies.get_list_of_movies_by_title_like": (lambda db: movies.get_list_of_movies_by_title_like("pla", db), ()),
+    # Rebuilds the in-process title index from every title.
+    "movies.load_title_index": (lambda db: movies.load_title_index(db), ("movies",)),
+    "movies.get_list_of_movies_by_title_fuzzy": (lambda db: movies.get_list_of_movies_by_title_fuzzy("plan", db), ()),
+    "movies.search_movies": (lambda db: movies.search_movies("plan", db), ()),
+    # Facets over the whole catalog, or over filters no index narrows, count every movie.
+    "movies.search_movies_faceted": (facets(), ("movies",)),
+    "movies.search_movies_faceted/ranges": (facets(year_from=1990, max_duration=120), ("movies",)),
+    "movies.search_movies_faceted/director": (facets(director="director"), ()),
+    "movies.search_movies_faceted/rating": (facets(min_rating=8), ()),
+    "movies.search_movies_faceted/genres": (facets(genres=["drama", "crime"], genre_match="all"), ()),
+    "movies.get_movies_by_genre": (lambda db: movies.get_movies_by_genre("drama", db), ()),
+    "movies.get_movies": (lambda db: movies.get_movies(db), ()),
+    "movies.update_movie": (lambda db: movies.update_movie("movie", MovieUpdate(title="Renamed", genres=["drama"]), db), ()),
+    "movies.delete_movie": (lambda db: movies.delete_movie("movie", db), ()),
+    "pagination.paginate": (lambda db: pagination.paginate(db, Genre, cursor=pagination.encode_cursor("crime")), ()),
+    "schedule.get_free_slots": (lambda db: schedule.get_free_slots(db, ["auditorium"], TOMORROW, TOMORROW + timedelta(days=1)), ()),
+    "schedule.get_cinema_auditorium_ids": (lambda db: schedule.get_cinema_auditorium_ids(db, "cinema"), ()),
+    "schedule.pack_schedule": (lambda db: schedule.pack_schedule(db, SchedulePackRequest(
+        movie_ids=["movie"], auditorium_ids=["auditorium"], from_date=TOMORROW.date(), price=10, persist=True,
+    )), ()),
+    "schedule.get_cinema_schedule": (lambda db: schedule.get_cinema_schedule(db, "cinema", TOMORROW.date()), ()),
+    "seat_hold.create_seat_hold": (lambda db: seat_hold.create_seat_hold(db, "function", "user", 2), ()),
+    "seat_hold.confirm_seat_hold": (lambda db: seat_hold.confirm_seat_hold(db, "hold", "user"), ()),
+    "seat_hold.release_seat_hold": (lambda db: seat_hold.release_seat_hold(db, "hold", "user"), ()),
+    "seat_hold.release_expired_seat_holds": (lambda db: seat_hold.release_expired_seat_holds(db), ()),
+}
+
+
+def full_scans(plan) -> set:
+    # SQLite names aliased tables by their alias, e.g. genres_1.
+    scanned = set()
+    for detail in plan:
+        match = re.fullmatch(r"SCAN (\w+)", detail)
+        if match:
+            table = re.sub(r"_\d+$", "", match.group(1))
+            if table in Base.metadata.tables:
+                scanned.add(table)
+    return scanned
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+async def test_query_plan(client, name):
+    call, allowed = SCENARIOS[name]
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+            statements.append((statement, parameters[0] if executemany else parameters))
+
+    async with TestingSessionLocal() as db:
+        await seed(db)
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            await call(db)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+        assert statements, f"{name} ran no queries"
+
+        conn = await db.connection()
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", tuple(parameters))
+            plan = [row[3] for row in result.all()]
+            scanned = full_scans(plan) - set(allowed)
+            assert not scanned, f"{name} scans {', '.join(sorted(scanned))}:\n{statement}\n" + "\n".join(plan)
+
+
+def test_every_crud_function_has_a_scenario():
+    covered = {name.split("/")[0] for name in SCENARIOS}
+    for module_info in pkgutil.iter_modules(crud.__path__):
+        module = importlib.import_module(f"crud.{module_info.name}")
+        for function_name, member in inspect.getmembers(module, inspect.iscoroutinefunction):
+            if member.__module__ == module.__name__ and not function_name.startswith("_"):
+                assert f"{module_info.name}.{function_name}" in covered, f"no query plan scenario for crud.{module_info.name}.{function_name}"
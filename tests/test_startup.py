@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tempfile
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from data_loader import DIRECTORS
+from models import Director
+from startup import is_ready, prepare_database
+
+
+async def test_prepare_database_once_across_workers():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "startup.db")
+    # One engine per simulated worker, as separate processes would have.
+    engines = [create_async_engine(f"sqlite+aiosqlite:///{path}") for _ in range(4)]
+    try:
+        prepared = await asyncio.gather(*(
+            prepare_database(engine, sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False))
+            for engine in engines
+        ))
+        assert sorted(prepared) == [False, False, False, True]
+        assert await is_ready(engines[0])
+        async with engines[0].connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(Director)) == len(DIRECTORS)
+    finally:
+        for engine in engines:
+            await engine.dispose()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+async def test_is_ready_without_seed():
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, "startup.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        assert not await is_ready(engine, seed=False)
+        assert await prepare_database(engine, session_factory, seed=False) is True
+        assert await is_ready(engine, seed=False)
+        assert not await is_ready(engine)
+        assert await prepare_database(engine, session_factory) is True
+        assert await prepare_database(engine, session_factory) is False
+    finally:
+        await engine.dispose()
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+async def test_prepare_in_memory_database():
+    # An in-memory database lives on its one connection, so preparing it must not
+    # drop that connection, and foreign keys must still be enforced afterwards.
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    try:
+        assert await prepare_database(engine, session_factory) is True
+        assert await is_ready(engine)
+        async with engine.connect() as conn:
+            assert await conn.scalar(select(func.count()).select_from(Director)) == len(DIRECTORS)
+            assert await conn.scalar(text("PRAGMA foreign_keys")) == 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,205 @@
+"""
+In-process index over movie titles for typo-tolerant search.
+
+Lookups work in two steps. Each query word is first matched against the
+vocabulary of title words by trigram similarity, with words padded as
+`"  word "` the way pg_trgm does it, so "Incepton" still finds "inception".
+The matched words are then expanded to the titles that contain them. The
+vocabulary is far smaller than the catalog, which keeps both steps cheap.
+
+Posting lists are append-only arrays of ids, so they stay sorted and membership
+can be tested with bisect. Removing a title only clears its slot; the index is
+compacted once dead slots outnumber the live ones.
+
+Other processes' writes are picked up by rebuilding a separate index from the
+database and swapping it in with `replace`. Writes to this index meanwhile are
+journaled and replayed onto the new one, so none of them is lost.
+"""
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 0.3
+# Vocabulary words kept per query word, and the share of the catalog above
+# which a word (e.g. "the") is only used to re-score candidates found by others.
+EXPANSIONS = 8
+FREQUENT_WORD_SHARE = 0.01
+
+
+def words(text: str) -> List[str]:
+    text = text.lower()
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+    return list(dict.fromkeys(re.findall(r"\w+", text)))
+
+
+def trigrams(word: str) -> set:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _contains(postings: array, item: int) -> bool:
+    index = bisect_left(postings, item)
+    return index < len(postings) and postings[index] == item
+
+
+class TitleIndex:
+    def __init__(self) -> None:
+        self._journal: Optional[List[Tuple[str, Optional[str]]]] = None
+        self.clear()
+
+    def clear(self) -> None:
+        self._vocabulary: Dict[str, int] = {}
+        self._word_sizes = array("H")
+        self._word_postings: Dict[str, array] = {}
+        self._word_titles: List[array] = []
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._titles: List[Optional[str]] = []
+        self._title_sizes = array("H")
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def rebuild(self, titles: Iterable[Tuple[str, str]]) -> None:
+        self.clear()
+        for movie_id, title in titles:
+            self._add(movie_id, title)
+
+    def start_journal(self) -> None:
+        """Records every add and remove from now on, for `replace` to replay."""
+        self._journal = []
+
+    def end_journal(self) -> List[Tuple[str, Optional[str]]]:
+        journal, self._journal = self._journal or [], None
+        return journal
+
+    def replace(self, other: "TitleIndex") -> None:
+        """
+        Takes over the titles of `other`, built while the journal was on, after
+        replaying the journaled writes onto it, and ends the journal.
+        """
+        for movie_id, title in self.end_journal():
+            other._add(movie_id, title)
+        self.__dict__.update(other.__dict__)
+
+    def add(self, movie_id: str, title: Optional[str]) -> None:
+        """Adds or replaces the title of `movie_id`."""
+        if self._journal is not None:
+            self._journal.append((movie_id, title))
+        self._add(movie_id, title)
+
+    def remove(self, movie_id: str) -> None:
+        if self._journal is not None:
+            self._journal.append((movie_id, None))
+        self._remove(movie_id)
+
+    def _add(self, movie_id: str, title: Optional[str]) -> None:
+        self._remove(movie_id)
+        title_words = words(title or "")
+        if not title_words:
+            return
+        slot = len(self._ids)
+        self._slots[movie_id] = slot
+        self._ids.append(movie_id)
+        self._titles.append(title)
+        self._title_sizes.append(min(len(title_words), 0xFFFF))
+        for word in title_words:
+            self._word_titles[self._word_id(word)].append(slot)
+
+    def _remove(self, movie_id: str) -> None:
+        slot = self._slots.pop(movie_id, None)
+        if slot is None:
+            return
+        self._ids[slot] = None
+        self._titles[slot] = None
+        self._dead += 1
+        if self._dead > 1000 and self._dead > len(self._slots):
+            self.rebuild([
+                (movie_id, title) for movie_id, title in zip(self._ids, self._titles) if movie_id is not None
+            ])
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._vocabulary.get(word)
+        if word_id is not None:
+            return word_id
+        word_id = self._vocabulary[word] = len(self._word_titles)
+        self._word_titles.append(array("I"))
+        grams = trigrams(word)
+        self._word_sizes.append(min(len(grams), 0xFFFF))
+        for gram in grams:
+            postings = self._word_postings.get(gram)
+            if postings is None:
+                postings = self._word_postings[gram] = array("I")
+            postings.append(word_id)
+        return word_id
+
+    def _similar_words(self, word: str, threshold: float) -> List[Tuple[float, int]]:
+        """Vocabulary words whose trigram similarity to `word` is at least `threshold`."""
+        grams = trigrams(word)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._word_postings.get(gram, ()))
+        # similarity >= threshold needs at least threshold * len(grams) shared trigrams.
+        required = threshold * len(grams)
+        similar = []
+        for word_id, shared in counts.items():
+            if shared >= required:
+                similarity = shared / (len(grams) + self._word_sizes[word_id] - shared)
+                if similarity >= threshold:
+                    similar.append((similarity, word_id))
+        return heapq.nlargest(EXPANSIONS, similar)
+
+    def search(self, query: str, limit: int = 10, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, float]]:
+        """
+        Returns up to `limit` (movie_id, score) pairs, best first. The score is the
+        mean, over the query's words, of the best similarity to a word of the
+        title; ties go to the title whose word count is closest to the query's.
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        matches = [self._similar_words(word, threshold) for word in query_words]
+        sizes = [sum(len(self._word_titles[word_id]) for _, word_id in similar) for similar in matches]
+        frequent = max(1000, int(len(self._slots) * FREQUENT_WORD_SHARE))
+        scanned = [i for i, size in enumerate(sizes) if size <= frequent] or [sizes.index(min(sizes))]
+        probed = [matches[i] for i in range(len(query_words)) if i not in scanned]
+
+        partial: Dict[int, float] = {}
+        for i in scanned:
+            best: Dict[int, float] = {}
+            for similarity, word_id in matches[i]:
+                for slot in self._word_titles[word_id]:
+                    if best.get(slot, 0.0) < similarity:
+                        best[slot] = similarity
+            for slot, similarity in best.items():
+                partial[slot] = partial.get(slot, 0.0) + similarity
+
+        # Frequent words are checked per candidate, best partial score first, until
+        # no remaining candidate can reach the current top `limit`.
+        top: List[Tuple[float, int, int]] = []
+        for slot, score in sorted(partial.items(), key=lambda item: item[1], reverse=True):
+            if len(top) == limit and score + len(probed) < top[0][0]:
+                break
+            if self._ids[slot] is None:
+                continue
+            for similar in probed:
+                for similarity, word_id in similar:
+                    if _contains(self._word_titles[word_id], slot):
+                        score += similarity
+                        break
+            entry = (score, -abs(self._title_sizes[slot] - len(query_words)), slot)
+            if len(top) < limit:
+                heapq.heappush(top, entry)
+            elif entry > top[0]:
+                heapq.heapreplace(top, entry)
+        return [(self._ids[slot], round(score / len(query_words), 4)) for score, _, slot in sorted(top, reverse=True)]
+
+
+title_index = TitleIndex()